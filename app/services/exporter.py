@@ -1,19 +1,98 @@
 """Export functionality for various clinical trial data formats."""
-from typing import Dict, Any
+from typing import Dict, Any, Callable, IO, List, Optional, Tuple
+from copy import deepcopy
+import codecs
+import csv
+import io
 import json
 from datetime import datetime
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
 from app.models.schemas import (
     ProtocolStructured,
     CRFSchema,
+    CRFField,
     ExportFormat,
 )
 
+try:
+    from lxml.etree import Element, SubElement, tostring, xmlfile, indent
+    LXML_AVAILABLE = True
+except ImportError:
+    # xml.etree.ElementTree binds the C accelerator (_elementtree) on import
+    from xml.etree.ElementTree import Element, SubElement, tostring, indent
+    LXML_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+ODM_NSMAP = {
+    None: "http://www.cdisc.org/ns/odm/v1.3",
+    "xsi": "http://www.w3.org/2001/XMLSchema-instance",
+}
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# Pre-rendered OrderNumber values; larger positions fall back to str()
+_ORDER_STRS = tuple(str(i) for i in range(10000))
+_ORDER_STRS_LEN = len(_ORDER_STRS)
+
+# Statistical plan values rendered into the SAP method description
+_SIMPLE_TYPES = (str, int, float)
+_SIMPLE_TYPES_SET = {str, int, float, bool}
+
+# Internal field data type -> ODM ItemDef DataType
+ODM_DATATYPE_MAP = {
+    "text": "text",
+    "number": "integer",
+    "date": "date",
+    "datetime": "datetime",
+    "dropdown": "text",
+    "checkbox": "text",
+    "radio": "text",
+}
+
+# Internal field data type -> FHIR Questionnaire item type
+FHIR_DATATYPE_MAP = {
+    "text": "string",
+    "number": "decimal",
+    "date": "date",
+    "datetime": "dateTime",
+    "dropdown": "choice",
+    "checkbox": "choice",
+    "radio": "choice",
+}
+
+
+class _TextStreamWriter:
+    """Binary file-like adapter that decodes UTF-8 writes into a text stream."""
+    
+    def __init__(self, out: IO[str]):
+        self._out = out
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+    
+    def write(self, data: bytes) -> int:
+        self._out.write(self._decoder.decode(data))
+        return len(data)
+    
+    def close(self):
+        self._out.write(self._decoder.decode(b"", final=True))
+
+
+def _translated_text(parent: Element, text: str) -> Element:
+    """Append an English TranslatedText child to parent."""
+    translated = SubElement(parent, "TranslatedText", attrib={XML_LANG: "en"})
+    translated.text = text
+    return translated
+
 
 class ProtocolExporter:
     """Exports protocols and CRFs to various formats."""
     
+    # Static ODM sections (codelists, units), shared by all instances
+    _static_sections: Dict[str, Element] = {}
+    
     def export(
         self,
         protocol: ProtocolStructured,
@@ -21,17 +100,32 @@ class ProtocolExporter:
         format: ExportFormat,
         include_protocol: bool = True,
         include_crf: bool = True,
+        out: Optional[IO[str]] = None,
     ) -> Dict[str, Any]:
-        """Export to specified format."""
+        """
+        Export to specified format.
+        
+        Args:
+            protocol: Structured protocol
+            crf_schema: CRF schema
+            format: Target export format
+            include_protocol: Include the protocol section
+            include_crf: Include the CRF section
+            out: Optional text stream; when given, the document is written
+                to it and the result's "content" is None
+            
+        Returns:
+            Dictionary with format, content and filename
+        """
         
         if format == ExportFormat.ODM_XML:
-            return self._export_odm_xml(protocol, crf_schema, include_protocol, include_crf)
+            return self._export_odm_xml(protocol, crf_schema, include_protocol, include_crf, out)
         elif format == ExportFormat.FHIR_JSON:
-            return self._export_fhir_json(protocol, crf_schema, include_protocol, include_crf)
+            return self._export_fhir_json(protocol, crf_schema, include_protocol, include_crf, out)
         elif format == ExportFormat.CSV:
-            return self._export_csv(crf_schema)
+            return self._export_csv(crf_schema, out)
         elif format == ExportFormat.JSON:
-            return self._export_json(protocol, crf_schema, include_protocol, include_crf)
+            return self._export_json(protocol, crf_schema, include_protocol, include_crf, out)
         else:
             raise ValueError(f"Unsupported export format: {format}")
     
@@ -41,27 +135,31 @@ class ProtocolExporter:
         crf_schema: CRFSchema,
         include_protocol: bool,
         include_crf: bool,
-    ) -> Dict[str, str]:
+        out: Optional[IO[str]] = None,
+    ) -> Dict[str, Any]:
         """Export to CDISC ODM XML format."""
         
-        # Create root ODM element
-        odm = Element("ODM")
-        odm.set("xmlns", "http://www.cdisc.org/ns/odm/v1.3")
-        odm.set("xmlns:xsi", "http://www.w3.org/2001/XMLSchema-instance")
-        odm.set("ODMVersion", "1.3.2")
-        odm.set("FileOID", f"ODM.{protocol.protocol_id}.{datetime.now().strftime('%Y%m%d%H%M%S')}")
-        odm.set("FileType", "Snapshot")
-        odm.set("CreationDateTime", datetime.now().isoformat())
-        odm.set("AsOfDateTime", datetime.now().isoformat())
-        odm.set("SourceSystem", "Clinical Trial Protocol Generator")
-        odm.set("SourceSystemVersion", "1.0")
+        # Single timestamp so FileOID and the date attributes agree
+        now = datetime.now()
+        now_iso = now.isoformat()
+        validation_rules = self._render_validation_rules(crf_schema)
+        
+        # Root ODM attributes
+        odm_attrib = {
+            "ODMVersion": "1.3.2",
+            "FileOID": f"ODM.{protocol.protocol_id}.{now.strftime('%Y%m%d%H%M%S')}",
+            "FileType": "Snapshot",
+            "CreationDateTime": now_iso,
+            "AsOfDateTime": now_iso,
+            "SourceSystem": "Clinical Trial Protocol Generator",
+            "SourceSystemVersion": "1.0",
+        }
         
         # Study
-        study = SubElement(odm, "Study")
-        study.set("OID", protocol.protocol_id)
+        study_attrib = {"OID": protocol.protocol_id}
         
         # Global Variables
-        global_vars = SubElement(study, "GlobalVariables")
+        global_vars = Element("GlobalVariables")
         
         study_name = SubElement(global_vars, "StudyName")
         study_name.text = protocol.title
@@ -73,36 +171,37 @@ class ProtocolExporter:
         protocol_name.text = protocol.protocol_id
         
         # MetaDataVersion
-        metadata = SubElement(study, "MetaDataVersion")
-        metadata.set("OID", f"MDV.{protocol.protocol_id}.{protocol.version}")
-        metadata.set("Name", f"Study MetaData Version {protocol.version}")
-        metadata.set("Description", f"Metadata for {protocol.title}")
+        metadata = Element("MetaDataVersion", attrib={
+            "OID": f"MDV.{protocol.protocol_id}.{protocol.version}",
+            "Name": f"Study MetaData Version {protocol.version}",
+            "Description": f"Metadata for {protocol.title}",
+        })
         
         if include_protocol:
             # Protocol section
             protocol_elem = SubElement(metadata, "Protocol")
             
             # Description
-            desc = SubElement(protocol_elem, "Description")
-            translated = SubElement(desc, "TranslatedText")
-            translated.set("xml:lang", "en")
-            translated.text = f"{protocol.phase} {protocol.study_design} study evaluating treatment in patients with {protocol.indication}"
+            _translated_text(
+                SubElement(protocol_elem, "Description"),
+                f"{protocol.phase} {protocol.study_design} study evaluating treatment in patients with {protocol.indication}",
+            )
             
             # Objectives
             for obj_type, obj_text in protocol.objectives.items():
                 study_obj = SubElement(protocol_elem, "StudyObjective")
                 study_obj.set("OID", f"OBJ.{obj_type.upper()}")
                 
-                obj_desc = SubElement(study_obj, "Description")
-                obj_trans = SubElement(obj_desc, "TranslatedText")
-                obj_trans.set("xml:lang", "en")
-                obj_trans.text = obj_text
+                _translated_text(SubElement(study_obj, "Description"), obj_text)
+            
+            # StudyEvent OIDs are shared by the refs here and the defs below
+            event_oids = ["SE." + visit.visit_id for visit in crf_schema.visits]
             
             # Study Event References (Visit Schedule)
-            for i, visit in enumerate(crf_schema.visits, 1):
+            for i, event_oid in enumerate(event_oids, 1):
                 event_ref = SubElement(protocol_elem, "StudyEventRef")
-                event_ref.set("StudyEventOID", f"SE.{visit.visit_id}")
-                event_ref.set("OrderNumber", str(i))
+                event_ref.set("StudyEventOID", event_oid)
+                event_ref.set("OrderNumber", _ORDER_STRS[i] if i < _ORDER_STRS_LEN else str(i))
                 event_ref.set("Mandatory", "Yes")
             
             # Treatment Arms
@@ -111,10 +210,7 @@ class ProtocolExporter:
                 arm_elem.set("OID", f"ARM.{i}")
                 arm_elem.set("Name", arm)
                 
-                arm_desc = SubElement(arm_elem, "Description")
-                arm_trans = SubElement(arm_desc, "TranslatedText")
-                arm_trans.set("xml:lang", "en")
-                arm_trans.text = arm
+                _translated_text(SubElement(arm_elem, "Description"), arm)
             
             # Inclusion/Exclusion Criteria
             if protocol.inclusion_criteria or protocol.exclusion_criteria:
@@ -127,10 +223,7 @@ class ProtocolExporter:
                         inc.set("OID", f"IC.{i}")
                         inc.set("Type", "Inclusion")
                         
-                        crit_desc = SubElement(inc, "Description")
-                        crit_trans = SubElement(crit_desc, "TranslatedText")
-                        crit_trans.set("xml:lang", "en")
-                        crit_trans.text = criterion
+                        _translated_text(SubElement(inc, "Description"), criterion)
                 
                 # Exclusion Criteria
                 if protocol.exclusion_criteria:
@@ -139,10 +232,7 @@ class ProtocolExporter:
                         exc.set("OID", f"EC.{i}")
                         exc.set("Type", "Exclusion")
                         
-                        crit_desc = SubElement(exc, "Description")
-                        crit_trans = SubElement(crit_desc, "TranslatedText")
-                        crit_trans.set("xml:lang", "en")
-                        crit_trans.text = criterion
+                        _translated_text(SubElement(exc, "Description"), criterion)
             
             # Study Endpoints
             if protocol.endpoints:
@@ -151,133 +241,53 @@ class ProtocolExporter:
                     endpoint_elem.set("OID", f"EP.{i}")
                     endpoint_elem.set("Type", endpoint.get("type", "primary").capitalize())
                     
-                    ep_desc = SubElement(endpoint_elem, "Description")
-                    ep_trans = SubElement(ep_desc, "TranslatedText")
-                    ep_trans.set("xml:lang", "en")
                     ep_desc_text = endpoint.get("name", endpoint.get("description", ""))
                     if endpoint.get("measurement_timepoint"):
                         ep_desc_text += f" at {endpoint.get('measurement_timepoint')}"
-                    ep_trans.text = ep_desc_text
+                    _translated_text(SubElement(endpoint_elem, "Description"), ep_desc_text)
             
             # Conditions (Indication)
             condition = SubElement(protocol_elem, "Condition")
             condition.set("OID", "COND.01")
-            cond_desc = SubElement(condition, "Description")
-            cond_trans = SubElement(cond_desc, "TranslatedText")
-            cond_trans.set("xml:lang", "en")
-            cond_trans.text = protocol.indication
+            _translated_text(SubElement(condition, "Description"), protocol.indication)
             
             # Study Event References (Visit Schedule)
-            for visit in crf_schema.visits:
+            for visit, event_oid in zip(crf_schema.visits, event_oids):
                 event_def = SubElement(metadata, "StudyEventDef")
-                event_def.set("OID", f"SE.{visit.visit_id}")
+                event_def.set("OID", event_oid)
                 event_def.set("Name", visit.visit_name)
                 event_def.set("Repeating", "No")
                 event_def.set("Type", "Scheduled")
                 
                 # Visit description
-                visit_desc = SubElement(event_def, "Description")
-                visit_trans = SubElement(visit_desc, "TranslatedText")
-                visit_trans.set("xml:lang", "en")
-                visit_trans.text = f"{visit.visit_name} - {visit.timepoint}"
+                visit_text = f"{visit.visit_name} - {visit.timepoint}"
                 if visit.window:
-                    visit_trans.text += f" (Window: {visit.window})"
+                    visit_text += f" (Window: {visit.window})"
+                _translated_text(SubElement(event_def, "Description"), visit_text)
                 
                 # Forms for this visit
                 for j, form_id in enumerate(visit.forms, 1):
                     form_ref = SubElement(event_def, "FormRef")
-                    form_ref.set("FormOID", f"FORM.{form_id}")
-                    form_ref.set("OrderNumber", str(j))
+                    form_ref.set("FormOID", "FORM." + form_id)
+                    form_ref.set("OrderNumber", _ORDER_STRS[j] if j < _ORDER_STRS_LEN else str(j))
                     form_ref.set("Mandatory", "Yes")
         
         if include_crf:
-            # Form Definitions
-            for form in crf_schema.forms:
-                form_def = SubElement(metadata, "FormDef")
-                form_def.set("OID", f"FORM.{form.form_id}")
-                form_def.set("Name", form.form_name)
-                form_def.set("Repeating", "Yes" if form.repeating else "No")
-                
-                # Form description
-                if form.form_description:
-                    form_desc = SubElement(form_def, "Description")
-                    form_trans = SubElement(form_desc, "TranslatedText")
-                    form_trans.set("xml:lang", "en")
-                    form_trans.text = form.form_description
-                
-                # Item Group (one per form for simplicity)
-                item_group_ref = SubElement(form_def, "ItemGroupRef")
-                item_group_ref.set("ItemGroupOID", f"IG.{form.form_id}")
-                item_group_ref.set("Mandatory", "Yes")
-                item_group_ref.set("OrderNumber", "1")
+            # ODM requires all FormDefs, then ItemGroupDefs, then ItemDefs.
+            # Build each form's definitions detached, then append them in order.
+            subtrees = [self._build_form_subtrees(form, validation_rules) for form in crf_schema.forms]
             
-            # Item Group Definitions
-            for form in crf_schema.forms:
-                item_group = SubElement(metadata, "ItemGroupDef")
-                item_group.set("OID", f"IG.{form.form_id}")
-                item_group.set("Name", f"{form.form_name} Items")
-                item_group.set("Repeating", "No")
-                
-                # Item Group description
-                ig_desc = SubElement(item_group, "Description")
-                ig_trans = SubElement(ig_desc, "TranslatedText")
-                ig_trans.set("xml:lang", "en")
-                ig_trans.text = f"Item group for {form.form_name}"
-                
-                # Items (fields)
-                for j, field in enumerate(form.fields, 1):
-                    item_ref = SubElement(item_group, "ItemRef")
-                    item_ref.set("ItemOID", f"IT.{field.field_id}")
-                    item_ref.set("OrderNumber", str(j))
-                    item_ref.set("Mandatory", "Yes" if field.required else "No")
-                    
-                    # SDTM mapping if available
-                    if field.sdtm_variable:
-                        role_elem = SubElement(item_ref, "Role")
-                        role_elem.set("RoleCodeListOID", "CL.ROLE")
-                        role_elem.text = field.sdtm_variable
+            form_defs = []
+            item_group_defs = []
+            item_defs = []
+            for form_def, item_group, form_item_defs in subtrees:
+                form_defs.append(form_def)
+                item_group_defs.append(item_group)
+                item_defs.extend(form_item_defs)
             
-            # Item Definitions
-            for form in crf_schema.forms:
-                for field in form.fields:
-                    item_def = SubElement(metadata, "ItemDef")
-                    item_def.set("OID", f"IT.{field.field_id}")
-                    item_def.set("Name", field.field_name)
-                    item_def.set("DataType", self._map_datatype_to_odm(field.data_type))
-                    
-                    # Question
-                    question = SubElement(item_def, "Question")
-                    translated_text = SubElement(question, "TranslatedText")
-                    translated_text.set("xml:lang", "en")
-                    translated_text.text = field.field_label
-                    
-                    # Description with field details
-                    item_desc = SubElement(item_def, "Description")
-                    item_trans = SubElement(item_desc, "TranslatedText")
-                    item_trans.set("xml:lang", "en")
-                    desc_text = f"{field.field_label}"
-                    if field.required:
-                        desc_text += " (Required)"
-                    if field.validation_rules:
-                        desc_text += f" - Validation: {json.dumps(field.validation_rules)}"
-                    item_trans.text = desc_text
-                    
-                    # CDASH mapping if available
-                    if field.cdash_variable:
-                        alias = SubElement(item_def, "Alias")
-                        alias.set("Context", "CDASH")
-                        alias.set("Name", field.cdash_variable)
-                    
-                    # SDTM mapping if available
-                    if field.sdtm_variable:
-                        alias = SubElement(item_def, "Alias")
-                        alias.set("Context", "SDTM")
-                        alias.set("Name", field.sdtm_variable)
-                    
-                    # Controlled terminology reference
-                    if field.controlled_vocabulary:
-                        ct_ref = SubElement(item_def, "CodeListRef")
-                        ct_ref.set("CodeListOID", f"CL.{field.controlled_vocabulary}")
+            metadata.extend(form_defs)
+            metadata.extend(item_group_defs)
+            metadata.extend(item_defs)
             
             # Add CodeLists for common controlled terminologies
             self._add_common_codelists(metadata)
@@ -286,16 +296,32 @@ class ProtocolExporter:
             self._add_study_parameters(metadata, protocol)
             
             # Add method definitions (for calculations, edit checks)
-            self._add_method_definitions(metadata, protocol, crf_schema)
+            self._add_method_definitions(metadata, protocol, crf_schema, validation_rules)
             
             # Add measurement units
             self._add_measurement_units(metadata)
         
         # Clinical Data section (template for data collection)
-        self._add_clinical_data_template(odm, protocol)
+        clinical_data = self._build_clinical_data_template(protocol)
         
-        # Convert to pretty XML string
-        xml_str = minidom.parseString(tostring(odm)).toprettyxml(indent="  ")
+        if LXML_AVAILABLE:
+            # Write the document incrementally instead of assembling one tree
+            xml_str = self._stream_odm_xml(
+                odm_attrib, study_attrib, global_vars, metadata, clinical_data, out
+            )
+        else:
+            odm = self._create_odm_root()
+            for key, value in odm_attrib.items():
+                odm.set(key, value)
+            study = SubElement(odm, "Study", attrib=study_attrib)
+            study.append(global_vars)
+            study.append(metadata)
+            odm.append(clinical_data)
+            
+            xml_str = self._serialize_xml(odm)
+            if out is not None:
+                out.write(xml_str)
+                xml_str = None
         
         return {
             "format": "odm_xml",
@@ -303,8 +329,204 @@ class ProtocolExporter:
             "filename": f"{protocol.protocol_id}_ODM.xml",
         }
     
+    def _build_form_subtrees(
+        self,
+        form,
+        validation_rules: Dict[int, Tuple[str, str, Optional[str]]]
+    ) -> Tuple[Element, Element, List[Element]]:
+        """
+        Build the detached ODM definitions for one CRF form.
+        
+        Args:
+            form: CRF form definition
+            validation_rules: Pre-rendered validation rules keyed by field id
+            
+        Returns:
+            Tuple of (FormDef, ItemGroupDef, list of ItemDefs)
+        """
+        # Local aliases: the per-field loop below creates most of the nodes
+        sub_element = SubElement
+        map_datatype = self._map_datatype_to_odm
+        item_defs = []
+        
+        item_group_oid = "IG." + form.form_id
+        
+        # Form Definition
+        form_def = Element("FormDef", attrib={
+            "OID": "FORM." + form.form_id,
+            "Name": form.form_name,
+            "Repeating": "Yes" if form.repeating else "No",
+        })
+        
+        # Form description
+        if form.form_description:
+            _translated_text(SubElement(form_def, "Description"), form.form_description)
+        
+        # Item Group (one per form for simplicity)
+        SubElement(form_def, "ItemGroupRef", attrib={
+            "ItemGroupOID": item_group_oid,
+            "Mandatory": "Yes",
+            "OrderNumber": "1",
+        })
+        
+        # Item Group Definition
+        item_group = Element("ItemGroupDef", attrib={
+            "OID": item_group_oid,
+            "Name": f"{form.form_name} Items",
+            "Repeating": "No",
+        })
+        
+        # Item Group description
+        _translated_text(SubElement(item_group, "Description"), f"Item group for {form.form_name}")
+        
+        # Items (fields)
+        for j, field in enumerate(form.fields, 1):
+            item_oid = "IT." + field.field_id
+            
+            item_ref = sub_element(item_group, "ItemRef", attrib={
+                "ItemOID": item_oid,
+                "OrderNumber": _ORDER_STRS[j] if j < _ORDER_STRS_LEN else str(j),
+                "Mandatory": "Yes" if field.required else "No",
+            })
+        
+            # SDTM mapping if available
+            if field.sdtm_variable:
+                role_elem = sub_element(item_ref, "Role", attrib={"RoleCodeListOID": "CL.ROLE"})
+                role_elem.text = field.sdtm_variable
+            
+            # Item Definition
+            item_def = Element("ItemDef", attrib={
+                "OID": item_oid,
+                "Name": field.field_name,
+                "DataType": map_datatype(field.data_type),
+            })
+            item_defs.append(item_def)
+            
+            # Question
+            _translated_text(sub_element(item_def, "Question"), field.field_label)
+            
+            # Description with field details
+            desc_text = f"{field.field_label}"
+            if field.required:
+                desc_text += " (Required)"
+            if field.validation_rules:
+                desc_text += f" - Validation: {validation_rules[id(field)][0]}"
+            _translated_text(sub_element(item_def, "Description"), desc_text)
+            
+            # CDASH mapping if available
+            if field.cdash_variable:
+                sub_element(item_def, "Alias", attrib={"Context": "CDASH", "Name": field.cdash_variable})
+            
+            # SDTM mapping if available
+            if field.sdtm_variable:
+                sub_element(item_def, "Alias", attrib={"Context": "SDTM", "Name": field.sdtm_variable})
+            
+            # Controlled terminology reference
+            if field.controlled_vocabulary:
+                sub_element(item_def, "CodeListRef", attrib={"CodeListOID": f"CL.{field.controlled_vocabulary}"})
+        
+        return form_def, item_group, item_defs
+    
+    def _stream_odm_xml(
+        self,
+        odm_attrib: Dict[str, str],
+        study_attrib: Dict[str, str],
+        global_vars: Element,
+        metadata: Element,
+        clinical_data: Element,
+        out: Optional[IO[str]] = None,
+    ) -> Optional[str]:
+        """
+        Serialize an ODM document with lxml's incremental writer.
+        
+        The ODM, Study and MetaDataVersion elements are written as open
+        tags, and each metadata section is indented, written and released
+        in turn, so the serialized output never coexists with the full tree.
+        
+        Args:
+            odm_attrib: Attributes of the ODM root element
+            study_attrib: Attributes of the Study element
+            global_vars: GlobalVariables element
+            metadata: MetaDataVersion element with its sections
+            clinical_data: ClinicalData element
+            out: Optional text stream to write to
+            
+        Returns:
+            XML string, or None when written to out
+        """
+        sink = io.BytesIO() if out is None else _TextStreamWriter(out)
+        
+        # Whitespace matches tostring(pretty_print=True) of the whole tree
+        with xmlfile(sink, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element("ODM", attrib=odm_attrib, nsmap=ODM_NSMAP):
+                xf.write("\n  ")
+                with xf.element("Study", attrib=study_attrib):
+                    xf.write("\n    ")
+                    indent(global_vars, level=2)
+                    xf.write(global_vars)
+                    xf.write("\n    ")
+                    if len(metadata):
+                        with xf.element("MetaDataVersion", attrib=metadata.attrib):
+                            for section in list(metadata):
+                                metadata.remove(section)
+                                indent(section, level=3)
+                                xf.write("\n      ")
+                                xf.write(section)
+                            xf.write("\n    ")
+                    else:
+                        xf.write(metadata)
+                    xf.write("\n  ")
+                xf.write("\n  ")
+                indent(clinical_data, level=1)
+                xf.write(clinical_data)
+                xf.write("\n")
+        sink.write(b"\n")
+        
+        if out is not None:
+            sink.close()
+            return None
+        return sink.getvalue().decode("utf-8")
+    
+    def _create_odm_root(self) -> Element:
+        """Create the ODM root element with its namespace declarations."""
+        odm = Element("ODM")
+        odm.set("xmlns", ODM_NSMAP[None])
+        odm.set("xmlns:xsi", ODM_NSMAP["xsi"])
+        return odm
+    
+    def _serialize_xml(self, root: Element) -> str:
+        """Serialize an element tree to an indented XML string."""
+        indent(root, space="  ")
+        return tostring(root, encoding="unicode", xml_declaration=True)
+    
+    def _append_static_section(
+        self,
+        metadata: Element,
+        name: str,
+        builder: Callable[[Element], None],
+    ):
+        """
+        Append a protocol-independent ODM section to metadata.
+        
+        The section is built once per process into a detached template;
+        each export appends deep copies, since an element can only have
+        one parent.
+        """
+        template = self._static_sections.get(name)
+        if template is None:
+            template = Element("MetaDataVersion")
+            builder(template)
+            self._static_sections[name] = template
+        
+        metadata.extend([deepcopy(child) for child in template])
+    
     def _add_common_codelists(self, metadata: Element):
         """Add common CDISC codelists to ODM."""
+        self._append_static_section(metadata, "codelists", self._build_common_codelists)
+    
+    def _build_common_codelists(self, metadata: Element):
+        """Build the common CDISC codelists under metadata."""
         
         # Yes/No codelist
         yn_list = SubElement(metadata, "CodeList")
@@ -314,17 +536,11 @@ class ProtocolExporter:
         
         yn_no = SubElement(yn_list, "CodeListItem")
         yn_no.set("CodedValue", "N")
-        decode = SubElement(yn_no, "Decode")
-        trans = SubElement(decode, "TranslatedText")
-        trans.set("xml:lang", "en")
-        trans.text = "No"
+        _translated_text(SubElement(yn_no, "Decode"), "No")
         
         yn_yes = SubElement(yn_list, "CodeListItem")
         yn_yes.set("CodedValue", "Y")
-        decode = SubElement(yn_yes, "Decode")
-        trans = SubElement(decode, "TranslatedText")
-        trans.set("xml:lang", "en")
-        trans.text = "Yes"
+        _translated_text(SubElement(yn_yes, "Decode"), "Yes")
         
         # Sex codelist
         sex_list = SubElement(metadata, "CodeList")
@@ -335,10 +551,7 @@ class ProtocolExporter:
         for code, text in [("M", "Male"), ("F", "Female"), ("U", "Unknown")]:
             item = SubElement(sex_list, "CodeListItem")
             item.set("CodedValue", code)
-            decode = SubElement(item, "Decode")
-            trans = SubElement(decode, "TranslatedText")
-            trans.set("xml:lang", "en")
-            trans.text = text
+            _translated_text(SubElement(item, "Decode"), text)
     
     def _add_study_parameters(self, metadata: Element, protocol: ProtocolStructured):
         """Add study parameters to ODM."""
@@ -368,9 +581,18 @@ class ProtocolExporter:
         param.set("Name", "Study Phase")
         param.text = protocol.phase
     
-    def _add_method_definitions(self, metadata: Element, protocol: ProtocolStructured, crf_schema: CRFSchema):
+    def _add_method_definitions(
+        self,
+        metadata: Element,
+        protocol: ProtocolStructured,
+        crf_schema: CRFSchema,
+        validation_rules: Optional[Dict[int, Tuple[str, str, Optional[str]]]] = None,
+    ):
         """Add method definitions for calculations and edit checks."""
         
+        if validation_rules is None:
+            validation_rules = self._render_validation_rules(crf_schema)
+        
         # Statistical Analysis Method
         if protocol.statistical_plan:
             method = SubElement(metadata, "MethodDef")
@@ -378,22 +600,19 @@ class ProtocolExporter:
             method.set("Name", "Statistical Analysis Plan")
             method.set("Type", "Computation")
             
-            method_desc = SubElement(method, "Description")
-            method_trans = SubElement(method_desc, "TranslatedText")
-            method_trans.set("xml:lang", "en")
-            
             # Build statistical plan description
             stat_desc = "Statistical Analysis Plan: "
             if isinstance(protocol.statistical_plan, dict):
-                stat_parts = []
-                for key, value in protocol.statistical_plan.items():
-                    if isinstance(value, (str, int, float)):
-                        stat_parts.append(f"{key}: {value}")
-                stat_desc += "; ".join(stat_parts)
+                # Exact-type set lookup first; isinstance only for subclasses
+                stat_desc += "; ".join(
+                    f"{key}: {value}"
+                    for key, value in protocol.statistical_plan.items()
+                    if type(value) in _SIMPLE_TYPES_SET or isinstance(value, _SIMPLE_TYPES)
+                )
             else:
                 stat_desc += str(protocol.statistical_plan)
             
-            method_trans.text = stat_desc
+            _translated_text(SubElement(method, "Description"), stat_desc)
         
         # Edit checks for field validations
         validation_id = 1
@@ -405,35 +624,25 @@ class ProtocolExporter:
                     method.set("Name", f"Validation for {field.field_name}")
                     method.set("Type", "Computation")
                     
-                    method_desc = SubElement(method, "Description")
-                    method_trans = SubElement(method_desc, "TranslatedText")
-                    method_trans.set("xml:lang", "en")
+                    _, rules_text, expression = validation_rules[id(field)]
+                    val_desc = f"Validation rules for {field.field_label}: {rules_text}"
                     
-                    val_desc = f"Validation rules for {field.field_label}: "
-                    rules = []
-                    for rule_key, rule_value in field.validation_rules.items():
-                        rules.append(f"{rule_key}={rule_value}")
-                    val_desc += ", ".join(rules)
-                    
-                    method_trans.text = val_desc
+                    _translated_text(SubElement(method, "Description"), val_desc)
                     
                     # Add formal expression if applicable
-                    if "min" in field.validation_rules or "max" in field.validation_rules:
+                    if expression is not None:
                         formal_expr = SubElement(method, "FormalExpression")
                         formal_expr.set("Context", "Python")
-                        
-                        expr_parts = []
-                        if "min" in field.validation_rules:
-                            expr_parts.append(f"value >= {field.validation_rules['min']}")
-                        if "max" in field.validation_rules:
-                            expr_parts.append(f"value <= {field.validation_rules['max']}")
-                        
-                        formal_expr.text = " and ".join(expr_parts)
+                        formal_expr.text = expression
                     
                     validation_id += 1
     
     def _add_measurement_units(self, metadata: Element):
         """Add common measurement units."""
+        self._append_static_section(metadata, "measurement_units", self._build_measurement_units)
+    
+    def _build_measurement_units(self, metadata: Element):
+        """Build the common measurement units under metadata."""
         
         # Common units
         units = [
@@ -452,22 +661,21 @@ class ProtocolExporter:
             unit.set("OID", oid)
             unit.set("Name", name)
             
-            symbol_elem = SubElement(unit, "Symbol")
-            symbol_trans = SubElement(symbol_elem, "TranslatedText")
-            symbol_trans.set("xml:lang", "en")
-            symbol_trans.text = symbol
+            _translated_text(SubElement(unit, "Symbol"), symbol)
     
-    def _add_clinical_data_template(self, odm: Element, protocol: ProtocolStructured):
-        """Add clinical data template section."""
+    def _build_clinical_data_template(self, protocol: ProtocolStructured) -> Element:
+        """Build the clinical data template section."""
         
         # ClinicalData section (empty template for data collection)
-        clinical_data = SubElement(odm, "ClinicalData")
+        clinical_data = Element("ClinicalData")
         clinical_data.set("StudyOID", protocol.protocol_id)
         clinical_data.set("MetaDataVersionOID", f"MDV.{protocol.protocol_id}.{protocol.version}")
         
         # Add comment about this being a template
         comment = SubElement(clinical_data, "Comment")
         comment.text = "This is an empty template. Actual clinical data will be populated during the study."
+        
+        return clinical_data
     
     def _export_fhir_json(
         self,
@@ -475,9 +683,11 @@ class ProtocolExporter:
         crf_schema: CRFSchema,
         include_protocol: bool,
         include_crf: bool,
+        out: Optional[IO[str]] = None,
     ) -> Dict[str, Any]:
         """Export to FHIR JSON format."""
         
+        now_iso = datetime.now().isoformat()
         resources = []
         
         if include_protocol:
@@ -494,7 +704,7 @@ class ProtocolExporter:
                     }
                 ],
                 "period": {
-                    "start": datetime.now().isoformat(),
+                    "start": now_iso,
                 },
                 "sponsor": {
                     "display": protocol.sponsor
@@ -535,34 +745,9 @@ class ProtocolExporter:
                     "status": "active",
                     "title": form.form_name,
                     "description": form.form_description,
-                    "item": []
+                    "item": [self._questionnaire_item(field) for field in form.fields],
                 }
                 
-                for field in form.fields:
-                    item = {
-                        "linkId": field.field_id,
-                        "text": field.field_label,
-                        "type": self._map_datatype_to_fhir(field.data_type),
-                        "required": field.required,
-                    }
-                    
-                    # Add validation if present
-                    if field.validation_rules:
-                        if "min" in field.validation_rules:
-                            item["extension"] = item.get("extension", [])
-                            item["extension"].append({
-                                "url": "http://hl7.org/fhir/StructureDefinition/minValue",
-                                "valueInteger": field.validation_rules["min"]
-                            })
-                        if "max" in field.validation_rules:
-                            item["extension"] = item.get("extension", [])
-                            item["extension"].append({
-                                "url": "http://hl7.org/fhir/StructureDefinition/maxValue",
-                                "valueInteger": field.validation_rules["max"]
-                            })
-                    
-                    questionnaire["item"].append(item)
-                
                 resources.append(questionnaire)
         
         bundle = {
@@ -571,38 +756,87 @@ class ProtocolExporter:
             "entry": [{"resource": r} for r in resources]
         }
         
+        if ORJSON_AVAILABLE:
+            content = orjson.dumps(bundle, option=orjson.OPT_INDENT_2).decode("utf-8")
+            if out is not None:
+                out.write(content)
+                content = None
+        elif out is not None:
+            json.dump(bundle, out, indent=2)
+            content = None
+        else:
+            content = json.dumps(bundle, indent=2)
+        
         return {
             "format": "fhir_json",
-            "content": json.dumps(bundle, indent=2),
+            "content": content,
             "filename": f"{protocol.protocol_id}_FHIR.json",
         }
     
-    def _export_csv(self, crf_schema: CRFSchema) -> Dict[str, Any]:
+    def _questionnaire_item(self, field: CRFField) -> Dict[str, Any]:
+        """Build a FHIR Questionnaire item for a CRF field."""
+        item = {
+            "linkId": field.field_id,
+            "text": field.field_label,
+            "type": self._map_datatype_to_fhir(field.data_type),
+            "required": field.required,
+        }
+        
+        # Add validation if present
+        rules = field.validation_rules
+        if rules:
+            extensions = []
+            if "min" in rules:
+                extensions.append({
+                    "url": "http://hl7.org/fhir/StructureDefinition/minValue",
+                    "valueInteger": rules["min"]
+                })
+            if "max" in rules:
+                extensions.append({
+                    "url": "http://hl7.org/fhir/StructureDefinition/maxValue",
+                    "valueInteger": rules["max"]
+                })
+            if extensions:
+                item["extension"] = extensions
+        
+        return item
+    
+    def _export_csv(
+        self, crf_schema: CRFSchema, out: Optional[IO[str]] = None
+    ) -> Dict[str, Any]:
         """Export CRF schema to CSV format (data dictionary)."""
         
-        csv_lines = []
+        validation_rules = self._render_validation_rules(crf_schema)
+        buffer = io.StringIO() if out is None else out
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator="\n")
         
         # Header
-        csv_lines.append(
-            "Form ID,Form Name,Field ID,Field Name,Field Label,Data Type,"
-            "Required,CDASH Variable,SDTM Variable,Validation Rules"
+        writer.writerow((
+            "Form ID", "Form Name", "Field ID", "Field Name", "Field Label", "Data Type",
+            "Required", "CDASH Variable", "SDTM Variable", "Validation Rules",
+        ))
+        
+        # Data rows, handed to the C writer as one iterable
+        writer.writerows(
+            (
+                form.form_id,
+                form.form_name,
+                field.field_id,
+                field.field_name,
+                field.field_label,
+                field.data_type,
+                field.required,
+                field.cdash_variable or "",
+                field.sdtm_variable or "",
+                validation_rules[id(field)][0] if field.validation_rules else "",
+            )
+            for form in crf_schema.forms
+            for field in form.fields
         )
         
-        # Data rows
-        for form in crf_schema.forms:
-            for field in form.fields:
-                validation = json.dumps(field.validation_rules) if field.validation_rules else ""
-                
-                csv_lines.append(
-                    f'"{form.form_id}","{form.form_name}","{field.field_id}",'
-                    f'"{field.field_name}","{field.field_label}","{field.data_type}",'
-                    f'"{field.required}","{field.cdash_variable or ""}","'
-                    f'{field.sdtm_variable or ""}","{validation}"'
-                )
-        
         return {
             "format": "csv",
-            "content": "\n".join(csv_lines),
+            "content": buffer.getvalue() if out is None else None,
             "filename": f"{crf_schema.study_id}_DataDictionary.csv",
         }
     
@@ -612,48 +846,76 @@ class ProtocolExporter:
         crf_schema: CRFSchema,
         include_protocol: bool,
         include_crf: bool,
+        out: Optional[IO[str]] = None,
     ) -> Dict[str, Any]:
         """Export to JSON format."""
         
-        export_data = {
-            "export_date": datetime.now().isoformat(),
-            "study_id": protocol.protocol_id,
-        }
+        now_iso = datetime.now().isoformat()
+        
+        # Let pydantic-core serialize the models directly instead of building
+        # an intermediate dict tree for json.dumps to walk again. Nested
+        # documents are re-indented one level (JSON strings never contain raw
+        # newlines, so the replace only touches layout).
+        parts = [
+            f'"export_date": {json.dumps(now_iso)}',
+            f'"study_id": {json.dumps(protocol.protocol_id)}',
+        ]
         
         if include_protocol:
-            export_data["protocol"] = protocol.model_dump()
+            protocol_json = protocol.model_dump_json(indent=2).replace("\n", "\n  ")
+            parts.append(f'"protocol": {protocol_json}')
         
         if include_crf:
-            export_data["crf_schema"] = crf_schema.model_dump()
+            crf_json = crf_schema.model_dump_json(indent=2).replace("\n", "\n  ")
+            parts.append(f'"crf_schema": {crf_json}')
+        
+        if out is not None:
+            out.write("{\n  ")
+            out.write(",\n  ".join(parts))
+            out.write("\n}")
+            content = None
+        else:
+            content = "{\n  " + ",\n  ".join(parts) + "\n}"
         
         return {
             "format": "json",
-            "content": json.dumps(export_data, indent=2, default=str),
+            "content": content,
             "filename": f"{protocol.protocol_id}_Export.json",
         }
     
+    def _render_validation_rules(
+        self, crf_schema: CRFSchema
+    ) -> Dict[int, Tuple[str, str, Optional[str]]]:
+        """
+        Render each field's validation rules once, keyed by id(field).
+        
+        Each value is (JSON text, "key=value" summary, min/max formal
+        expression or None). Fields without rules are omitted.
+        """
+        rendered = {}
+        for form in crf_schema.forms:
+            for field in form.fields:
+                rules = field.validation_rules
+                if not rules:
+                    continue
+                
+                expr_parts = []
+                if "min" in rules:
+                    expr_parts.append(f"value >= {rules['min']}")
+                if "max" in rules:
+                    expr_parts.append(f"value <= {rules['max']}")
+                
+                rendered[id(field)] = (
+                    json.dumps(rules),
+                    ", ".join(f"{key}={value}" for key, value in rules.items()),
+                    " and ".join(expr_parts) if expr_parts else None,
+                )
+        return rendered
+    
     def _map_datatype_to_odm(self, data_type: str) -> str:
         """Map internal data type to ODM data type."""
-        mapping = {
-            "text": "text",
-            "number": "integer",
-            "date": "date",
-            "datetime": "datetime",
-            "dropdown": "text",
-            "checkbox": "text",
-            "radio": "text",
-        }
-        return mapping.get(data_type, "text")
+        return ODM_DATATYPE_MAP.get(data_type, "text")
     
     def _map_datatype_to_fhir(self, data_type: str) -> str:
         """Map internal data type to FHIR Questionnaire item type."""
-        mapping = {
-            "text": "string",
-            "number": "decimal",
-            "date": "date",
-            "datetime": "dateTime",
-            "dropdown": "choice",
-            "checkbox": "choice",
-            "radio": "choice",
-        }
-        return mapping.get(data_type, "string")
+        return FHIR_DATATYPE_MAP.get(data_type, "string")
@@ -1,9 +1,20 @@
 """Template-based protocol and CRF generator with RAG and LLM support."""
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from copy import deepcopy
 from datetime import datetime
-import uuid
+from functools import cached_property
+import json
+import logging
+import os
+import secrets
+import threading
+from config import settings
 from app.models.schemas import (
     TrialSpecInput,
+    TrialEndpoint,
     ProtocolStructured,
     ProtocolSection,
     CRFSchema,
@@ -12,43 +23,318 @@ from app.models.schemas import (
     VisitDefinition,
 )
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from app.services.llm_service import get_llm_service
+    LLM_AVAILABLE = True
+except ImportError:
+    LLM_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of LLM responses kept in the in-process cache
+LLM_CACHE_SIZE = 256
+
+# Similar protocols retrieved per spec; the narrative uses the first two
+RAG_N_RESULTS = 3
+
+# Maximum number of specs whose retrieval results are kept per generator
+RAG_CACHE_SIZE = 64
+
+# Completion budget for LLM visit schedules: tokens per visit, with visits
+# every 4 weeks plus screening, baseline and end of study
+VISIT_TOKENS_PER_VISIT = 40
+VISIT_SCHEDULE_MAX_TOKENS = 800
+
+# Indication-specific guidance for section prompts, by therapeutic area.
+# Prompts for an indication matching an area's keywords carry only that
+# area's guidance; other indications get every area as examples.
+INDICATION_GUIDANCE = {
+    "oncology": {
+        "keywords": ("cancer", "tumor", "tumour", "carcinoma", "oncology", "lymphoma",
+                     "leukemia", "leukaemia", "melanoma", "myeloma", "sarcoma", "glioma"),
+        "visit_timing": "- Cancer trials: Often every 3-4 weeks for tumor assessments",
+        "design_features": "for cancer: response criteria",
+        "assessments": "for cancer: tumor imaging, RECIST",
+    },
+    "dermatology": {
+        "keywords": ("psoriasis", "dermatitis", "eczema", "acne", "urticaria", "vitiligo",
+                     "hidradenitis", "rosacea", "alopecia", "skin"),
+        "visit_timing": "- Dermatology: Often every 2-4 weeks for skin assessments",
+        "design_features": "for dermatology: lesion assessment",
+        "assessments": "for dermatology: lesion counts, photography",
+    },
+    "metabolic": {
+        "keywords": ("diabetes", "diabetic", "glycemic", "obesity", "metabolic",
+                     "dyslipidemia", "hyperlipidemia", "cholesterol"),
+        "visit_timing": "- Metabolic: Often every 4-8 weeks for lab work",
+        "design_features": "for diabetes: glycemic control monitoring",
+        "assessments": "for diabetes: HbA1c, glucose",
+    },
+}
+
+# Reference context block for similar protocols in the narrative
+_RAG_CONTEXT_HEADER = "REFERENCE CONTEXT FROM SIMILAR PROTOCOLS:\n"
+_RAG_CONTEXT_FOOTER = "\n" + "=" * 60 + "\n"
+
+# Maximum concurrent LLM calls when generating assessment CRF forms
+CRF_MAX_CONCURRENT_CALLS = 16
+
+# Maximum assessments whose CRF fields are requested in one LLM call
+CRF_BATCH_SIZE = 8
+
+# Completion budget for CRF fields: 3-6 JSON field objects per assessment,
+# capped for batched calls
+CRF_FIELDS_MAX_TOKENS = 450
+CRF_BATCH_MAX_TOKENS = 2500
+
+# Low temperature keeps CRF field JSON close to deterministic
+CRF_FIELDS_TEMPERATURE = 0.2
+
+# Maximum number of assessment field lists kept in the CRF field cache
+CRF_FIELDS_CACHE_SIZE = 512
+
+# Maximum number of complete CRF schemas (forms and visits) kept in memory
+CRF_SCHEMA_CACHE_SIZE = 64
+
+# Semantic CRF field cache: assessments whose prompt embeddings are within
+# this cosine distance of a cached assessment reuse its fields
+CRF_SEMANTIC_CACHE_MAX_DISTANCE = 0.05
+CRF_SEMANTIC_CACHE_SIZE = 1000
+
+
+def _json_loads(content: str) -> Any:
+    """Parse JSON text with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _parse_json_list(content: str, key: str) -> Optional[List[Any]]:
+    """
+    Extract a JSON list from an LLM response.
+    
+    Accepts a JSON object holding the list under key (JSON mode), a bare
+    JSON array, or an array surrounded by other text.
+    
+    Args:
+        content: LLM response text
+        key: Object key expected to hold the list
+        
+    Returns:
+        The parsed list, or None if none was found
+    """
+    try:
+        data = _json_loads(content)
+    except ValueError:
+        # Fall back to the outermost brackets (linear scan, no backtracking)
+        start, end = content.find("["), content.rfind("]")
+        if start == -1 or end < start:
+            return None
+        try:
+            data = _json_loads(content[start:end + 1])
+        except ValueError:
+            return None
+    
+    if isinstance(data, dict):
+        items = data.get(key)
+        if not isinstance(items, list):
+            # Otherwise take the first list in the object
+            items = next((value for value in data.values() if isinstance(value, list)), None)
+        data = items
+    return data if isinstance(data, list) else None
+
+
+def load_prebuilt_sections(path: str) -> Dict[Tuple[str, str, int], Dict[str, Any]]:
+    """
+    Load LLM sections generated ahead of time for common trial specs.
+    
+    The file is a JSON list of entries with "indication", "phase",
+    "duration_weeks" and a "sections" object; see
+    examples/build_static_sections.py.
+    
+    Args:
+        path: Path to the prebuilt sections JSON file
+        
+    Returns:
+        Sections keyed by (normalized indication, phase, duration in weeks),
+        or an empty dict if the file is missing or invalid
+    """
+    if not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, "rb") as f:
+            entries = _json_loads(f.read())
+        return {
+            (entry["indication"].strip().lower(), entry["phase"], int(entry["duration_weeks"])): entry["sections"]
+            for entry in entries
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.warning("Could not load prebuilt sections from %s: %s", path, e)
+        return {}
+
+
+def _format_similar_protocol(rank: int, protocol: Dict[str, Any]) -> str:
+    """Format one retrieved protocol for the narrative's reference context."""
+    metadata = protocol.get('metadata', {})
+    return (
+        f"\nSimilar Protocol {rank} (Similarity: {protocol.get('similarity_score', 0):.1%}):\n"
+        f"- Phase: {metadata.get('phase', 'N/A')}\n"
+        f"- Indication: {metadata.get('indication', 'N/A')}\n"
+        f"- Design: {metadata.get('design', 'N/A')}\n"
+        f"- Sample Size: {metadata.get('sample_size', 'N/A')}\n"
+        f"- Duration: {metadata.get('duration_weeks', 'N/A')} weeks"
+    )
+
+
+def _normalize_crf_fields(field_dicts: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Coerce LLM field dictionaries to CRFField's field types.
+    
+    Normalized dictionaries can build fields with CRFField.model_construct,
+    skipping per-field validation on every (cached) reuse.
+    
+    Args:
+        field_dicts: Field objects parsed from an LLM reply
+        
+    Returns:
+        Dictionaries holding exactly the CRFField arguments; entries that are
+        not objects are dropped
+    """
+    fields = []
+    for fd in field_dicts:
+        if not isinstance(fd, dict):
+            continue
+        required = fd.get('required', False)
+        if isinstance(required, str):
+            required = required.strip().lower() in ("true", "yes", "y", "1")
+        fields.append({
+            "field_id": str(fd.get('field_id') or f'FIELD_{len(fields)}'),
+            "field_name": str(fd.get('field_name') or 'field'),
+            "field_label": str(fd.get('field_label') or 'Field'),
+            "data_type": str(fd.get('data_type') or 'text'),
+            "required": bool(required),
+        })
+    return fields
+
+
+def _numbered_block(heading: str, items: List[str]) -> str:
+    """Render a heading followed by a numbered, indented list in one string."""
+    return "\n".join([heading, *(f"  {i}. {item}" for i, item in enumerate(items, 1))])
+
+
+def _read_json_stream(stream: Any) -> str:
+    """
+    Accumulate a streamed JSON reply, stopping once the top-level value closes.
+    
+    Brackets are counted outside string literals, so trailing tokens after
+    the closing bracket are never waited for. Leaving the loop closes the
+    stream, which cancels the rest of the completion.
+    
+    Args:
+        stream: Chat completion stream
+        
+    Returns:
+        Reply text up to and including the closing bracket
+    """
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    
+    with closing(stream):
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if not text:
+                continue
+            
+            for i, char in enumerate(text):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == "\\":
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char in "[{":
+                    depth += 1
+                elif char in "]}" and depth > 0:
+                    depth -= 1
+                    if depth == 0:
+                        parts.append(text[:i + 1])
+                        return "".join(parts)
+            parts.append(text)
+    
+    return "".join(parts)
+
 
 class ProtocolTemplateGenerator:
     """Generates protocol content using templates, RAG, and LLM."""
     
-    def __init__(self, use_rag: bool = True, use_llm: bool = True):
+    # LLM responses keyed by section and trial spec, shared by all instances
+    _llm_cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+    _llm_cache_lock = threading.Lock()
+    
+    def __init__(self, use_rag: bool = True, use_llm: bool = True, batch_llm: bool = True):
         """
         Initialize the generator with standard templates.
         
         Args:
             use_rag: Whether to use RAG for retrieval-augmented generation
             use_llm: Whether to use LLM for enhanced content generation
+            batch_llm: Whether to request all LLM sections in a single call
         """
         self.templates = self._load_templates()
         self.use_rag = use_rag
         self.use_llm = use_llm
-        self.rag_service = None
-        self.llm_service = None
-        
-        # Initialize RAG
-        if use_rag:
-            try:
-                from app.services.rag_service import get_rag_service
-                self.rag_service = get_rag_service()
-                print("✓ RAG enabled for protocol generation")
-            except Exception as e:
-                print(f"⚠ RAG initialization failed: {e}. Falling back to template-only mode.")
-                self.use_rag = False
-        
-        # Initialize LLM
-        if use_llm:
-            try:
-                from app.services.llm_service import get_llm_service
-                self.llm_service = get_llm_service()
-                print("✓ LLM enabled for AI-enhanced protocol generation")
-            except Exception as e:
-                print(f"⚠ LLM initialization failed: {e}. Falling back to template-only mode.")
-                self.use_llm = False
+        self.batch_llm = batch_llm
+        self._rag_cache: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self._rag_cache_lock = threading.Lock()
+        self._indication_guidance_cache: Dict[str, Dict[str, str]] = {}
+        self._static_library = load_prebuilt_sections(settings.llm_static_sections_path)
+    
+    @cached_property
+    def rag_service(self):
+        """RAG service, imported and initialized on first use."""
+        if not self.use_rag:
+            return None
+        try:
+            from app.services.rag_service import get_rag_service
+            rag_service = get_rag_service()
+            logger.info("RAG enabled for protocol generation")
+            return rag_service
+        except Exception as e:
+            logger.warning("RAG initialization failed: %s. Falling back to template-only mode.", e)
+            self.use_rag = False
+            return None
+    
+    @cached_property
+    def llm_service(self):
+        """LLM service, initialized on first use."""
+        if not self.use_llm:
+            return None
+        if not LLM_AVAILABLE:
+            logger.warning("LLM client library is not installed. Falling back to template-only mode.")
+            self.use_llm = False
+            return None
+        try:
+            llm_service = get_llm_service()
+            logger.info("LLM enabled for AI-enhanced protocol generation")
+            return llm_service
+        except Exception as e:
+            logger.warning("LLM initialization failed: %s. Falling back to template-only mode.", e)
+            self.use_llm = False
+            return None
     
     def _load_templates(self) -> Dict[str, Any]:
         """Load protocol section templates."""
@@ -75,28 +361,124 @@ Background and Rationale
 {indication} is a significant health concern requiring effective therapeutic interventions.
 This study aims to evaluate {title} with the goal of demonstrating clinical benefit.
 """,
+            # LLM section prompts; fields are filled per request with format_map
+            "prompts": {
+                "all_sections": """Generate the following protocol sections. Make every section SPECIFIC to {indication}.
+
+[SEC1] objectives: primary objective (clear, measurable) and 2-3 secondary objectives covering safety, tolerability and additional efficacy.
+[SEC2] inclusion_criteria: 6-10 specific, measurable inclusion criteria (age, diagnosis, consent, clinical parameters).
+[SEC3] exclusion_criteria: 4-8 exclusion criteria covering contraindications, safety concerns and confounding factors.
+[SEC4] study_design: 2-4 sentences covering study type, indication-specific design features, treatment arms and assessment approaches.
+[SEC5] endpoint_descriptions: for each endpoint below, 1-2 sentences on what is measured, how it is assessed and its clinical relevance.
+{endpoint_lines}{objective_examples}{endpoint_examples}
+[SEC6] visit_schedule: visits from Screening through Week {duration_weeks} with timing appropriate for {indication}.
+[SEC7] assessments: standard assessments (Demographics, Vital Signs, Adverse Events, Labs) plus indication-specific assessments.
+
+Return ONLY a JSON object with this exact format:
+{{
+    "objectives": {{"primary": "...", "secondary": "..."}},
+    "inclusion_criteria": ["Criterion 1", "..."],
+    "exclusion_criteria": ["Criterion 1", "..."],
+    "study_design": "...",
+    "endpoint_descriptions": {{"<endpoint name>": "..."}},
+    "visit_schedule": [{{"visit_id": "V0", "visit_name": "Screening", "week": -1, "window": "±3 days"}}],
+    "assessments": [{{"assessment_id": "DEMO", "name": "Demographics", "description": "...", "timing": ["Screening"]}}]
+}}""",
+                "study_design": """Generate a detailed, professional study design description that is SPECIFIC to {indication}.
+
+CRITICAL: Make this design description SPECIFIC to {indication}. Include:
+1. Standard study type elements (randomized, controlled, blinding)
+2. Indication-specific design features (e.g., {design_features})
+3. Treatment groups/arms with indication-relevant details
+4. Any unique design elements typical for {indication} trials
+5. Specific assessment or measurement approaches used in {indication} studies
+
+Generate 2-4 sentences that would make it CLEAR this is for {indication} and not another disease.
+Return ONLY the design description, no additional commentary.""",
+                "endpoint": """Generate a detailed, professional endpoint description.
+
+Endpoint Information:
+- Type: {endpoint_type}
+- Name: {endpoint_name}
+- Indication: {indication}
+- Timepoint: {timepoint}
+{endpoint_examples}
+
+Generate a clear, specific endpoint description (1-2 sentences) that explains:
+1. What is being measured
+2. How it will be assessed
+3. Clinical relevance
+
+Return ONLY the endpoint description, no additional commentary.""",
+                "endpoints": """Generate detailed, professional endpoint descriptions for a {indication} trial.
+
+Endpoints:
+{endpoint_lines}
+{endpoint_examples}
+
+For each endpoint, generate a clear, specific description (1-2 sentences) that explains:
+1. What is being measured
+2. How it will be assessed
+3. Clinical relevance
+
+Return ONLY a JSON object mapping each endpoint name to its description:
+{{"descriptions": {{"<endpoint name>": "..."}}}}""",
+                "visit_schedule": """Generate a visit schedule with appropriate timing for {indication} studies. Return ONLY a JSON object with a "visits" array of visit objects.
+Each visit should have: visit_id, visit_name, week, window.
+
+Example format:
+{{"visits": [
+  {{"visit_id": "V0", "visit_name": "Screening", "week": -1, "window": "±3 days"}},
+  {{"visit_id": "V1", "visit_name": "Baseline", "week": 0, "window": "Day 1"}},
+  {{"visit_id": "V2", "visit_name": "Week 4", "week": 4, "window": "±7 days"}}
+]}}
+
+CRITICAL: Make timing appropriate for {indication}:
+{visit_timing}
+- Generate visits from Screening through Week {duration_weeks}
+
+Return ONLY the JSON object, no other text.""",
+                "assessments": """Generate assessments appropriate for {indication} trials. Include:
+1. Standard assessments (Demographics, Vital Signs, Adverse Events, Labs)
+2. Indication-specific assessments (e.g., {assessments})
+
+Return ONLY a JSON object with an "assessments" array of assessment objects.
+Each assessment should have: assessment_id, name, description, timing.
+
+Example format:
+{{"assessments": [
+  {{"assessment_id": "DEMO", "name": "Demographics", "description": "Participant demographics", "timing": ["Screening"]}},
+  {{"assessment_id": "TUMOR", "name": "Tumor Assessment", "description": "CT/MRI per RECIST 1.1", "timing": ["Baseline", "Week 8", "Week 16"]}}
+]}}
+
+CRITICAL: Make assessments SPECIFIC to {indication}. 
+Return ONLY the JSON object, no other text.""",
+            },
         }
     
     def generate_protocol_narrative(self, spec: TrialSpecInput) -> str:
         """Generate human-readable protocol narrative with RAG enhancement."""
+        today = datetime.now().date().isoformat()
         sections = []
         
         # Get similar protocols if RAG is enabled
         rag_context = ""
         if self.use_rag and self.rag_service:
             try:
-                similar_protocols = self.rag_service.retrieve_similar_protocols(spec, n_results=2)
+                similar_protocols = self._retrieve_similar_protocols(spec)[:2]
                 if similar_protocols:
                     rag_context = self._generate_rag_context(similar_protocols)
                     sections.append(f"<!-- RAG Context: Found {len(similar_protocols)} similar protocol(s) -->")
             except Exception as e:
-                print(f"⚠ RAG retrieval error: {e}")
+                logger.warning("RAG retrieval error: %s", e)
         
         # Title Page
-        sections.append(f"CLINICAL TRIAL PROTOCOL\n\n{spec.title}\n")
-        sections.append(f"Protocol Version: 1.0")
-        sections.append(f"Sponsor: {spec.sponsor}")
-        sections.append(f"Date: {datetime.now().strftime('%Y-%m-%d')}\n")
+        sections.append(
+            f"CLINICAL TRIAL PROTOCOL\n\n{spec.title}\n\n"
+            f"Protocol Version: 1.0\n"
+            f"Sponsor: {spec.sponsor}\n"
+            f"Date: {today}\n"
+        )
         
         # Add RAG insights if available
         if rag_context:
@@ -122,112 +504,61 @@ This study aims to evaluate {title} with the goal of demonstrating clinical bene
         sections.append(background)
         
         # Objectives and Endpoints
-        sections.append("\nStudy Objectives and Endpoints\n")
-        sections.append("\nPrimary Objective:")
-        sections.append(self.templates["objectives"]["primary"].format(indication=spec.indication))
-        
-        sections.append("\n\nEndpoints:")
-        for endpoint in spec.key_endpoints:
-            sections.append(f"- {endpoint.type.value.upper()}: {endpoint.name}")
+        sections.append(
+            "\nStudy Objectives and Endpoints\n\n"
+            "\nPrimary Objective:\n"
+            + self.templates["objectives"]["primary"].format(indication=spec.indication)
+        )
+        sections.append("\n".join([
+            "\n\nEndpoints:",
+            *(f"- {endpoint.type.value.upper()}: {endpoint.name}" for endpoint in spec.key_endpoints),
+        ]))
         
         # Study Design
-        sections.append(f"\n\nStudy Design\n")
-        sections.append(f"This is a {spec.design} study.")
+        design = f"\n\nStudy Design\n\nThis is a {spec.design} study."
         if spec.treatment_arms:
-            sections.append(f"\nTreatment Arms:")
-            for i, arm in enumerate(spec.treatment_arms, 1):
-                sections.append(f"  {i}. {arm}")
+            design += "\n" + _numbered_block("\nTreatment Arms:", spec.treatment_arms)
+        sections.append(design)
         
         # Study Population
-        sections.append(f"\n\nStudy Population\n")
-        sections.append(f"Target enrollment: {spec.sample_size} participants")
+        population = f"\n\nStudy Population\n\nTarget enrollment: {spec.sample_size} participants"
         if spec.age_range:
-            sections.append(f"Age range: {spec.age_range}")
-        
-        sections.append("\nInclusion Criteria:")
-        for i, criterion in enumerate(spec.inclusion_criteria, 1):
-            sections.append(f"  {i}. {criterion}")
-        
-        sections.append("\nExclusion Criteria:")
-        for i, criterion in enumerate(spec.exclusion_criteria, 1):
-            sections.append(f"  {i}. {criterion}")
+            population += f"\nAge range: {spec.age_range}"
+        sections.append(population)
+        sections.append(_numbered_block("\nInclusion Criteria:", spec.inclusion_criteria))
+        sections.append(_numbered_block("\nExclusion Criteria:", spec.exclusion_criteria))
         
         # Study Duration
-        sections.append(f"\n\nStudy Duration and Schedule\n")
-        sections.append(f"Total study duration: {spec.duration_weeks} weeks per participant")
+        sections.append(
+            f"\n\nStudy Duration and Schedule\n\n"
+            f"Total study duration: {spec.duration_weeks} weeks per participant"
+        )
         
         # Statistical Considerations
-        sections.append(f"\n\nStatistical Considerations\n")
-        sections.append(f"Sample Size: {spec.sample_size} participants")
-        sections.append("Statistical analysis will be performed on the intent-to-treat (ITT) population.")
+        sections.append(
+            f"\n\nStatistical Considerations\n\n"
+            f"Sample Size: {spec.sample_size} participants\n"
+            "Statistical analysis will be performed on the intent-to-treat (ITT) population."
+        )
         
         # Safety Monitoring
-        sections.append("\n\nSafety Monitoring\n")
-        sections.append("Adverse events will be monitored throughout the study and graded according to CTCAE v5.0.")
-        sections.append("A Data Safety Monitoring Board (DSMB) will review safety data periodically.")
+        sections.append(
+            "\n\nSafety Monitoring\n\n"
+            "Adverse events will be monitored throughout the study and graded according to CTCAE v5.0.\n"
+            "A Data Safety Monitoring Board (DSMB) will review safety data periodically."
+        )
         
         return "\n".join(sections)
     
     def generate_structured_protocol(self, spec: TrialSpecInput) -> ProtocolStructured:
         """Generate structured protocol JSON with RAG enhancement."""
-        protocol_id = f"PROT-{uuid.uuid4().hex[:8].upper()}"
-        
-        # Track what was enhanced by LLM
-        llm_enhanced_sections = []
+        protocol_id = f"PROT-{secrets.token_hex(4).upper()}"
+        generated_at = datetime.now()
         
         # Get similar protocols for enhanced generation
-        similar_protocols = []
-        generation_method = "template_based"
-        templates_used = ["standard_protocol_v1"]
-        
-        if self.use_rag and self.rag_service:
-            try:
-                similar_protocols = self.rag_service.retrieve_similar_protocols(spec, n_results=3)
-                if similar_protocols:
-                    generation_method = "rag_enhanced"
-                    templates_used.append("rag_retrieved_examples")
-                    print(f"✓ Using {len(similar_protocols)} similar protocol(s) for enhanced generation")
-            except Exception as e:
-                print(f"⚠ RAG retrieval error: {e}")
-        
-        # Track if LLM is being used
-        if self.use_llm and self.llm_service:
-            generation_method = "llm_enhanced" if similar_protocols else "llm_only"
-        
-        # Generate objectives (enhanced with RAG if available)
-        objectives = self._generate_objectives(spec, similar_protocols)
-        if self.use_llm and self.llm_service:
-            llm_enhanced_sections.append("objectives")
-        
-        # Generate inclusion criteria (enhanced with LLM if available)
-        inclusion_criteria = self._generate_inclusion_criteria(spec, similar_protocols)
-        if self.use_llm and self.llm_service:
-            llm_enhanced_sections.append("inclusion_criteria")
-        
-        # Generate exclusion criteria (enhanced with LLM if available)
-        exclusion_criteria = self._generate_exclusion_criteria(spec, similar_protocols)
-        if self.use_llm and self.llm_service:
-            llm_enhanced_sections.append("exclusion_criteria")
-        
-        # Generate enhanced study design (enhanced with LLM if available)
-        study_design = self._generate_study_design(spec, similar_protocols)
-        if self.use_llm and self.llm_service:
-            llm_enhanced_sections.append("study_design")
-        
-        # Format endpoints (enhanced with LLM if available)
-        endpoints = self._generate_endpoints(spec, similar_protocols)
-        if self.use_llm and self.llm_service:
-            llm_enhanced_sections.append("endpoints")
+        similar_protocols = self._retrieve_for_generation(spec)
         
-        # Generate visit schedule (indication-specific if LLM available)
-        visit_schedule = self._generate_visit_schedule(spec, similar_protocols)
-        if self.use_llm and self.llm_service:
-            llm_enhanced_sections.append("visit_schedule")
-        
-        # Generate assessments (indication-specific if LLM available)
-        assessments = self._generate_assessments(spec, similar_protocols)
-        if self.use_llm and self.llm_service:
-            llm_enhanced_sections.append("assessments")
+        llm_enabled = bool(self.use_llm and self.llm_service)
         
         # Statistical plan
         statistical_plan = {
@@ -245,20 +576,74 @@ This study aims to evaluate {title} with the goal of demonstrating clinical bene
             "interim_analyses": ["25%", "50%", "75%"],
         }
         
+        generation_method = "template_based"
+        templates_used = ["standard_protocol_v1"]
+        if similar_protocols:
+            generation_method = "rag_enhanced"
+            templates_used.append("rag_retrieved_examples")
+        
+        rag_snippets = self._format_rag_snippets(similar_protocols)
+        
+        # Track if LLM is being used
+        batched = {}
+        if llm_enabled:
+            generation_method = "llm_enhanced" if similar_protocols else "llm_only"
+            
+            # One request for every section; anything missing is generated
+            # by its own call below
+            if self.batch_llm:
+                batched = self._generate_all_sections_batched(spec, similar_protocols, rag_snippets)
+        
+        # The remaining sections are independent of each other, so their
+        # LLM calls are issued concurrently
+        section_builders = {
+            "objectives": lambda: self._generate_objectives(spec, similar_protocols),
+            "inclusion_criteria": lambda: self._generate_inclusion_criteria(spec, similar_protocols),
+            "exclusion_criteria": lambda: self._generate_exclusion_criteria(spec, similar_protocols),
+            "study_design": lambda: self._generate_study_design(
+                spec, similar_protocols, rag_snippets
+            ),
+            "endpoints": lambda: self._generate_endpoints(
+                spec, similar_protocols, batched.get("endpoint_descriptions"), rag_snippets
+            ),
+            "visit_schedule": lambda: self._generate_visit_schedule(
+                spec, similar_protocols, rag_snippets
+            ),
+            "assessments": lambda: self._generate_assessments(
+                spec, similar_protocols, rag_snippets
+            ),
+        }
+        # Batched sections came from the LLM; builders report whether they used it
+        results = {name: (value, True) for name, value in batched.items()}
+        results.update(self._run_section_builders({
+            name: build for name, build in section_builders.items() if not batched.get(name)
+        }))
+        
+        objectives, _ = results["objectives"]
+        inclusion_criteria, _ = results["inclusion_criteria"]
+        exclusion_criteria, _ = results["exclusion_criteria"]
+        study_design, _ = results["study_design"]
+        endpoints, _ = results["endpoints"]
+        visit_schedule, _ = results["visit_schedule"]
+        assessments, _ = results["assessments"]
+        
+        # Only sections whose content actually came from the LLM
+        llm_enhanced_sections = [name for name in section_builders if results[name][1]]
+        
         # Generate narrative sections
         sections = self._generate_protocol_sections(spec, objectives, similar_protocols)
         
         # Calculate average RAG similarity if protocols were retrieved
         rag_avg_similarity = None
         if similar_protocols:
-            similarities = [p.get('similarity_score', 0) for p in similar_protocols if p.get('similarity_score') is not None]
-            if similarities:
-                rag_avg_similarity = sum(similarities) / len(similarities)
+            scores = [p['similarity_score'] for p in similar_protocols if p.get('similarity_score') is not None]
+            if scores:
+                rag_avg_similarity = sum(scores) / len(scores)
         
         return ProtocolStructured(
             protocol_id=protocol_id,
             version="1.0",
-            generated_at=datetime.now(),
+            generated_at=generated_at,
             sponsor=spec.sponsor,
             title=spec.title,
             short_title=spec.short_title or spec.title[:50],
@@ -283,12 +668,105 @@ This study aims to evaluate {title} with the goal of demonstrating clinical bene
             llm_enhanced_sections=llm_enhanced_sections if llm_enhanced_sections else None,
         )
     
+    def _run_section_builders(self, builders: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """
+        Run independent section builders, concurrently when they call the LLM.
+        
+        Args:
+            builders: Zero-argument section builders keyed by section name
+            
+        Returns:
+            Dictionary of section results keyed by section name
+        """
+        if not (self.use_llm and self.llm_service) or len(builders) < 2:
+            return {name: build() for name, build in builders.items()}
+        
+        # The OpenAI client is thread-safe and each call is network-bound
+        with ThreadPoolExecutor(max_workers=len(builders)) as pool:
+            futures = {name: pool.submit(build) for name, build in builders.items()}
+            return {name: future.result() for name, future in futures.items()}
+    
+    def _generate_all_sections_batched(
+        self,
+        spec: TrialSpecInput,
+        similar_protocols: List[Dict[str, Any]],
+        rag_snippets: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate every LLM-enhanced section with a single request.
+        
+        The trial context and RAG examples are sent once instead of once per
+        section. Sections missing or malformed in the response are left out
+        so the caller can generate them individually.
+        
+        Args:
+            spec: Trial specification
+            similar_protocols: Similar protocols from RAG
+            rag_snippets: Pre-formatted RAG examples from _format_rag_snippets
+            
+        Returns:
+            Dictionary of the sections that were generated
+        """
+        cache_key = self._llm_cache_key("all_sections", spec, similar_protocols)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        rag_snippets = rag_snippets or self._format_rag_snippets(similar_protocols)
+        
+        endpoint_lines = "\n".join(
+            f"- {ep.type.value}: {ep.name} (Timepoint: {ep.measurement_timepoint})"
+            for ep in spec.key_endpoints
+            if not ep.description or len(ep.description) < 50
+        )
+        
+        prompt = self.templates["prompts"]["all_sections"].format_map({
+            **self._prompt_context(spec),
+            "endpoint_lines": endpoint_lines or "- (none)",
+            "objective_examples": rag_snippets["objectives"],
+            "endpoint_examples": "".join(rag_snippets["endpoints"].values()),
+        })
+        
+        try:
+            response = self.llm_service.client.chat.completions.create(
+                model=self.llm_service.model,
+                messages=self._build_llm_messages(spec, rag_snippets, prompt),
+                temperature=0.5,
+                max_tokens=4000,
+                response_format={"type": "json_object"},
+            )
+            result = _json_loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.warning("Batched LLM generation failed: %s. Generating sections individually.", e)
+            return {}
+        
+        # Keep only well-formed sections
+        expected_types = {
+            "objectives": dict,
+            "inclusion_criteria": list,
+            "exclusion_criteria": list,
+            "study_design": str,
+            "endpoint_descriptions": dict,
+            "visit_schedule": list,
+            "assessments": list,
+        }
+        sections = {
+            name: result[name]
+            for name, expected_type in expected_types.items()
+            if isinstance(result.get(name), expected_type) and result[name]
+        }
+        
+        logger.info("Generated %s of %s sections in one LLM call", len(sections), len(expected_types))
+        if len(sections) == len(expected_types):
+            self._cache_response(cache_key, sections)
+        return sections
+    
     def _generate_objectives(
         self,
         spec: TrialSpecInput,
         similar_protocols: List[Dict[str, Any]]
-    ) -> Dict[str, str]:
-        """Generate objectives, enhanced with LLM if available."""
+    ) -> Tuple[Dict[str, str], bool]:
+        """Generate objectives, enhanced with LLM if available; also reports whether the LLM was used."""
         
         # Use LLM if available
         if self.use_llm and self.llm_service:
@@ -302,12 +780,13 @@ This study aims to evaluate {title} with the goal of demonstrating clinical bene
                 objectives = self.llm_service.generate_objectives(
                     trial_spec=trial_spec_dict,
                     rag_context=similar_protocols,
-                    additional_instructions=spec.additional_instructions
+                    additional_instructions=spec.additional_instructions,
+                    use_defaults=False,
                 )
-                print("✓ Objectives generated using LLM")
-                return objectives
+                logger.info("Objectives generated using LLM")
+                return objectives, True
             except Exception as e:
-                print(f"⚠ LLM objective generation failed: {e}. Using template fallback.")
+                logger.warning("LLM objective generation failed: %s. Using template fallback.", e)
         
         # Template fallback
         objectives = {
@@ -326,14 +805,14 @@ This study aims to evaluate {title} with the goal of demonstrating clinical bene
             # In template mode, we keep the base template
             # LLM mode would blend these examples
         
-        return objectives
+        return objectives, False
     
     def _generate_inclusion_criteria(
         self,
         spec: TrialSpecInput,
         similar_protocols: List[Dict[str, Any]]
-    ) -> List[str]:
-        """Generate inclusion criteria, enhanced with LLM if available."""
+    ) -> Tuple[List[str], bool]:
+        """Generate inclusion criteria, enhanced with LLM if available; also reports whether the LLM was used."""
         
         # Use LLM if available
         if self.use_llm and self.llm_service:
@@ -346,30 +825,31 @@ This study aims to evaluate {title} with the goal of demonstrating clinical bene
                 criteria = self.llm_service.generate_inclusion_criteria(
                     trial_spec=trial_spec_dict,
                     rag_context=similar_protocols,
-                    additional_instructions=spec.additional_instructions
+                    additional_instructions=spec.additional_instructions,
+                    use_defaults=False,
                 )
-                print("✓ Inclusion criteria generated using LLM")
-                return criteria
+                logger.info("Inclusion criteria generated using LLM")
+                return criteria, True
             except Exception as e:
-                print(f"⚠ LLM inclusion criteria generation failed: {e}. Using input fallback.")
+                logger.warning("LLM inclusion criteria generation failed: %s. Using input fallback.", e)
         
         # Fallback to user input or generic template
         if spec.inclusion_criteria:
-            return spec.inclusion_criteria
+            return spec.inclusion_criteria, False
         
         # Generic template fallback
-        return [
+        return ([
             f"Adults aged 18-75 years with confirmed {spec.indication}",
             "Willing and able to provide informed consent",
             "Adequate organ function as defined by laboratory values",
-        ]
+        ], False)
     
     def _generate_exclusion_criteria(
         self,
         spec: TrialSpecInput,
         similar_protocols: List[Dict[str, Any]]
-    ) -> List[str]:
-        """Generate exclusion criteria, enhanced with LLM if available."""
+    ) -> Tuple[List[str], bool]:
+        """Generate exclusion criteria, enhanced with LLM if available; also reports whether the LLM was used."""
         
         # Use LLM if available
         if self.use_llm and self.llm_service:
@@ -382,94 +862,100 @@ This study aims to evaluate {title} with the goal of demonstrating clinical bene
                 criteria = self.llm_service.generate_exclusion_criteria(
                     trial_spec=trial_spec_dict,
                     rag_context=similar_protocols,
-                    additional_instructions=spec.additional_instructions
+                    additional_instructions=spec.additional_instructions,
+                    use_defaults=False,
                 )
-                print("✓ Exclusion criteria generated using LLM")
-                return criteria
+                logger.info("Exclusion criteria generated using LLM")
+                return criteria, True
             except Exception as e:
-                print(f"⚠ LLM exclusion criteria generation failed: {e}. Using input fallback.")
+                logger.warning("LLM exclusion criteria generation failed: %s. Using input fallback.", e)
         
         # Fallback to user input or generic template
         if spec.exclusion_criteria:
-            return spec.exclusion_criteria
+            return spec.exclusion_criteria, False
         
         # Generic template fallback
-        return [
+        return ([
             "Pregnant or breastfeeding women",
             "Known hypersensitivity to study drug or excipients",
             "Severe comorbid conditions that would interfere with study participation",
-        ]
+        ], False)
     
     def _generate_study_design(
         self,
         spec: TrialSpecInput,
-        similar_protocols: List[Dict[str, Any]]
-    ) -> str:
-        """Generate enhanced study design description."""
+        similar_protocols: List[Dict[str, Any]],
+        rag_snippets: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, bool]:
+        """Generate enhanced study design description; also reports whether the LLM was used."""
         
         # Use LLM if available to enhance the design description
         if self.use_llm and self.llm_service:
+            prebuilt = self._get_prebuilt_section("study_design", spec)
+            if prebuilt is not None:
+                return prebuilt, True
+            
+            cache_key = self._llm_cache_key("study_design", spec, similar_protocols)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached, True
+            
             try:
-                # Build context from similar protocols
-                rag_design_examples = ""
-                if similar_protocols:
-                    rag_design_examples = "\n\nSimilar Study Designs:\n"
-                    for i, protocol in enumerate(similar_protocols[:2], 1):
-                        metadata = protocol.get('metadata', {})
-                        design = metadata.get('design', 'N/A')
-                        rag_design_examples += f"{i}. {design}\n"
-                
-                # Add user instructions if provided
-                user_instructions = ""
-                if spec.additional_instructions:
-                    user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{spec.additional_instructions}\n"
+                rag_snippets = rag_snippets or self._format_rag_snippets(similar_protocols)
                 
-                prompt = f"""You are an expert clinical trial protocol writer specializing in {spec.indication}. Generate a detailed, professional study design description that is SPECIFIC to this indication.
-
-Trial Specification:
-- Phase: {spec.phase.value}
-- Indication: {spec.indication}
-- Basic Design: {spec.design}
-- Sample Size: {spec.sample_size}
-- Duration: {spec.duration_weeks} weeks
-- Treatment Arms: {', '.join(spec.treatment_arms or ['Intervention', 'Control'])}
-{rag_design_examples}{user_instructions}
-
-CRITICAL: Make this design description SPECIFIC to {spec.indication}. Include:
-1. Standard study type elements (randomized, controlled, blinding)
-2. Indication-specific design features (e.g., for cancer: response criteria, for dermatology: lesion assessment, for diabetes: glycemic control monitoring)
-3. Treatment groups/arms with indication-relevant details
-4. Any unique design elements typical for {spec.indication} trials
-5. Specific assessment or measurement approaches used in {spec.indication} studies
-
-Generate 2-4 sentences that would make it CLEAR this is for {spec.indication} and not another disease.
-Return ONLY the design description, no additional commentary."""
+                prompt = self.templates["prompts"]["study_design"].format_map(self._prompt_context(spec))
 
                 response = self.llm_service.client.chat.completions.create(
                     model=self.llm_service.model,
-                    messages=[{"role": "user", "content": prompt}],
+                    messages=self._build_llm_messages(spec, rag_snippets, prompt),
                     temperature=0.7,
                     max_tokens=300,
                 )
                 
                 enhanced_design = response.choices[0].message.content.strip()
-                print("✓ Study design enhanced using LLM")
-                return enhanced_design
+                logger.info("Study design enhanced using LLM")
+                self._cache_response(cache_key, enhanced_design)
+                return enhanced_design, True
                 
             except Exception as e:
-                print(f"⚠ LLM study design enhancement failed: {e}. Using input fallback.")
+                logger.warning("LLM study design enhancement failed: %s. Using input fallback.", e)
         
         # Fallback to basic input description
-        return spec.design
+        return spec.design, False
     
     def _generate_endpoints(
         self,
         spec: TrialSpecInput,
-        similar_protocols: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Generate enhanced endpoint descriptions."""
+        similar_protocols: List[Dict[str, Any]],
+        enhanced_descriptions: Optional[Dict[str, str]] = None,
+        rag_snippets: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Generate enhanced endpoint descriptions.
+        
+        Args:
+            spec: Trial specification
+            similar_protocols: Similar protocols from RAG
+            enhanced_descriptions: LLM descriptions already generated, by endpoint name
+            rag_snippets: Pre-formatted RAG examples from _format_rag_snippets
+            
+        Returns:
+            List of endpoint dictionaries, and whether any description came from the LLM
+        """
         
         endpoints = []
+        enhanced_descriptions = dict(enhanced_descriptions or {})
+        used_llm = False
+        
+        # Enhance generic descriptions that were not already generated
+        pending = [
+            ep for ep in spec.key_endpoints
+            if self._needs_endpoint_enhancement(ep) and not enhanced_descriptions.get(ep.name)
+        ]
+        if pending and self.use_llm and self.llm_service:
+            enhanced_descriptions.update(
+                self._enhance_endpoint_descriptions(spec, similar_protocols, pending, rag_snippets)
+            )
         
         for ep in spec.key_endpoints:
             endpoint_dict = {
@@ -479,132 +965,211 @@ Return ONLY the design description, no additional commentary."""
                 "timepoint": ep.measurement_timepoint,
             }
             
-            # Enhance description with LLM if available and description is generic
-            if self.use_llm and self.llm_service and (not ep.description or len(ep.description) < 50):
-                try:
-                    # Build context from similar endpoints
-                    rag_endpoint_examples = ""
-                    if similar_protocols:
-                        rag_endpoint_examples = "\n\nSimilar Endpoint Examples:\n"
-                        for i, protocol in enumerate(similar_protocols[:2], 1):
-                            if 'protocol' in protocol and 'endpoints' in protocol['protocol']:
-                                endpoints_list = protocol['protocol']['endpoints']
-                                for similar_ep in endpoints_list[:2]:
-                                    if similar_ep.get('type') == ep.type.value:
-                                        rag_endpoint_examples += f"- {similar_ep.get('name', 'N/A')}: {similar_ep.get('description', 'N/A')}\n"
-                    
-                    prompt = f"""You are an expert clinical trial protocol writer. Generate a detailed, professional endpoint description.
-
-Endpoint Information:
-- Type: {ep.type.value}
-- Name: {ep.name}
-- Indication: {spec.indication}
-- Timepoint: {ep.measurement_timepoint}
-{rag_endpoint_examples}
-
-Generate a clear, specific endpoint description (1-2 sentences) that explains:
-1. What is being measured
-2. How it will be assessed
-3. Clinical relevance
-
-Return ONLY the endpoint description, no additional commentary."""
-
-                    response = self.llm_service.client.chat.completions.create(
-                        model=self.llm_service.model,
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.7,
-                        max_tokens=200,
-                    )
-                    
-                    enhanced_description = response.choices[0].message.content.strip()
-                    endpoint_dict["description"] = enhanced_description
-                    
-                except Exception as e:
-                    print(f"⚠ LLM endpoint enhancement failed: {e}. Using original.")
+            if self._needs_endpoint_enhancement(ep) and enhanced_descriptions.get(ep.name):
+                endpoint_dict["description"] = enhanced_descriptions[ep.name]
+                used_llm = True
             
             endpoints.append(endpoint_dict)
         
         if endpoints:
-            print(f"✓ Generated {len(endpoints)} endpoint(s)")
+            logger.info("Generated %s endpoint(s)", len(endpoints))
         
-        return endpoints
+        return endpoints, used_llm
     
-    def _generate_visit_schedule(
+    @staticmethod
+    def _needs_endpoint_enhancement(ep: TrialEndpoint) -> bool:
+        """Whether an endpoint description is missing or too generic to keep."""
+        return not ep.description or len(ep.description) < 50
+    
+    def _enhance_endpoint_descriptions(
         self,
         spec: TrialSpecInput,
-        similar_protocols: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Generate visit schedule, enhanced with LLM for indication-specific timing."""
+        similar_protocols: List[Dict[str, Any]],
+        pending: List[TrialEndpoint],
+        rag_snippets: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
+        """
+        Generate LLM descriptions for several endpoints in one request.
         
-        # Use LLM for indication-specific visit timing if available
-        if self.use_llm and self.llm_service:
-            try:
-                # Build context from similar protocols
-                rag_visit_examples = ""
-                if similar_protocols:
-                    rag_visit_examples = "\n\nSimilar Protocol Visit Schedules:\n"
-                    for i, protocol in enumerate(similar_protocols[:2], 1):
-                        if 'protocol' in protocol and 'visit_schedule' in protocol['protocol']:
-                            visits = protocol['protocol']['visit_schedule']
-                            visit_summary = [f"Week {v.get('week', '?')}" for v in visits[:5]]
-                            rag_visit_examples += f"{i}. Visits at: {', '.join(visit_summary)}\n"
-                
-                # Add user instructions if provided
-                user_instructions = ""
-                if spec.additional_instructions:
-                    user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{spec.additional_instructions}\n"
-                
-                prompt = f"""You are an expert clinical trial protocol writer specializing in {spec.indication}. Generate a visit schedule appropriate for this trial.
-
-Trial Specification:
-- Phase: {spec.phase.value}
-- Indication: {spec.indication}
-- Duration: {spec.duration_weeks} weeks
-- Sample Size: {spec.sample_size}
-{rag_visit_examples}{user_instructions}
-
-Generate a visit schedule with appropriate timing for {spec.indication} studies. Return ONLY a JSON array of visit objects.
-Each visit should have: visit_id, visit_name, week, window.
-
-Example format:
-[
-  {{"visit_id": "V0", "visit_name": "Screening", "week": -1, "window": "±3 days"}},
-  {{"visit_id": "V1", "visit_name": "Baseline", "week": 0, "window": "Day 1"}},
-  {{"visit_id": "V2", "visit_name": "Week 4", "week": 4, "window": "±7 days"}}
-]
-
-CRITICAL: Make timing appropriate for {spec.indication}:
-- Cancer trials: Often every 3-4 weeks for tumor assessments
-- Dermatology: Often every 2-4 weeks for skin assessments
-- Metabolic: Often every 4-8 weeks for lab work
-- Generate visits from Screening through Week {spec.duration_weeks}
-
-Return ONLY the JSON array, no other text."""
-
-                response = self.llm_service.client.chat.completions.create(
-                    model=self.llm_service.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.5,
-                    max_tokens=800,
-                )
-                
-                llm_response = response.choices[0].message.content.strip()
+        Cached descriptions are reused; the rest are requested together, and
+        any the combined reply leaves out are requested individually in
+        parallel.
+        
+        Args:
+            spec: Trial specification
+            similar_protocols: Similar protocols from RAG
+            pending: Endpoints needing a description
+            rag_snippets: Pre-formatted RAG examples from _format_rag_snippets
+            
+        Returns:
+            Descriptions keyed by endpoint name
+        """
+        descriptions = {}
+        cache_keys = {}
+        uncached = []
+        for ep in pending:
+            cache_key = self._llm_cache_key(
+                "endpoint", spec, similar_protocols,
+                ep.type.value, ep.name, ep.description, ep.measurement_timepoint,
+            )
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                descriptions[ep.name] = cached
+            else:
+                cache_keys[ep.name] = cache_key
+                uncached.append(ep)
+        
+        if not uncached:
+            return descriptions
+        
+        rag_snippets = rag_snippets or self._format_rag_snippets(similar_protocols)
+        
+        if len(uncached) > 1:
+            for name, description in self._request_endpoint_descriptions(spec, uncached, rag_snippets).items():
+                descriptions[name] = description
+                self._cache_response(cache_keys[name], description)
+            uncached = [ep for ep in uncached if ep.name not in descriptions]
+        
+        # Anything the combined request missed is generated one endpoint at a time
+        individual = self._run_section_builders({
+            ep.name: (lambda ep=ep: self._request_endpoint_description(spec, ep, rag_snippets))
+            for ep in uncached
+        })
+        for name, description in individual.items():
+            if description:
+                descriptions[name] = description
+                self._cache_response(cache_keys[name], description)
+        
+        return descriptions
+    
+    def _request_endpoint_descriptions(
+        self,
+        spec: TrialSpecInput,
+        endpoints: List[TrialEndpoint],
+        rag_snippets: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """Request descriptions for several endpoints in a single LLM call."""
+        # One examples header followed by the examples for each endpoint type requested
+        header = rag_snippets["endpoints_header"]
+        endpoint_examples = header + "".join(
+            rag_snippets["endpoints"][ep_type].removeprefix(header)
+            for ep_type in dict.fromkeys(ep.type.value for ep in endpoints)
+            if ep_type in rag_snippets["endpoints"]
+        )
+        
+        prompt = self.templates["prompts"]["endpoints"].format_map({
+            **self._prompt_context(spec),
+            "endpoint_lines": "\n".join(
+                f"- {ep.type.value}: {ep.name} (Timepoint: {ep.measurement_timepoint})"
+                for ep in endpoints
+            ),
+            "endpoint_examples": endpoint_examples,
+        })
+        
+        try:
+            response = self.llm_service.client.chat.completions.create(
+                model=self.llm_service.model,
+                messages=self._build_llm_messages(spec, rag_snippets, prompt),
+                temperature=0.7,
+                max_tokens=200 * len(endpoints),
+                response_format={"type": "json_object"},
+            )
+            result = _json_loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.warning("Combined LLM endpoint enhancement failed: %s. Enhancing individually.", e)
+            return {}
+        
+        generated = result.get("descriptions") if isinstance(result, dict) else None
+        if not isinstance(generated, dict):
+            return {}
+        
+        names = {ep.name for ep in endpoints}
+        return {
+            name: description.strip()
+            for name, description in generated.items()
+            if name in names and isinstance(description, str) and description.strip()
+        }
+    
+    def _request_endpoint_description(
+        self,
+        spec: TrialSpecInput,
+        ep: TrialEndpoint,
+        rag_snippets: Dict[str, Any]
+    ) -> Optional[str]:
+        """Request the description for a single endpoint, or None on failure."""
+        try:
+            # Build context from similar endpoints
+            rag_endpoint_examples = rag_snippets["endpoints"].get(
+                ep.type.value, rag_snippets["endpoints_header"]
+            )
+            
+            prompt = self.templates["prompts"]["endpoint"].format_map({
+                **self._prompt_context(spec),
+                "endpoint_type": ep.type.value,
+                "endpoint_name": ep.name,
+                "timepoint": ep.measurement_timepoint,
+                "endpoint_examples": rag_endpoint_examples,
+            })
+
+            response = self.llm_service.client.chat.completions.create(
+                model=self.llm_service.model,
+                messages=self._build_llm_messages(spec, rag_snippets, prompt),
+                temperature=0.7,
+                max_tokens=200,
+            )
+            
+            return response.choices[0].message.content.strip()
+            
+        except Exception as e:
+            logger.warning("LLM endpoint enhancement failed: %s. Using original.", e)
+            return None
+    
+    def _generate_visit_schedule(
+        self,
+        spec: TrialSpecInput,
+        similar_protocols: List[Dict[str, Any]],
+        rag_snippets: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Generate visit schedule, enhanced with LLM for indication-specific timing; also reports whether the LLM was used."""
+        
+        # Use LLM for indication-specific visit timing if available
+        if self.use_llm and self.llm_service:
+            prebuilt = self._get_prebuilt_section("visit_schedule", spec)
+            if prebuilt is not None:
+                return prebuilt, True
+            
+            cache_key = self._llm_cache_key("visit_schedule", spec, similar_protocols)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached, True
+            
+            try:
+                rag_snippets = rag_snippets or self._format_rag_snippets(similar_protocols)
                 
-                # Try to parse JSON from response
-                import json
-                import re
+                prompt = self.templates["prompts"]["visit_schedule"].format_map(self._prompt_context(spec))
+
+                # Budget tokens by expected visit count; stop reading once the JSON closes
+                expected_visits = spec.duration_weeks // 4 + 3
+                stream = self.llm_service.client.chat.completions.create(
+                    model=self.llm_service.structured_model,
+                    messages=self._build_llm_messages(spec, rag_snippets, prompt),
+                    temperature=0,
+                    top_p=1,
+                    max_tokens=min(VISIT_SCHEDULE_MAX_TOKENS, expected_visits * VISIT_TOKENS_PER_VISIT),
+                    response_format={"type": "json_object"},
+                    stream=True,
+                )
                 
-                # Extract JSON array from response
-                json_match = re.search(r'\[.*\]', llm_response, re.DOTALL)
-                if json_match:
-                    visits = json.loads(json_match.group())
-                    print(f"✓ Generated {len(visits)} indication-specific visits using LLM")
-                    return visits
+                visits = _parse_json_list(_read_json_stream(stream), "visits")
+                if visits is not None:
+                    logger.info("Generated %s indication-specific visits using LLM", len(visits))
+                    self._cache_response(cache_key, visits)
+                    return visits, True
                 else:
-                    print("⚠ Could not parse LLM visit schedule. Using template.")
+                    logger.warning("Could not parse LLM visit schedule. Using template.")
                     
             except Exception as e:
-                print(f"⚠ LLM visit schedule generation failed: {e}. Using template.")
+                logger.warning("LLM visit schedule generation failed: %s. Using template.", e)
         
         # Fallback: Generic visit schedule
         visits = []
@@ -645,81 +1210,52 @@ Return ONLY the JSON array, no other text."""
                 "window": "±7 days",
             })
         
-        return visits
+        return visits, False
     
     def _generate_assessments(
         self,
         spec: TrialSpecInput,
-        similar_protocols: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Generate assessments, enhanced with LLM for indication-specific evaluations."""
+        similar_protocols: List[Dict[str, Any]],
+        rag_snippets: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Generate assessments, enhanced with LLM for indication-specific evaluations; also reports whether the LLM was used."""
         
         # Use LLM for indication-specific assessments if available
         if self.use_llm and self.llm_service:
+            prebuilt = self._get_prebuilt_section("assessments", spec)
+            if prebuilt is not None:
+                return prebuilt, True
+            
+            cache_key = self._llm_cache_key("assessments", spec, similar_protocols)
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                return cached, True
+            
             try:
-                # Build context from similar protocols
-                rag_assessment_examples = ""
-                if similar_protocols:
-                    rag_assessment_examples = "\n\nCommon Assessments in Similar Protocols:\n"
-                    for i, protocol in enumerate(similar_protocols[:2], 1):
-                        if 'protocol' in protocol and 'assessments' in protocol['protocol']:
-                            assessments_list = protocol['protocol']['assessments']
-                            assessment_names = [a.get('name', 'N/A') for a in assessments_list[:4]]
-                            rag_assessment_examples += f"{i}. {', '.join(assessment_names)}\n"
-                
-                # Add user instructions if provided
-                user_instructions = ""
-                if spec.additional_instructions:
-                    user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{spec.additional_instructions}\n"
+                rag_snippets = rag_snippets or self._format_rag_snippets(similar_protocols)
                 
-                prompt = f"""You are an expert clinical trial protocol writer specializing in {spec.indication}. Generate appropriate clinical assessments.
+                prompt = self.templates["prompts"]["assessments"].format_map(self._prompt_context(spec))
 
-Trial Specification:
-- Phase: {spec.phase.value}
-- Indication: {spec.indication}
-- Duration: {spec.duration_weeks} weeks
-{rag_assessment_examples}{user_instructions}
-
-Generate assessments appropriate for {spec.indication} trials. Include:
-1. Standard assessments (Demographics, Vital Signs, Adverse Events, Labs)
-2. Indication-specific assessments (e.g., for cancer: tumor imaging, RECIST; for dermatology: lesion counts, photography; for diabetes: HbA1c, glucose)
-
-Return ONLY a JSON array of assessment objects.
-Each assessment should have: assessment_id, name, description, timing.
-
-Example format:
-[
-  {{"assessment_id": "DEMO", "name": "Demographics", "description": "Participant demographics", "timing": ["Screening"]}},
-  {{"assessment_id": "TUMOR", "name": "Tumor Assessment", "description": "CT/MRI per RECIST 1.1", "timing": ["Baseline", "Week 8", "Week 16"]}}
-]
-
-CRITICAL: Make assessments SPECIFIC to {spec.indication}. 
-Return ONLY the JSON array, no other text."""
-
-                response = self.llm_service.client.chat.completions.create(
-                    model=self.llm_service.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.5,
+                stream = self.llm_service.client.chat.completions.create(
+                    model=self.llm_service.structured_model,
+                    messages=self._build_llm_messages(spec, rag_snippets, prompt),
+                    temperature=0,
+                    top_p=1,
                     max_tokens=1000,
+                    response_format={"type": "json_object"},
+                    stream=True,
                 )
                 
-                llm_response = response.choices[0].message.content.strip()
-                
-                # Try to parse JSON from response
-                import json
-                import re
-                
-                # Extract JSON array from response
-                json_match = re.search(r'\[.*\]', llm_response, re.DOTALL)
-                if json_match:
-                    assessments = json.loads(json_match.group())
-                    print(f"✓ Generated {len(assessments)} indication-specific assessments using LLM")
-                    return assessments
+                assessments = _parse_json_list(_read_json_stream(stream), "assessments")
+                if assessments is not None:
+                    logger.info("Generated %s indication-specific assessments using LLM", len(assessments))
+                    self._cache_response(cache_key, assessments)
+                    return assessments, True
                 else:
-                    print("⚠ Could not parse LLM assessments. Using template.")
+                    logger.warning("Could not parse LLM assessments. Using template.")
                     
             except Exception as e:
-                print(f"⚠ LLM assessment generation failed: {e}. Using template.")
+                logger.warning("LLM assessment generation failed: %s. Using template.", e)
         
         # Fallback: Generic assessments
         assessments = [
@@ -759,7 +1295,7 @@ Return ONLY the JSON array, no other text."""
                     "timing": ["Baseline", "All follow-up visits"],
                 })
         
-        return assessments
+        return assessments, False
     
     def _generate_protocol_sections(
         self,
@@ -806,52 +1342,524 @@ Secondary Objectives:
         
         return sections
     
-    def _generate_rag_context(self, similar_protocols: List[Dict[str, Any]]) -> str:
-        """Generate context summary from similar protocols."""
+    def _retrieve_for_generation(self, spec: TrialSpecInput) -> List[Dict[str, Any]]:
+        """
+        Retrieve similar protocols for structured generation, if RAG is enabled.
+        
+        Args:
+            spec: Trial specification
+            
+        Returns:
+            Similar protocols, or an empty list when RAG is off or fails
+        """
+        if not (self.use_rag and self.rag_service):
+            return []
+        
+        try:
+            similar_protocols = self._retrieve_similar_protocols(spec)
+        except Exception as e:
+            logger.warning("RAG retrieval error: %s", e)
+            return []
+        
+        if similar_protocols:
+            logger.info("Using %s similar protocol(s) for enhanced generation", len(similar_protocols))
+        return similar_protocols
+    
+    def _retrieve_similar_protocols(self, spec: TrialSpecInput) -> List[Dict[str, Any]]:
+        """
+        Retrieve similar protocols once per spec.
+        
+        Results are reused by both the structured and narrative generators
+        until examples are added to or removed from the RAG service.
+        
+        Args:
+            spec: Trial specification
+            
+        Returns:
+            List of similar protocols from RAG
+        """
+        key = (spec.model_dump_json(), self.rag_service.generation)
+        with self._rag_cache_lock:
+            similar_protocols = self._rag_cache.get(key)
+        if similar_protocols is None:
+            similar_protocols = self.rag_service.retrieve_similar_protocols(spec, n_results=RAG_N_RESULTS)
+            # API requests run concurrently in the threadpool
+            with self._rag_cache_lock:
+                if len(self._rag_cache) >= RAG_CACHE_SIZE:
+                    self._rag_cache.pop(next(iter(self._rag_cache)))
+                self._rag_cache[key] = similar_protocols
+        return similar_protocols
+    
+    def _format_rag_snippets(self, similar_protocols: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Format the RAG examples used by the section prompts in one pass.
+        
+        Args:
+            similar_protocols: Similar protocols from RAG
+            
+        Returns:
+            Dictionary with "design", "objectives", "visits" and
+            "assessments" prompt snippets, "endpoints" snippets keyed by endpoint type, and the
+            "endpoints_header" used for types without examples
+        """
         if not similar_protocols:
-            return ""
+            return {
+                "design": "",
+                "objectives": "",
+                "endpoints": {},
+                "endpoints_header": "",
+                "visits": "",
+                "assessments": "",
+            }
         
-        context_parts = ["REFERENCE CONTEXT FROM SIMILAR PROTOCOLS:\n"]
+        design_lines = []
+        objective_lines = []
+        endpoint_lines: Dict[str, List[str]] = {}
+        visit_lines = []
+        assessment_lines = []
         
         for i, protocol in enumerate(similar_protocols[:2], 1):
             metadata = protocol.get('metadata', {})
-            score = protocol.get('similarity_score', 0)
+            design_lines.append(f"{i}. {metadata.get('design', 'N/A')}\n")
             
-            context_parts.append(
-                f"\nSimilar Protocol {i} (Similarity: {score:.1%}):\n"
-                f"- Phase: {metadata.get('phase', 'N/A')}\n"
-                f"- Indication: {metadata.get('indication', 'N/A')}\n"
-                f"- Design: {metadata.get('design', 'N/A')}\n"
-                f"- Sample Size: {metadata.get('sample_size', 'N/A')}\n"
-                f"- Duration: {metadata.get('duration_weeks', 'N/A')} weeks"
-            )
+            protocol_data = protocol.get('protocol', {})
+            
+            if 'objectives' in protocol_data:
+                objective_lines.append(f"{i}. {protocol_data['objectives'].get('primary', 'N/A')}\n")
+            
+            for similar_ep in protocol_data.get('endpoints', [])[:2]:
+                endpoint_lines.setdefault(similar_ep.get('type'), []).append(
+                    f"- {similar_ep.get('name', 'N/A')}: {similar_ep.get('description', 'N/A')}\n"
+                )
+            
+            if 'visit_schedule' in protocol_data:
+                visits = protocol_data['visit_schedule']
+                visit_summary = [f"Week {v.get('week', '?')}" for v in visits[:5]]
+                visit_lines.append(f"{i}. Visits at: {', '.join(visit_summary)}\n")
+            
+            if 'assessments' in protocol_data:
+                assessment_names = [a.get('name', 'N/A') for a in protocol_data['assessments'][:4]]
+                assessment_lines.append(f"{i}. {', '.join(assessment_names)}\n")
+        
+        endpoints_header = "\n\nSimilar Endpoint Examples:\n"
+        return {
+            "design": "\n\nSimilar Study Designs:\n" + "".join(design_lines),
+            "objectives": "\n\nPrimary Objectives in Similar Protocols:\n" + "".join(objective_lines),
+            "endpoints": {
+                ep_type: endpoints_header + "".join(lines)
+                for ep_type, lines in endpoint_lines.items()
+            },
+            "endpoints_header": endpoints_header,
+            "visits": "\n\nSimilar Protocol Visit Schedules:\n" + "".join(visit_lines),
+            "assessments": "\n\nCommon Assessments in Similar Protocols:\n" + "".join(assessment_lines),
+        }
+    
+    def _build_llm_messages(
+        self,
+        spec: TrialSpecInput,
+        rag_snippets: Dict[str, Any],
+        prompt: str
+    ) -> List[Dict[str, str]]:
+        """
+        Build chat messages for a section prompt.
+        
+        The system message holds everything shared by the section calls for
+        a spec (role, trial specification, RAG examples, user instructions)
+        and is byte-identical across them, so providers with prompt prefix
+        caching only prefill it once. The section-specific prompt goes last.
+        
+        Args:
+            spec: Trial specification
+            rag_snippets: Pre-formatted RAG examples from _format_rag_snippets
+            prompt: Section-specific instructions
+            
+        Returns:
+            List of chat messages
+        """
+        user_instructions = ""
+        if spec.additional_instructions:
+            user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{spec.additional_instructions}\n"
+        
+        context = f"""You are an expert clinical trial protocol writer specializing in {spec.indication}, with deep knowledge of ICH-GCP guidelines and CDISC standards.
+
+Trial Specification:
+- Title: {spec.title}
+- Phase: {spec.phase.value}
+- Indication: {spec.indication}
+- Basic Design: {spec.design}
+- Sample Size: {spec.sample_size}
+- Duration: {spec.duration_weeks} weeks
+- Treatment Arms: {', '.join(spec.treatment_arms or ['Intervention', 'Control'])}
+{rag_snippets["design"]}{rag_snippets["visits"]}{rag_snippets["assessments"]}{user_instructions}"""
+        
+        return [
+            {"role": "system", "content": context},
+            {"role": "user", "content": prompt},
+        ]
+    
+    def _prompt_context(self, spec: TrialSpecInput) -> Dict[str, Any]:
+        """Build the trial fields shared by the section prompt templates."""
+        return {
+            "indication": spec.indication,
+            "duration_weeks": spec.duration_weeks,
+            **self._indication_guidance(spec.indication),
+        }
+    
+    def _indication_guidance(self, indication: str) -> Dict[str, str]:
+        """
+        Resolve the prompt guidance for an indication, once per indication.
+        
+        Args:
+            indication: Trial indication as entered
+            
+        Returns:
+            Guidance text for the visit_timing, design_features and
+            assessments prompt fields
+        """
+        normalized = indication.strip().lower()
+        guidance = self._indication_guidance_cache.get(normalized)
+        if guidance is not None:
+            return guidance
+        
+        areas = [
+            area for area in INDICATION_GUIDANCE.values()
+            if any(keyword in normalized for keyword in area["keywords"])
+        ]
+        if len(areas) != 1:
+            # Unknown or ambiguous indication: keep every area as an example
+            areas = list(INDICATION_GUIDANCE.values())
+        
+        guidance = {
+            "visit_timing": "\n".join(area["visit_timing"] for area in areas),
+            "design_features": ", ".join(area["design_features"] for area in areas),
+            "assessments": "; ".join(area["assessments"] for area in areas),
+        }
+        self._indication_guidance_cache[normalized] = guidance
+        return guidance
+    
+    def _get_prebuilt_section(self, section: str, spec: TrialSpecInput) -> Optional[Any]:
+        """
+        Look up a section generated ahead of time for this kind of trial.
         
-        context_parts.append("\n" + "="*60 + "\n")
+        Specs with additional instructions always go to the live LLM, since
+        the prebuilt sections were generated without them.
         
-        return "\n".join(context_parts)
+        Args:
+            section: Section name
+            spec: Trial specification
+            
+        Returns:
+            Copy of the prebuilt section, or None if there is none
+        """
+        if not self._static_library or spec.additional_instructions:
+            return None
+        
+        sections = self._static_library.get(
+            (spec.indication.strip().lower(), spec.phase.value, spec.duration_weeks)
+        )
+        if not sections or not sections.get(section):
+            return None
+        
+        logger.info("Using prebuilt %s section", section)
+        return deepcopy(sections[section])
+    
+    def _llm_cache_key(
+        self,
+        section: str,
+        spec: TrialSpecInput,
+        similar_protocols: List[Dict[str, Any]],
+        *extra: Any
+    ) -> Tuple:
+        """
+        Build the LLM response cache key for a protocol section.
+        
+        Args:
+            section: Section name
+            spec: Trial specification
+            similar_protocols: Retrieved examples included in the prompt
+            *extra: Additional section-specific prompt inputs
+            
+        Returns:
+            Hashable cache key
+        """
+        return (
+            section,
+            spec.indication,
+            spec.phase.value,
+            spec.design,
+            spec.duration_weeks,
+            spec.sample_size,
+            tuple(spec.treatment_arms or ()),
+            spec.additional_instructions,
+            tuple(p.get('id') for p in similar_protocols),
+        ) + extra
+    
+    def _get_cached_response(self, key: Tuple) -> Optional[Any]:
+        """Return a copy of a cached LLM response, or None on a miss."""
+        with self._llm_cache_lock:
+            value = self._llm_cache.get(key)
+            if value is None:
+                return None
+            self._llm_cache.move_to_end(key)
+        logger.info("Using cached LLM response for %s", key[0])
+        return deepcopy(value)
+    
+    def _cache_response(self, key: Tuple, value: Any):
+        """Store an LLM response, evicting the least recently used entry."""
+        with self._llm_cache_lock:
+            self._llm_cache[key] = deepcopy(value)
+            self._llm_cache.move_to_end(key)
+            if len(self._llm_cache) > LLM_CACHE_SIZE:
+                self._llm_cache.popitem(last=False)
+    
+    def _generate_rag_context(self, similar_protocols: List[Dict[str, Any]]) -> str:
+        """Generate context summary from similar protocols."""
+        if not similar_protocols:
+            return ""
+        
+        return "\n".join([
+            _RAG_CONTEXT_HEADER,
+            *(_format_similar_protocol(i, protocol) for i, protocol in enumerate(similar_protocols[:2], 1)),
+            _RAG_CONTEXT_FOOTER,
+        ])
+
+
+# Standard CRF forms, identical for every study; built once and shared
+# by all generated CRF schemas
+_DEMO_FIELDS = [
+    CRFField(
+        field_id="SUBJID",
+        field_name="subject_id",
+        field_label="Subject ID",
+        data_type="text",
+        required=True,
+        cdash_variable="SUBJID",
+        sdtm_variable="USUBJID",
+    ),
+    CRFField(
+        field_id="AGE",
+        field_name="age",
+        field_label="Age (years)",
+        data_type="number",
+        required=True,
+        validation_rules={"min": 0, "max": 120},
+        cdash_variable="AGE",
+        sdtm_variable="AGE",
+    ),
+    CRFField(
+        field_id="SEX",
+        field_name="sex",
+        field_label="Sex",
+        data_type="radio",
+        required=True,
+        validation_rules={"options": ["Male", "Female", "Other"]},
+        cdash_variable="SEX",
+        sdtm_variable="SEX",
+    ),
+    CRFField(
+        field_id="RACE",
+        field_name="race",
+        field_label="Race",
+        data_type="dropdown",
+        required=True,
+        controlled_vocabulary="CDASH_RACE",
+        cdash_variable="RACE",
+        sdtm_variable="RACE",
+    ),
+]
+
+_DEMO_FORM = CRFForm(
+    form_id="DM",
+    form_name="Demographics",
+    form_description="Subject demographics and baseline characteristics",
+    fields=_DEMO_FIELDS,
+    repeating=False,
+)
+
+_VITAL_FIELDS = [
+    CRFField(
+        field_id="VS_DATE",
+        field_name="assessment_date",
+        field_label="Assessment Date",
+        data_type="date",
+        required=True,
+        cdash_variable="VSDTC",
+    ),
+    CRFField(
+        field_id="SYSBP",
+        field_name="systolic_bp",
+        field_label="Systolic Blood Pressure (mmHg)",
+        data_type="number",
+        required=True,
+        validation_rules={"min": 50, "max": 250},
+        cdash_variable="VSORRES",
+        sdtm_variable="VSSTRESN",
+    ),
+    CRFField(
+        field_id="DIABP",
+        field_name="diastolic_bp",
+        field_label="Diastolic Blood Pressure (mmHg)",
+        data_type="number",
+        required=True,
+        validation_rules={"min": 30, "max": 150},
+        cdash_variable="VSORRES",
+        sdtm_variable="VSSTRESN",
+    ),
+    CRFField(
+        field_id="HR",
+        field_name="heart_rate",
+        field_label="Heart Rate (bpm)",
+        data_type="number",
+        required=True,
+        validation_rules={"min": 30, "max": 200},
+        cdash_variable="VSORRES",
+        sdtm_variable="VSSTRESN",
+    ),
+    CRFField(
+        field_id="TEMP",
+        field_name="temperature",
+        field_label="Temperature (°C)",
+        data_type="number",
+        required=True,
+        validation_rules={"min": 35.0, "max": 42.0},
+        cdash_variable="VSORRES",
+        sdtm_variable="VSSTRESN",
+    ),
+]
+
+_VS_FORM = CRFForm(
+    form_id="VS",
+    form_name="Vital Signs",
+    form_description="Vital signs assessment",
+    fields=_VITAL_FIELDS,
+    repeating=False,
+)
+
+_AE_FIELDS = [
+    CRFField(
+        field_id="AE_TERM",
+        field_name="ae_term",
+        field_label="Adverse Event Term",
+        data_type="text",
+        required=True,
+        cdash_variable="AETERM",
+        sdtm_variable="AETERM",
+    ),
+    CRFField(
+        field_id="AE_START",
+        field_name="ae_start_date",
+        field_label="Start Date",
+        data_type="date",
+        required=True,
+        cdash_variable="AESTDTC",
+    ),
+    CRFField(
+        field_id="AE_SEV",
+        field_name="severity",
+        field_label="Severity",
+        data_type="dropdown",
+        required=True,
+        validation_rules={"options": ["Mild", "Moderate", "Severe"]},
+        cdash_variable="AESEV",
+        sdtm_variable="AESEV",
+    ),
+    CRFField(
+        field_id="AE_REL",
+        field_name="relationship",
+        field_label="Relationship to Study Drug",
+        data_type="dropdown",
+        required=True,
+        validation_rules={"options": ["Not Related", "Unlikely", "Possible", "Probable", "Definite"]},
+        cdash_variable="AEREL",
+        sdtm_variable="AEREL",
+    ),
+]
+
+_AE_FORM = CRFForm(
+    form_id="AE",
+    form_name="Adverse Events",
+    form_description="Adverse event reporting",
+    fields=_AE_FIELDS,
+    repeating=True,
+)
+
+_SCORE_FIELDS = [
+    CRFField(
+        field_id="SCORE_DATE",
+        field_name="assessment_date",
+        field_label="Assessment Date",
+        data_type="date",
+        required=True,
+    ),
+    CRFField(
+        field_id="TOTAL_SCORE",
+        field_name="total_score",
+        field_label="Total Score",
+        data_type="number",
+        required=True,
+        validation_rules={"min": 0, "max": 100},
+    ),
+]
+
+_EFFICACY_FORM = CRFForm(
+    form_id="EFF",
+    form_name="Efficacy Assessment",
+    form_description="Clinical efficacy score assessment",
+    fields=_SCORE_FIELDS,
+    repeating=False,
+)
+
+# The two possible standard form sets, depending on whether an endpoint is a score
+_STANDARD_FORMS = (_DEMO_FORM, _VS_FORM, _AE_FORM)
+_STANDARD_FORMS_WITH_EFFICACY = _STANDARD_FORMS + (_EFFICACY_FORM,)
+
+# Forms collected at each visit: demographics only at screening, efficacy
+# at baseline and follow-ups
+_SCREENING_VISIT_FORMS = ("DM", "VS", "AE")
+_TREATMENT_VISIT_FORMS = ("VS", "AE", "EFF")
 
 
 class CRFGenerator:
     """Generates CRF schemas based on protocol."""
     
+    # LLM-generated assessment fields shared by all generator instances
+    _fields_cache: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+    _fields_cache_lock = threading.Lock()
+    
+    # Normalized prompt embeddings and fields for approximate cache lookups
+    _semantic_cache: "OrderedDict[Tuple, Tuple[np.ndarray, List[Dict[str, Any]]]]" = OrderedDict()
+    
+    # Forms and visit definitions of whole CRF schemas, keyed by their inputs
+    _schema_cache: "OrderedDict[Tuple, Tuple[List[CRFForm], List[VisitDefinition]]]" = OrderedDict()
+    _schema_cache_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize CRF generator with optional LLM support."""
-        from app.services.llm_service import LLMService
-        from config import settings
-        
         self.llm_service = None
-        if settings.openai_api_key:
+        if settings.openai_api_key and LLM_AVAILABLE:
             try:
-                self.llm_service = LLMService()
-                print("✓ LLM enabled for CRF generation")
+                # Share the protocol generator's client and connection pool
+                self.llm_service = get_llm_service()
+                logger.info("LLM enabled for CRF generation")
             except Exception as e:
-                print(f"⚠ LLM initialization failed: {e}. CRF will use templates only.")
+                logger.warning("LLM initialization failed: %s. CRF will use templates only.", e)
     
     def generate_crf_schema(self, spec: TrialSpecInput, protocol: ProtocolStructured) -> CRFSchema:
         """Generate complete CRF schema based on protocol assessments."""
-        # Generate forms based on protocol assessments (indication-specific)
-        forms = self._generate_forms_from_assessments(spec, protocol)
-        visits = self._generate_visit_definitions(protocol.visit_schedule)
+        # Regenerating with edits that do not reach the CRF (sample size,
+        # title, ...) reuses the previous forms and visits
+        cache_key = self._schema_cache_key(spec, protocol)
+        cached = self._get_cached_schema(cache_key)
+        if cached:
+            forms, visits = cached
+        else:
+            # Generate forms based on protocol assessments (indication-specific)
+            forms = self._generate_forms_from_assessments(spec, protocol)
+            visits = self._generate_visit_definitions(protocol.visit_schedule)
+            
+            # Fallback forms are not cached, so the next generation retries the LLM
+            if self._assessment_fields_cached(spec, protocol):
+                self._cache_schema(cache_key, forms, visits)
         
         return CRFSchema(
             study_id=protocol.protocol_id,
@@ -875,30 +1883,375 @@ class CRFGenerator:
         """Generate CRF forms based on protocol assessments."""
         forms = []
         
-        # Always include standard forms first
-        forms.extend(self._generate_standard_forms(spec))
+        # Always include standard forms first, with efficacy scores when an
+        # endpoint is a score
+        has_score_endpoint = any("score" in ep.name.lower() for ep in spec.key_endpoints)
+        forms.extend(self._generate_standard_forms(has_score_endpoint))
         
         # Generate indication-specific forms based on assessments
-        for assessment in protocol.assessments:
-            assessment_id = assessment.get('assessment_id', '')
-            assessment_name = assessment.get('name', '')
-            
-            # Skip if already in standard forms
-            if assessment_id in ['DEMO', 'VITAL', 'AE', 'LAB']:
+        assessments = self._custom_assessments(protocol)
+        
+        if not self.llm_service:
+            return forms
+        
+        # Reuse fields generated earlier for the same assessment and indication
+        cached_forms: Dict[int, CRFForm] = {}
+        pending = []
+        for assessment in assessments:
+            field_dicts = self._get_cached_fields(self._fields_cache_key(spec, assessment))
+            if field_dicts:
+                cached_forms[id(assessment)] = self._build_assessment_form(assessment, field_dicts)
+            else:
+                pending.append(assessment)
+        
+        # Then fields generated for a paraphrase of the assessment or indication.
+        # With nothing cached yet no lookup can hit, so the embeddings are only
+        # needed to cache the new fields and are fetched while they are generated.
+        deferred_embeddings = None
+        if self._semantic_cache:
+            embeddings = self._embed_assessments(spec, pending)
+        else:
+            embeddings = {}
+            pool = ThreadPoolExecutor(max_workers=1)
+            deferred_embeddings = pool.submit(self._embed_assessments, spec, pending)
+            pool.shutdown(wait=False)
+        generate = []
+        for assessment in pending:
+            field_dicts = None
+            if id(assessment) in embeddings:
+                field_dicts = self._get_similar_cached_fields(embeddings[id(assessment)])
+            if field_dicts:
+                cached_forms[id(assessment)] = self._build_assessment_form(assessment, field_dicts)
+                self._cache_fields(self._fields_cache_key(spec, assessment), field_dicts)
+            else:
+                generate.append(assessment)
+        pending = generate
+        
+        # Request fields for several assessments per LLM call
+        batched_forms: Dict[str, CRFForm] = {}
+        if len(pending) > 1:
+            batches = [
+                pending[i:i + CRF_BATCH_SIZE]
+                for i in range(0, len(pending), CRF_BATCH_SIZE)
+            ]
+            for batch_forms in self._map_llm_calls(
+                lambda batch: self._generate_assessment_forms_batched(spec, batch), batches
+            ):
+                batched_forms.update(batch_forms)
+        
+        # Assessments missing from the batched replies get their own call
+        missing = [
+            assessment for assessment in pending
+            if assessment.get('assessment_id', 'CUSTOM') not in batched_forms
+        ]
+        single_forms = dict(zip(
+            (id(assessment) for assessment in missing),
+            self._map_llm_calls(lambda assessment: self._generate_assessment_form(spec, assessment), missing),
+        ))
+        
+        # Make the newly generated fields available to approximate lookups
+        if deferred_embeddings is not None:
+            embeddings = deferred_embeddings.result()
+        for assessment in pending:
+            if id(assessment) not in embeddings:
                 continue
-            
-            # Generate form for this assessment
-            form = self._generate_assessment_form(spec, assessment)
+            key = self._fields_cache_key(spec, assessment)
+            field_dicts = self._get_cached_fields(key)
+            if field_dicts:
+                self._cache_similar_fields(key, embeddings[id(assessment)], field_dicts)
+        
+        for assessment in assessments:
+            form = (
+                cached_forms.get(id(assessment))
+                or batched_forms.get(assessment.get('assessment_id', 'CUSTOM'))
+                or single_forms.get(id(assessment))
+            )
             if form:
                 forms.append(form)
         
         return forms
     
+    def _fields_cache_key(self, spec: TrialSpecInput, assessment: Dict[str, Any]) -> Tuple:
+        """
+        Build the field cache key from every input of the assessment's field prompt.
+        
+        Args:
+            spec: Trial specification
+            assessment: Protocol assessment
+            
+        Returns:
+            Hashable cache key
+        """
+        return (
+            spec.indication,
+            assessment.get('assessment_id', 'CUSTOM'),
+            assessment.get('name', 'Custom Assessment'),
+            assessment.get('description', ''),
+            spec.additional_instructions or "",
+        )
+    
+    def _get_cached_fields(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of cached assessment field dictionaries, or None on a miss."""
+        with self._fields_cache_lock:
+            field_dicts = self._fields_cache.get(key)
+            if field_dicts is None:
+                return None
+            self._fields_cache.move_to_end(key)
+        return deepcopy(field_dicts)
+    
+    def _cache_fields(self, key: Tuple, field_dicts: List[Dict[str, Any]]):
+        """Store assessment field dictionaries, evicting the least recently used entry."""
+        with self._fields_cache_lock:
+            self._fields_cache[key] = deepcopy(field_dicts)
+            self._fields_cache.move_to_end(key)
+            if len(self._fields_cache) > CRF_FIELDS_CACHE_SIZE:
+                self._fields_cache.popitem(last=False)
+    
+    def _embed_assessments(
+        self,
+        spec: TrialSpecInput,
+        assessments: List[Dict[str, Any]]
+    ) -> Dict[int, "np.ndarray"]:
+        """
+        Embed assessment prompts for the semantic field cache in one request.
+        
+        Specs with additional instructions are never matched approximately,
+        since the instructions can change the fields entirely.
+        
+        Args:
+            spec: Trial specification
+            assessments: Assessments missing from the exact field cache
+            
+        Returns:
+            Unit-length embeddings keyed by id() of the assessment; empty when
+            embeddings are unavailable
+        """
+        if spec.additional_instructions or not assessments:
+            return {}
+        
+        texts = [
+            f"{spec.indication}|{a.get('name', 'Custom Assessment')}|{a.get('description', '')}"
+            for a in assessments
+        ]
+        try:
+            response = self.llm_service.client.embeddings.create(
+                model=settings.llm_embedding_model,
+                input=texts,
+            )
+        except Exception as e:
+            logger.warning("Assessment embedding failed: %s. Skipping semantic CRF field cache.", e)
+            return {}
+        
+        # Only the semantic cache needs numpy, so it is not imported with the module
+        import numpy as np
+        
+        vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        return {id(assessment): vector for assessment, vector in zip(assessments, vectors)}
+    
+    def _get_similar_cached_fields(self, embedding: "np.ndarray") -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the fields of the nearest cached assessment, or None if none is close enough."""
+        import numpy as np
+        
+        with self._fields_cache_lock:
+            if not self._semantic_cache:
+                return None
+            keys = list(self._semantic_cache)
+            similarities = np.stack([self._semantic_cache[key][0] for key in keys]) @ embedding
+            best = int(np.argmax(similarities))
+            if 1.0 - similarities[best] > CRF_SEMANTIC_CACHE_MAX_DISTANCE:
+                return None
+            self._semantic_cache.move_to_end(keys[best])
+            field_dicts = self._semantic_cache[keys[best]][1]
+        return deepcopy(field_dicts)
+    
+    def _cache_similar_fields(self, key: Tuple, embedding: "np.ndarray", field_dicts: List[Dict[str, Any]]):
+        """Store fields for approximate lookups, evicting the least recently used entry."""
+        with self._fields_cache_lock:
+            self._semantic_cache[key] = (embedding, deepcopy(field_dicts))
+            self._semantic_cache.move_to_end(key)
+            if len(self._semantic_cache) > CRF_SEMANTIC_CACHE_SIZE:
+                self._semantic_cache.popitem(last=False)
+    
+    def _custom_assessments(self, protocol: ProtocolStructured) -> List[Dict[str, Any]]:
+        """Protocol assessments needing their own form, skipping those covered by standard forms."""
+        return [
+            assessment for assessment in protocol.assessments
+            if assessment.get('assessment_id', '') not in ['DEMO', 'VITAL', 'AE', 'LAB']
+        ]
+    
+    def _schema_cache_key(self, spec: TrialSpecInput, protocol: ProtocolStructured) -> Tuple:
+        """
+        Build the CRF schema cache key from everything that shapes the forms and visits.
+        
+        Args:
+            spec: Trial specification
+            protocol: Structured protocol
+            
+        Returns:
+            Hashable cache key
+        """
+        return (
+            spec.indication,
+            spec.additional_instructions or "",
+            any("score" in ep.name.lower() for ep in spec.key_endpoints),
+            self.llm_service is not None,
+            json.dumps(protocol.assessments, sort_keys=True, default=str),
+            json.dumps(protocol.visit_schedule, sort_keys=True, default=str),
+        )
+    
+    def _assessment_fields_cached(self, spec: TrialSpecInput, protocol: ProtocolStructured) -> bool:
+        """Whether every custom assessment's form came from LLM fields (all of which are cached)."""
+        if not self.llm_service:
+            return True
+        with self._fields_cache_lock:
+            return all(
+                self._fields_cache_key(spec, assessment) in self._fields_cache
+                for assessment in self._custom_assessments(protocol)
+            )
+    
+    def _get_cached_schema(self, key: Tuple) -> Optional[Tuple[List[CRFForm], List[VisitDefinition]]]:
+        """Return a copy of cached schema forms and visits, or None on a miss."""
+        with self._schema_cache_lock:
+            cached = self._schema_cache.get(key)
+            if cached is None:
+                return None
+            self._schema_cache.move_to_end(key)
+        logger.info("Using cached CRF forms and visits")
+        return deepcopy(cached)
+    
+    def _cache_schema(self, key: Tuple, forms: List[CRFForm], visits: List[VisitDefinition]):
+        """Store schema forms and visits, evicting the least recently used entry."""
+        with self._schema_cache_lock:
+            self._schema_cache[key] = deepcopy((forms, visits))
+            self._schema_cache.move_to_end(key)
+            if len(self._schema_cache) > CRF_SCHEMA_CACHE_SIZE:
+                self._schema_cache.popitem(last=False)
+    
+    def _map_llm_calls(self, call: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """
+        Apply a network-bound LLM call to each item, concurrently when there are several.
+        
+        Args:
+            call: Function making one LLM call per item
+            items: Items to process
+            
+        Returns:
+            Results in item order
+        """
+        if len(items) < 2:
+            return [call(item) for item in items]
+        
+        with ThreadPoolExecutor(max_workers=min(len(items), CRF_MAX_CONCURRENT_CALLS)) as pool:
+            return list(pool.map(call, items))
+    
+    def _generate_assessment_forms_batched(
+        self,
+        spec: TrialSpecInput,
+        assessments: List[Dict[str, Any]]
+    ) -> Dict[str, CRFForm]:
+        """
+        Generate CRF forms for several assessments with a single LLM call.
+        
+        Args:
+            spec: Trial specification
+            assessments: Protocol assessments, at most CRF_BATCH_SIZE
+            
+        Returns:
+            Forms keyed by assessment_id; assessments missing or malformed
+            in the reply are left out
+        """
+        user_instructions = ""
+        if spec.additional_instructions:
+            user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{spec.additional_instructions}\n"
+        
+        assessment_lines = "\n".join(
+            f"- {a.get('assessment_id', 'CUSTOM')}: {a.get('name', 'Custom Assessment')} ({a.get('description', '')})"
+            for a in assessments
+        )
+        
+        prompt = f"""You are an expert in clinical trial data collection and CRF design for {spec.indication}.
+
+Generate CRF fields for each of the following assessments (assessment_id: name (description)):
+{assessment_lines}
+{user_instructions}
+Create fields appropriate for {spec.indication} that would be used to capture each assessment's data.
+For example:
+- Cancer tumor assessment: Lesion IDs, target/non-target, measurements, RECIST response
+- Acne lesion count: Inflammatory count, non-inflammatory count, location, severity
+- Lab tests: Test name, result value, units, normal ranges
+
+Return ONLY a JSON object whose "forms" object is keyed by assessment_id, each value an array of field objects.
+Each field should have: field_id, field_name, field_label, data_type (text/number/date/dropdown/checkbox), required (true/false).
+
+Example format:
+{{"forms": {{
+  "TUMOR": [
+    {{"field_id": "TUMOR_ID", "field_name": "lesion_id", "field_label": "Target Lesion ID", "data_type": "text", "required": true}},
+    {{"field_id": "TUMOR_SIZE", "field_name": "lesion_size", "field_label": "Lesion Size (mm)", "data_type": "number", "required": true}}
+  ]
+}}}}
+
+Generate 3-6 relevant fields per assessment for {spec.indication}.
+Return ONLY the JSON object, no other text."""
+        
+        try:
+            stream = self.llm_service.client.chat.completions.create(
+                model=self.llm_service.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=CRF_FIELDS_TEMPERATURE,
+                max_tokens=min(CRF_BATCH_MAX_TOKENS, len(assessments) * CRF_FIELDS_MAX_TOKENS),
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            result = _json_loads(_read_json_stream(stream))
+        except Exception as e:
+            logger.warning("Batched LLM CRF field generation failed: %s. Generating forms individually.", e)
+            return {}
+        
+        field_lists = result.get("forms") if isinstance(result, dict) else None
+        if not isinstance(field_lists, dict):
+            return {}
+        
+        forms = {}
+        for assessment in assessments:
+            assessment_id = assessment.get('assessment_id', 'CUSTOM')
+            field_dicts = field_lists.get(assessment_id)
+            if not isinstance(field_dicts, list):
+                continue
+            field_dicts = _normalize_crf_fields(field_dicts)
+            if not field_dicts:
+                continue
+            try:
+                forms[assessment_id] = self._build_assessment_form(assessment, field_dicts)
+                self._cache_fields(self._fields_cache_key(spec, assessment), field_dicts)
+            except Exception as e:
+                logger.warning("Could not use batched CRF fields for %s: %s", assessment.get('name', assessment_id), e)
+        
+        logger.info("Generated %d of %d assessment CRF forms in one LLM call", len(forms), len(assessments))
+        return forms
+    
+    def _build_assessment_form(self, assessment: Dict[str, Any], field_dicts: List[Dict[str, Any]]) -> CRFForm:
+        """
+        Build the CRF form for an assessment from normalized field dictionaries.
+        
+        The dictionaries come from _normalize_crf_fields, so the models are
+        constructed without re-running validation.
+        """
+        return CRFForm.model_construct(
+            form_id=str(assessment.get('assessment_id', 'CUSTOM')),
+            form_name=str(assessment.get('name', 'Custom Assessment')),
+            form_description=str(assessment.get('description', '')),
+            fields=[CRFField.model_construct(**fd) for fd in field_dicts],
+            repeating=True,  # Most assessments can repeat
+        )
+    
     def _generate_assessment_form(
         self,
         spec: TrialSpecInput,
         assessment: Dict[str, Any]
-    ) -> Optional[CRFForm]:
+    ) -> CRFForm:
         """Generate a CRF form for a specific assessment using LLM."""
         
         assessment_id = assessment.get('assessment_id', 'CUSTOM')
@@ -926,294 +2279,80 @@ For example:
 - Acne lesion count: Inflammatory count, non-inflammatory count, location, severity
 - Lab tests: Test name, result value, units, normal ranges
 
-Return ONLY a JSON array of field objects.
+Return ONLY a JSON object with a "fields" array of field objects.
 Each field should have: field_id, field_name, field_label, data_type (text/number/date/dropdown/checkbox), required (true/false).
 
 Example format:
-[
+{{"fields": [
   {{"field_id": "TUMOR_ID", "field_name": "lesion_id", "field_label": "Target Lesion ID", "data_type": "text", "required": true}},
   {{"field_id": "TUMOR_SIZE", "field_name": "lesion_size", "field_label": "Lesion Size (mm)", "data_type": "number", "required": true}}
-]
+]}}
 
 Generate 3-6 relevant fields for {assessment_name} in {spec.indication}.
-Return ONLY the JSON array, no other text."""
+Return ONLY the JSON object, no other text."""
 
-                response = self.llm_service.client.chat.completions.create(
+                stream = self.llm_service.client.chat.completions.create(
                     model=self.llm_service.model,
                     messages=[{"role": "user", "content": prompt}],
-                    temperature=0.5,
-                    max_tokens=1000,
+                    temperature=CRF_FIELDS_TEMPERATURE,
+                    max_tokens=CRF_FIELDS_MAX_TOKENS,
+                    response_format={"type": "json_object"},
+                    stream=True,
                 )
                 
-                llm_response = response.choices[0].message.content.strip()
-                
-                # Parse JSON
-                import json
-                import re
-                
-                json_match = re.search(r'\[.*\]', llm_response, re.DOTALL)
-                if json_match:
-                    field_dicts = json.loads(json_match.group())
-                    
-                    # Convert to CRFField objects
-                    fields = []
-                    for fd in field_dicts:
-                        fields.append(CRFField(
-                            field_id=fd.get('field_id', f'FIELD_{len(fields)}'),
-                            field_name=fd.get('field_name', 'field'),
-                            field_label=fd.get('field_label', 'Field'),
-                            data_type=fd.get('data_type', 'text'),
-                            required=fd.get('required', False),
-                        ))
-                    
-                    print(f"✓ Generated {len(fields)} CRF fields for {assessment_name} using LLM")
-                    
-                    return CRFForm(
-                        form_id=assessment_id,
-                        form_name=assessment_name,
-                        form_description=assessment_desc,
-                        fields=fields,
-                        repeating=True,  # Most assessments can repeat
-                    )
+                field_dicts = _normalize_crf_fields(_parse_json_list(_read_json_stream(stream), "fields") or [])
+                if field_dicts:
+                    form = self._build_assessment_form(assessment, field_dicts)
+                    self._cache_fields(self._fields_cache_key(spec, assessment), field_dicts)
+                    logger.info("Generated %d CRF fields for %s using LLM", len(form.fields), assessment_name)
+                    return form
                 
             except Exception as e:
-                print(f"⚠ LLM CRF field generation failed for {assessment_name}: {e}")
+                logger.warning("LLM CRF field generation failed for %s: %s", assessment_name, e)
         
         # Fallback: Create generic form
-        return None
-        
-        return CRFSchema(
-            study_id=protocol.protocol_id,
-            version="1.0",
-            generated_at=datetime.now(),
-            forms=forms,
-            visits=visits,
-            cdash_compliance=True,
-            sdtm_mappings={
-                "SUBJID": "usubjid",
-                "VISITNUM": "visitnum",
-                "VISIT": "visit",
+        return self._fallback_assessment_form(assessment)
+    
+    def _fallback_assessment_form(self, assessment: Dict[str, Any]) -> CRFForm:
+        """Build a minimal form capturing an assessment's date and free-text result."""
+        assessment_id = assessment.get('assessment_id', 'CUSTOM')
+        return self._build_assessment_form(assessment, _normalize_crf_fields([
+            {
+                "field_id": f"{assessment_id}_DATE",
+                "field_name": "assessment_date",
+                "field_label": "Assessment Date",
+                "data_type": "date",
+                "required": True,
             },
-        )
+            {
+                "field_id": f"{assessment_id}_RESULT",
+                "field_name": "result",
+                "field_label": f"{assessment.get('name', 'Custom Assessment')} Result",
+                "data_type": "text",
+                "required": True,
+            },
+        ]))
     
-    def _generate_standard_forms(self, spec: TrialSpecInput) -> List[CRFForm]:
-        """Generate standard CRF forms."""
-        forms = []
-        
-        # Demographics Form
-        demo_fields = [
-            CRFField(
-                field_id="SUBJID",
-                field_name="subject_id",
-                field_label="Subject ID",
-                data_type="text",
-                required=True,
-                cdash_variable="SUBJID",
-                sdtm_variable="USUBJID",
-            ),
-            CRFField(
-                field_id="AGE",
-                field_name="age",
-                field_label="Age (years)",
-                data_type="number",
-                required=True,
-                validation_rules={"min": 0, "max": 120},
-                cdash_variable="AGE",
-                sdtm_variable="AGE",
-            ),
-            CRFField(
-                field_id="SEX",
-                field_name="sex",
-                field_label="Sex",
-                data_type="radio",
-                required=True,
-                validation_rules={"options": ["Male", "Female", "Other"]},
-                cdash_variable="SEX",
-                sdtm_variable="SEX",
-            ),
-            CRFField(
-                field_id="RACE",
-                field_name="race",
-                field_label="Race",
-                data_type="dropdown",
-                required=True,
-                controlled_vocabulary="CDASH_RACE",
-                cdash_variable="RACE",
-                sdtm_variable="RACE",
-            ),
-        ]
-        
-        forms.append(CRFForm(
-            form_id="DM",
-            form_name="Demographics",
-            form_description="Subject demographics and baseline characteristics",
-            fields=demo_fields,
-            repeating=False,
-        ))
-        
-        # Vital Signs Form
-        vital_fields = [
-            CRFField(
-                field_id="VS_DATE",
-                field_name="assessment_date",
-                field_label="Assessment Date",
-                data_type="date",
-                required=True,
-                cdash_variable="VSDTC",
-            ),
-            CRFField(
-                field_id="SYSBP",
-                field_name="systolic_bp",
-                field_label="Systolic Blood Pressure (mmHg)",
-                data_type="number",
-                required=True,
-                validation_rules={"min": 50, "max": 250},
-                cdash_variable="VSORRES",
-                sdtm_variable="VSSTRESN",
-            ),
-            CRFField(
-                field_id="DIABP",
-                field_name="diastolic_bp",
-                field_label="Diastolic Blood Pressure (mmHg)",
-                data_type="number",
-                required=True,
-                validation_rules={"min": 30, "max": 150},
-                cdash_variable="VSORRES",
-                sdtm_variable="VSSTRESN",
-            ),
-            CRFField(
-                field_id="HR",
-                field_name="heart_rate",
-                field_label="Heart Rate (bpm)",
-                data_type="number",
-                required=True,
-                validation_rules={"min": 30, "max": 200},
-                cdash_variable="VSORRES",
-                sdtm_variable="VSSTRESN",
-            ),
-            CRFField(
-                field_id="TEMP",
-                field_name="temperature",
-                field_label="Temperature (°C)",
-                data_type="number",
-                required=True,
-                validation_rules={"min": 35.0, "max": 42.0},
-                cdash_variable="VSORRES",
-                sdtm_variable="VSSTRESN",
-            ),
-        ]
-        
-        forms.append(CRFForm(
-            form_id="VS",
-            form_name="Vital Signs",
-            form_description="Vital signs assessment",
-            fields=vital_fields,
-            repeating=False,
-        ))
-        
-        # Adverse Events Form
-        ae_fields = [
-            CRFField(
-                field_id="AE_TERM",
-                field_name="ae_term",
-                field_label="Adverse Event Term",
-                data_type="text",
-                required=True,
-                cdash_variable="AETERM",
-                sdtm_variable="AETERM",
-            ),
-            CRFField(
-                field_id="AE_START",
-                field_name="ae_start_date",
-                field_label="Start Date",
-                data_type="date",
-                required=True,
-                cdash_variable="AESTDTC",
-            ),
-            CRFField(
-                field_id="AE_SEV",
-                field_name="severity",
-                field_label="Severity",
-                data_type="dropdown",
-                required=True,
-                validation_rules={"options": ["Mild", "Moderate", "Severe"]},
-                cdash_variable="AESEV",
-                sdtm_variable="AESEV",
-            ),
-            CRFField(
-                field_id="AE_REL",
-                field_name="relationship",
-                field_label="Relationship to Study Drug",
-                data_type="dropdown",
-                required=True,
-                validation_rules={"options": ["Not Related", "Unlikely", "Possible", "Probable", "Definite"]},
-                cdash_variable="AEREL",
-                sdtm_variable="AEREL",
-            ),
-        ]
-        
-        forms.append(CRFForm(
-            form_id="AE",
-            form_name="Adverse Events",
-            form_description="Adverse event reporting",
-            fields=ae_fields,
-            repeating=True,
-        ))
-        
-        # Efficacy Assessment (if endpoints mention scores)
-        has_score_endpoint = any("score" in ep.name.lower() for ep in spec.key_endpoints)
-        if has_score_endpoint:
-            score_fields = [
-                CRFField(
-                    field_id="SCORE_DATE",
-                    field_name="assessment_date",
-                    field_label="Assessment Date",
-                    data_type="date",
-                    required=True,
-                ),
-                CRFField(
-                    field_id="TOTAL_SCORE",
-                    field_name="total_score",
-                    field_label="Total Score",
-                    data_type="number",
-                    required=True,
-                    validation_rules={"min": 0, "max": 100},
-                ),
-            ]
-            
-            forms.append(CRFForm(
-                form_id="EFF",
-                form_name="Efficacy Assessment",
-                form_description="Clinical efficacy score assessment",
-                fields=score_fields,
-                repeating=False,
-            ))
-        
-        return forms
+    def _generate_standard_forms(self, has_score_endpoint: bool) -> List[CRFForm]:
+        """Generate standard CRF forms, adding the efficacy form if an endpoint is a score."""
+        # Copies, so a caller editing its schema cannot change the shared templates
+        forms = _STANDARD_FORMS_WITH_EFFICACY if has_score_endpoint else _STANDARD_FORMS
+        return [form.model_copy(deep=True) for form in forms]
     
     def _generate_visit_definitions(self, visit_schedule: List[Dict[str, Any]]) -> List[VisitDefinition]:
         """Generate visit definitions with form assignments."""
         visits = []
         
         for i, visit in enumerate(visit_schedule, 1):
-            # Standard forms for all visits
-            forms = ["VS", "AE"]
-            
-            # Demographics only at screening
-            if visit["visit_id"] == "V0":
-                forms.insert(0, "DM")
-            
-            # Efficacy at baseline and follow-ups
-            if visit["visit_id"] != "V0":
-                forms.append("EFF")
-            
+            visit_id = visit["visit_id"]
+            week = visit["week"]
             visits.append(VisitDefinition(
-                visit_id=visit["visit_id"],
+                visit_id=visit_id,
                 visit_name=visit["visit_name"],
                 visit_number=i,
-                timepoint=f"Week {visit['week']}" if visit['week'] >= 0 else "Screening",
+                timepoint=f"Week {week}" if week >= 0 else "Screening",
                 window=visit.get("window"),
-                forms=forms,
+                forms=_SCREENING_VISIT_FORMS if visit_id == "V0" else _TREATMENT_VISIT_FORMS,
             ))
         
         return visits
@@ -1,12 +1,254 @@
 """LLM service for AI-enhanced protocol generation using OpenAI."""
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from collections import OrderedDict
+from contextlib import closing
+from copy import deepcopy
+import hashlib
+import json
+import logging
+import threading
+import time
+import httpx
+from openai import OpenAI, DefaultHttpxClient
 from config import settings
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token, for estimating a request's prompt tokens
+CHARS_PER_TOKEN = 4
+
+# System prompt for protocol section writing
+SECTION_SYSTEM_PROMPT = (
+    "You are an expert clinical trial protocol writer with deep knowledge of "
+    "ICH-GCP guidelines, CDISC standards, and regulatory requirements."
+)
+
+# Fixed opening of every section prompt. OpenAI caches prompt prefixes, so
+# everything that varies per call (trial, template, examples) comes after it.
+SECTION_INSTRUCTIONS = """You are an expert clinical trial protocol writer. Generate professional sections for a clinical trial protocol.
+
+## Instructions:
+1. Use the template as a base structure
+2. Incorporate insights from similar protocols if provided
+3. Ensure content is scientifically accurate and follows ICH-GCP guidelines
+4. Use professional clinical trial language
+5. Be specific and detailed where appropriate
+6. Include all required regulatory elements for the requested section"""
+
+# Prompt templates, rendered with str.format_map over the trial spec and
+# per-call values. Missing trial spec keys render as None.
+TRIAL_SPECIFICATION_TEMPLATE = """## Trial Specification:
+- Title: {title}
+- Phase: {phase}
+- Indication: {indication}
+- Design: {design}
+- Sample Size: {sample_size}
+- Duration: {duration_weeks} weeks"""
+
+SECTION_PROMPT_TEMPLATE = SECTION_INSTRUCTIONS + "\n\n" + TRIAL_SPECIFICATION_TEMPLATE + """
+
+## Template Content:
+{template_content}
+
+{rag_examples}
+
+Generate the enhanced {section_type} section:"""
+
+OBJECTIVES_PROMPT_TEMPLATE = """Generate primary and secondary objectives for a clinical trial.
+
+## Trial Details:
+- Title: {title}
+- Phase: {phase}
+- Indication: {indication}
+- Design: {design}
+
+{rag_objectives}{user_instructions}
+
+## Instructions:
+1. Primary objective should be clear, measurable, and align with the study design
+2. Include 2-3 secondary objectives covering safety, tolerability, and additional efficacy endpoints
+3. Use standard clinical trial objective language
+4. Be specific about endpoints where possible
+
+Return ONLY a JSON object with this exact format:
+{{
+    "primary": "Primary objective text here",
+    "secondary": "Secondary objectives text here (can be multiple objectives in one string)"
+}}"""
+
+INCLUSION_PROMPT_TEMPLATE = """Generate comprehensive inclusion criteria for a clinical trial.
+
+## Trial Details:
+- Phase: {phase}
+- Indication: {indication}
+- Design: {design}
+
+{rag_criteria}{user_instructions}
+
+## Instructions:
+Generate 6-10 inclusion criteria that are:
+1. Specific and measurable
+2. Appropriate for the indication and phase
+3. Follow standard clinical trial criteria format
+4. Include age, diagnosis, consent, and relevant clinical parameters
+
+Return ONLY a JSON array of strings:
+["Criterion 1", "Criterion 2", ...]"""
+
+EXCLUSION_PROMPT_TEMPLATE = """Generate exclusion criteria for a clinical trial.
+
+## Trial Details:
+- Phase: {phase}
+- Indication: {indication}
+
+{user_instructions}
+Generate 4-8 exclusion criteria covering contraindications, safety concerns, and confounding factors.
+
+Return ONLY a JSON array of strings:
+["Criterion 1", "Criterion 2", ...]"""
+
+# Maximum number of objective and criteria responses kept in the in-process cache
+RESPONSE_CACHE_SIZE = 256
+
+
+def _spec_hash(trial_spec: Any) -> str:
+    """Stable hash of a JSON-serializable prompt input."""
+    canonical = json.dumps(trial_spec, sort_keys=True, default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _PromptValues(dict):
+    """format_map values that render missing keys as None, like dict.get."""
+    
+    def __missing__(self, key: str) -> None:
+        return None
+
+
+def _render_prompt(template: str, trial_spec: Dict[str, Any], **values: Any) -> str:
+    """Fill a prompt template from the trial spec and per-call values."""
+    return template.format_map(_PromptValues(trial_spec, **values))
+
+
+class RateLimiter:
+    """
+    Thread-safe token buckets for OpenAI's per-minute request and token limits.
+    
+    Each bucket refills continuously at its per-minute limit. Limits and
+    remaining budgets reported in x-ratelimit-* response headers replace the
+    configured estimates as responses arrive.
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """
+        Initialize full buckets.
+        
+        Args:
+            requests_per_minute: Initial request limit
+            tokens_per_minute: Initial token limit
+        """
+        self.request_capacity = float(requests_per_minute)
+        self.token_capacity = float(tokens_per_minute)
+        self.available_requests = self.request_capacity
+        self.available_tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        """Add the budget accrued since the last refill (lock held)."""
+        now = time.monotonic()
+        elapsed_minutes = (now - self._updated) / 60
+        self._updated = now
+        self.available_requests = min(
+            self.request_capacity, self.available_requests + elapsed_minutes * self.request_capacity
+        )
+        self.available_tokens = min(
+            self.token_capacity, self.available_tokens + elapsed_minutes * self.token_capacity
+        )
+    
+    def acquire(self, tokens: int):
+        """
+        Block until one request and the given tokens fit the budget, then spend them.
+        
+        Args:
+            tokens: Estimated prompt plus completion tokens of the request
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                # A request larger than the whole bucket waits for a full bucket
+                needed = min(float(tokens), self.token_capacity)
+                if self.available_requests >= 1 and self.available_tokens >= needed:
+                    self.available_requests -= 1
+                    self.available_tokens -= needed
+                    return
+                wait = 60 * max(
+                    (1 - self.available_requests) / self.request_capacity,
+                    (needed - self.available_tokens) / self.token_capacity,
+                )
+            time.sleep(max(wait, 0.01))
+    
+    def update_from_headers(self, headers: httpx.Headers):
+        """
+        Adopt the limits and remaining budget reported by the API.
+        
+        Args:
+            headers: Response headers
+        """
+        try:
+            limits = {
+                name: float(headers[f"x-ratelimit-{name}"])
+                for name in ("limit-requests", "limit-tokens", "remaining-requests", "remaining-tokens")
+                if f"x-ratelimit-{name}" in headers
+            }
+        except ValueError:
+            return
+        
+        with self._lock:
+            self._refill()
+            if limits.get("limit-requests"):
+                self.request_capacity = limits["limit-requests"]
+            if limits.get("limit-tokens"):
+                self.token_capacity = limits["limit-tokens"]
+            # Other clients share the account, so never assume more than the API reports
+            if "remaining-requests" in limits:
+                self.available_requests = min(self.available_requests, limits["remaining-requests"])
+            if "remaining-tokens" in limits:
+                self.available_tokens = min(self.available_tokens, limits["remaining-tokens"])
+    
+    def throttle_request(self, request: httpx.Request):
+        """httpx request hook: wait for budget before a completion request is sent."""
+        if not request.url.path.endswith("/completions"):
+            return
+        try:
+            content = request.content
+        except httpx.RequestNotRead:
+            content = b""
+        try:
+            body = json.loads(content)
+        except ValueError:
+            body = {}
+        max_tokens = (body.get("max_tokens") or 0) if isinstance(body, dict) else 0
+        self.acquire(len(content) // CHARS_PER_TOKEN + max_tokens)
+    
+    def record_response(self, response: httpx.Response):
+        """httpx response hook: track the rate limits reported by the API."""
+        self.update_from_headers(response.headers)
+
 
 class LLMService:
     """Service for interacting with OpenAI's LLM."""
     
+    # Objective and criteria responses, shared by all instances and least recently used first
+    _response_cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+    _response_cache_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize OpenAI client."""
         if not settings.openai_api_key:
@@ -14,8 +256,40 @@ class LLMService:
                 "OpenAI API key not configured. Set OPENAI_API_KEY environment variable."
             )
         
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        # Requests wait for rate-limit budget instead of failing with 429s;
+        # the OpenAI client still retries 429s after the Retry-After delay
+        self.rate_limiter = RateLimiter(
+            settings.llm_requests_per_minute,
+            settings.llm_tokens_per_minute,
+        )
+        
+        # One pooled HTTP client, sized for the generator's concurrent section calls
+        http_client = DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(
+                settings.llm_timeout_seconds,
+                connect=settings.llm_connect_timeout_seconds,
+            ),
+            http2=HTTP2_AVAILABLE,
+            event_hooks={
+                "request": [self.rate_limiter.throttle_request],
+                "response": [self.rate_limiter.record_response],
+            },
+        )
+        self.client = OpenAI(
+            api_key=settings.openai_api_key,
+            http_client=http_client,
+            max_retries=settings.llm_max_retries,
+        )
         self.model = "gpt-4o"  # or "gpt-3.5-turbo" for faster/cheaper
+        self.structured_model = settings.llm_structured_model  # JSON extraction, no prose
+    
+    def close(self):
+        """Close the pooled HTTP client and its connections."""
+        self.client.close()
         
     def enhance_protocol_section(
         self,
@@ -36,52 +310,10 @@ class LLMService:
         Returns:
             Enhanced section content
         """
-        # Build context from similar protocols
-        rag_examples = ""
-        if rag_context:
-            rag_examples = "\n\n## Similar Protocol Examples:\n"
-            for i, protocol in enumerate(rag_context[:2], 1):
-                rag_examples += f"\n### Example {i}:\n"
-                rag_examples += f"Title: {protocol.get('title', 'N/A')}\n"
-                if 'protocol' in protocol:
-                    rag_examples += f"Content: {str(protocol['protocol'])[:500]}...\n"
-        
-        # Create prompt
-        prompt = f"""You are an expert clinical trial protocol writer. Generate a professional {section_type} section for a clinical trial protocol.
-
-## Trial Specification:
-- Title: {trial_spec.get('title')}
-- Phase: {trial_spec.get('phase')}
-- Indication: {trial_spec.get('indication')}
-- Design: {trial_spec.get('design')}
-- Sample Size: {trial_spec.get('sample_size')}
-- Duration: {trial_spec.get('duration_weeks')} weeks
-
-## Template Content:
-{template_content}
-
-{rag_examples}
-
-## Instructions:
-1. Use the template as a base structure
-2. Incorporate insights from similar protocols if provided
-3. Ensure content is scientifically accurate and follows ICH-GCP guidelines
-4. Use professional clinical trial language
-5. Be specific and detailed where appropriate
-6. Include all required regulatory elements for a {section_type} section
-
-Generate the enhanced {section_type} section:"""
-
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert clinical trial protocol writer with deep knowledge of ICH-GCP guidelines, CDISC standards, and regulatory requirements.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
+                messages=self._build_messages(section_type, template_content, trial_spec, rag_context),
                 temperature=0.7,
                 max_tokens=2000,
             )
@@ -89,14 +321,108 @@ Generate the enhanced {section_type} section:"""
             return response.choices[0].message.content.strip()
             
         except Exception as e:
-            print(f"⚠ LLM generation failed: {e}. Falling back to template.")
+            logger.warning("LLM generation failed: %s. Falling back to template.", e)
             return template_content
     
+    def enhance_protocol_section_stream(
+        self,
+        section_type: str,
+        template_content: str,
+        trial_spec: Dict[str, Any],
+        rag_context: Optional[List[Dict]] = None,
+    ) -> Iterator[str]:
+        """
+        Enhance a protocol section, yielding text as the LLM produces it.
+        
+        Interactive callers can show the section from the first token
+        instead of waiting for the whole completion.
+        
+        Args:
+            section_type: Type of section (synopsis, objectives, etc.)
+            template_content: Base template content
+            trial_spec: Trial specification details
+            rag_context: Similar protocols from RAG for context
+            
+        Yields:
+            Chunks of enhanced section content; the template if the LLM fails
+            before producing any text. A failure after partial output is
+            re-raised, since the caller already has part of the section.
+        """
+        generated = False
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(section_type, template_content, trial_spec, rag_context),
+                temperature=0.7,
+                max_tokens=2000,
+                stream=True,
+            )
+            with closing(stream):
+                for chunk in stream:
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        generated = True
+                        yield content
+            
+        except Exception as e:
+            if generated:
+                logger.warning("LLM stream failed after partial output: %s", e)
+                raise
+            logger.warning("LLM generation failed: %s. Falling back to template.", e)
+            yield template_content
+    
+    def _build_messages(
+        self,
+        section_type: str,
+        template_content: str,
+        trial_spec: Dict[str, Any],
+        rag_context: Optional[List[Dict]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for enhancing a protocol section.
+        
+        Shared by the blocking and streaming enhancement paths.
+        
+        Args:
+            section_type: Type of section (synopsis, objectives, etc.)
+            template_content: Base template content
+            trial_spec: Trial specification details
+            rag_context: Similar protocols from RAG for context
+            
+        Returns:
+            System and user messages
+        """
+        prompt = _render_prompt(
+            SECTION_PROMPT_TEMPLATE,
+            trial_spec,
+            template_content=template_content,
+            rag_examples=self._format_rag_examples(rag_context),
+            section_type=section_type,
+        )
+
+        return [
+            {"role": "system", "content": SECTION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+    
+    def _format_rag_examples(self, rag_context: Optional[List[Dict]]) -> str:
+        """Build context from the most similar protocols, in retrieval order."""
+        rag_examples = ""
+        if rag_context:
+            rag_examples = "\n\n## Similar Protocol Examples:\n"
+            for i, protocol in enumerate(rag_context[:2], 1):
+                rag_examples += f"\n### Example {i}:\n"
+                rag_examples += f"Title: {protocol.get('title', 'N/A')}\n"
+                if 'protocol' in protocol:
+                    rag_examples += f"Content: {str(protocol['protocol'])[:500]}...\n"
+        return rag_examples
+    
     def generate_objectives(
         self,
         trial_spec: Dict[str, Any],
         rag_context: Optional[List[Dict]] = None,
         additional_instructions: Optional[str] = None,
+        use_defaults: bool = True,
     ) -> Dict[str, str]:
         """
         Generate primary and secondary objectives using LLM.
@@ -104,10 +430,17 @@ Generate the enhanced {section_type} section:"""
         Args:
             trial_spec: Trial specification details
             rag_context: Similar protocols for context
+            use_defaults: Return default objectives when the LLM call fails
+                instead of raising
             
         Returns:
             Dictionary with 'primary' and 'secondary' objectives
         """
+        cache_key = self._response_cache_key("objectives", trial_spec, rag_context, additional_instructions)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
         # Build RAG context
         rag_objectives = ""
         if rag_context:
@@ -124,27 +457,12 @@ Generate the enhanced {section_type} section:"""
         if additional_instructions:
             user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{additional_instructions}\n"
         
-        prompt = f"""Generate primary and secondary objectives for a clinical trial.
-
-## Trial Details:
-- Title: {trial_spec.get('title')}
-- Phase: {trial_spec.get('phase')}
-- Indication: {trial_spec.get('indication')}
-- Design: {trial_spec.get('design')}
-
-{rag_objectives}{user_instructions}
-
-## Instructions:
-1. Primary objective should be clear, measurable, and align with the study design
-2. Include 2-3 secondary objectives covering safety, tolerability, and additional efficacy endpoints
-3. Use standard clinical trial objective language
-4. Be specific about endpoints where possible
-
-Return ONLY a JSON object with this exact format:
-{{
-    "primary": "Primary objective text here",
-    "secondary": "Secondary objectives text here (can be multiple objectives in one string)"
-}}"""
+        prompt = _render_prompt(
+            OBJECTIVES_PROMPT_TEMPLATE,
+            trial_spec,
+            rag_objectives=rag_objectives,
+            user_instructions=user_instructions,
+        )
 
         try:
             response = self.client.chat.completions.create(
@@ -161,12 +479,14 @@ Return ONLY a JSON object with this exact format:
                 response_format={"type": "json_object"},
             )
             
-            import json
             result = json.loads(response.choices[0].message.content)
+            self._cache_response(cache_key, result)
             return result
             
         except Exception as e:
-            print(f"⚠ LLM objective generation failed: {e}. Using defaults.")
+            if not use_defaults:
+                raise
+            logger.warning("LLM objective generation failed: %s. Using defaults.", e)
             return {
                 "primary": f"To evaluate the efficacy of the study intervention in patients with {trial_spec.get('indication')}.",
                 "secondary": "To assess the safety and tolerability of the study intervention.",
@@ -177,6 +497,7 @@ Return ONLY a JSON object with this exact format:
         trial_spec: Dict[str, Any],
         rag_context: Optional[List[Dict]] = None,
         additional_instructions: Optional[str] = None,
+        use_defaults: bool = True,
     ) -> List[str]:
         """
         Generate inclusion criteria using LLM.
@@ -184,10 +505,17 @@ Return ONLY a JSON object with this exact format:
         Args:
             trial_spec: Trial specification details
             rag_context: Similar protocols for context
+            use_defaults: Return default criteria when the LLM call fails
+                instead of raising
             
         Returns:
             List of inclusion criteria
         """
+        cache_key = self._response_cache_key("inclusion_criteria", trial_spec, rag_context, additional_instructions)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
         rag_criteria = ""
         if rag_context:
             rag_criteria = "\n\n## Example Criteria from Similar Protocols:\n"
@@ -204,24 +532,12 @@ Return ONLY a JSON object with this exact format:
         if additional_instructions:
             user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{additional_instructions}\n"
         
-        prompt = f"""Generate comprehensive inclusion criteria for a clinical trial.
-
-## Trial Details:
-- Phase: {trial_spec.get('phase')}
-- Indication: {trial_spec.get('indication')}
-- Design: {trial_spec.get('design')}
-
-{rag_criteria}{user_instructions}
-
-## Instructions:
-Generate 6-10 inclusion criteria that are:
-1. Specific and measurable
-2. Appropriate for the indication and phase
-3. Follow standard clinical trial criteria format
-4. Include age, diagnosis, consent, and relevant clinical parameters
-
-Return ONLY a JSON array of strings:
-["Criterion 1", "Criterion 2", ...]"""
+        prompt = _render_prompt(
+            INCLUSION_PROMPT_TEMPLATE,
+            trial_spec,
+            rag_criteria=rag_criteria,
+            user_instructions=user_instructions,
+        )
 
         try:
             response = self.client.chat.completions.create(
@@ -238,27 +554,30 @@ Return ONLY a JSON array of strings:
                 response_format={"type": "json_object"},
             )
             
-            import json
             # OpenAI returns {"criteria": [...]} or similar, extract the array
             result = json.loads(response.choices[0].message.content)
             
             # Handle different possible response formats
+            criteria = None
             if isinstance(result, list):
-                return result
+                criteria = result
             elif 'criteria' in result:
-                return result['criteria']
+                criteria = result['criteria']
             elif 'inclusion_criteria' in result:
-                return result['inclusion_criteria']
+                criteria = result['inclusion_criteria']
             else:
                 # Return first list found in the response
-                for value in result.values():
-                    if isinstance(value, list):
-                        return value
+                criteria = next((value for value in result.values() if isinstance(value, list)), None)
             
-            raise ValueError("No list found in LLM response")
+            if criteria is None:
+                raise ValueError("No list found in LLM response")
+            self._cache_response(cache_key, criteria)
+            return criteria
             
         except Exception as e:
-            print(f"⚠ LLM criteria generation failed: {e}. Using defaults.")
+            if not use_defaults:
+                raise
+            logger.warning("LLM criteria generation failed: %s. Using defaults.", e)
             return [
                 f"Age ≥18 years",
                 f"Confirmed diagnosis of {trial_spec.get('indication')}",
@@ -271,25 +590,21 @@ Return ONLY a JSON array of strings:
         trial_spec: Dict[str, Any],
         rag_context: Optional[List[Dict]] = None,
         additional_instructions: Optional[str] = None,
+        use_defaults: bool = True,
     ) -> List[str]:
         """Generate exclusion criteria using LLM."""
+        cache_key = self._response_cache_key("exclusion_criteria", trial_spec, rag_context, additional_instructions)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
         # Add user instructions if provided
         user_instructions = ""
         if additional_instructions:
             user_instructions = f"\n\n## ADDITIONAL USER INSTRUCTIONS:\n{additional_instructions}\n"
         
         # Similar to inclusion criteria but for exclusions
-        prompt = f"""Generate exclusion criteria for a clinical trial.
-
-## Trial Details:
-- Phase: {trial_spec.get('phase')}
-- Indication: {trial_spec.get('indication')}
-
-{user_instructions}
-Generate 4-8 exclusion criteria covering contraindications, safety concerns, and confounding factors.
-
-Return ONLY a JSON array of strings:
-["Criterion 1", "Criterion 2", ...]"""
+        prompt = _render_prompt(EXCLUSION_PROMPT_TEMPLATE, trial_spec, user_instructions=user_instructions)
 
         try:
             response = self.client.chat.completions.create(
@@ -306,28 +621,71 @@ Return ONLY a JSON array of strings:
                 response_format={"type": "json_object"},
             )
             
-            import json
             result = json.loads(response.choices[0].message.content)
             
             # Extract array from response
-            if isinstance(result, list):
-                return result
-            for key in ['criteria', 'exclusion_criteria', 'exclusions']:
-                if key in result and isinstance(result[key], list):
-                    return result[key]
-            for value in result.values():
-                if isinstance(value, list):
-                    return value
+            criteria = result if isinstance(result, list) else None
+            if criteria is None:
+                for key in ['criteria', 'exclusion_criteria', 'exclusions']:
+                    if key in result and isinstance(result[key], list):
+                        criteria = result[key]
+                        break
+            if criteria is None:
+                criteria = next((value for value in result.values() if isinstance(value, list)), None)
             
-            raise ValueError("No list found in LLM response")
+            if criteria is None:
+                raise ValueError("No list found in LLM response")
+            self._cache_response(cache_key, criteria)
+            return criteria
             
         except Exception as e:
-            print(f"⚠ LLM exclusion generation failed: {e}. Using defaults.")
+            if not use_defaults:
+                raise
+            logger.warning("LLM exclusion generation failed: %s. Using defaults.", e)
             return [
                 "Pregnancy or lactation",
                 "Known hypersensitivity to study drug",
                 "Participation in another clinical trial within 30 days",
             ]
+    
+    def _response_cache_key(
+        self,
+        section: str,
+        trial_spec: Dict[str, Any],
+        rag_context: Optional[List[Dict]],
+        additional_instructions: Optional[str],
+    ) -> Tuple:
+        """
+        Build the response cache key for a generated section.
+        
+        Args:
+            section: Section name
+            trial_spec: Trial specification details
+            rag_context: Similar protocols included in the prompt
+            additional_instructions: User instructions included in the prompt
+            
+        Returns:
+            Hashable cache key
+        """
+        rag_ids = [protocol.get('id') for protocol in rag_context or []]
+        return (section, self.model, _spec_hash(trial_spec), _spec_hash(rag_ids), additional_instructions)
+    
+    def _get_cached_response(self, key: Tuple) -> Optional[Any]:
+        """Return a copy of a cached response, or None on a miss."""
+        with self._response_cache_lock:
+            value = self._response_cache.get(key)
+            if value is None:
+                return None
+            self._response_cache.move_to_end(key)
+        return deepcopy(value)
+    
+    def _cache_response(self, key: Tuple, value: Any):
+        """Store a response, evicting the least recently used entry."""
+        with self._response_cache_lock:
+            self._response_cache[key] = deepcopy(value)
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
 
 
 # Singleton instance
@@ -342,6 +700,14 @@ def get_llm_service() -> LLMService:
     return _llm_service
 
 
+def close_llm_service():
+    """Close the LLM service singleton, if it was created."""
+    global _llm_service
+    if _llm_service is not None:
+        _llm_service.close()
+        _llm_service = None
+
+
 def is_llm_available() -> bool:
     """Check if LLM service is available."""
     try:
@@ -1,11 +1,18 @@
 """RAG (Retrieval-Augmented Generation) service using ChromaDB."""
 import os
-import sys
-import warnings
-from io import StringIO
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any, Optional
+from chromadb.utils import embedding_functions
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from typing import List, Dict, Any, Optional, Tuple
 import json
 from datetime import datetime
 import uuid
@@ -13,8 +20,135 @@ import uuid
 from config import settings
 from app.models.schemas import TrialSpecInput, ProtocolStructured
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    OPTIMUM_AVAILABLE = True
+except ImportError:
+    OPTIMUM_AVAILABLE = False
+
 # Disable ChromaDB telemetry to suppress warning messages
 os.environ['ANONYMIZED_TELEMETRY'] = 'False'
+logging.getLogger('chromadb').setLevel(logging.ERROR)
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of query embeddings kept in memory, keyed by search text
+EMBEDDING_CACHE_SIZE = 256
+
+# Protocol examples embedded and added per Chroma call when seeding from files
+SEED_BATCH_SIZE = 64
+
+# Protocol examples listed per page by default
+LIST_PAGE_SIZE = 100
+
+# Seconds a collection count is reused before asking Chroma again
+COUNT_CACHE_TTL_SECONDS = 5.0
+
+# Collection settings; cosine space makes 1 - distance the cosine similarity.
+# The HNSW graph favors recall for a corpus of a few thousand protocols
+# queried for the top 3; examples/benchmark_hnsw.py sweeps search_ef.
+# Chroma fixes these when a collection is created, so existing databases
+# keep their settings until cleared.
+COLLECTION_METADATA = {
+    "description": "Clinical trial protocol examples for RAG",
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 50,
+}
+
+
+def _json_loads(data) -> Any:
+    """Parse JSON text or bytes, with orjson when it is installed."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _enum_value(value: Any) -> Any:
+    """Value of an enum member, or the value itself for plain strings."""
+    return getattr(value, 'value', value)
+
+
+class QuantizedEmbedder(EmbeddingFunction):
+    """
+    Sentence embeddings from an INT8-quantized MiniLM on ONNX Runtime.
+    
+    Mean-pooled and normalized like Chroma's default embedder, at a
+    fraction of the FP32 model's CPU cost.
+    """
+    
+    def __init__(self, model_path: str, file_name: str = "model_quantized.onnx"):
+        """
+        Load the quantized model and its tokenizer.
+        
+        Args:
+            model_path: Directory with the quantized ONNX model and tokenizer
+            file_name: ONNX file within model_path
+        """
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_path,
+            file_name=file_name,
+            provider="CPUExecutionProvider",
+        )
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        """Embed a batch of documents."""
+        encoded = self.tokenizer(
+            list(input),
+            padding=True,
+            truncation=True,
+            max_length=256,
+            return_tensors="np",
+        )
+        hidden = self.model(**encoded).last_hidden_state
+        mask = encoded["attention_mask"][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+
+@lru_cache(maxsize=1)
+def _create_embedding_function() -> EmbeddingFunction:
+    """
+    Use the quantized embedder when configured, otherwise Chroma's default.
+    
+    Created once per process so the ONNX model is only loaded once.
+    """
+    if settings.rag_embedding_model_path:
+        if OPTIMUM_AVAILABLE:
+            return QuantizedEmbedder(settings.rag_embedding_model_path, settings.rag_embedding_model_file)
+        logger.warning("optimum[onnxruntime] not installed; using default RAG embeddings")
+    return embedding_functions.DefaultEmbeddingFunction()
+
+
+@lru_cache(maxsize=4)
+def _make_client(db_path: str) -> "chromadb.PersistentClient":
+    """
+    Open the persistent Chroma client for a database path, once per process.
+    
+    Args:
+        db_path: Vector database directory
+        
+    Returns:
+        Chroma client shared by every RAGService using that path
+    """
+    # Create client with telemetry disabled
+    chroma_settings = ChromaSettings(
+        anonymized_telemetry=False,
+        allow_reset=True
+    )
+    return chromadb.PersistentClient(
+        path=db_path,
+        settings=chroma_settings
+    )
 
 
 class RAGService:
@@ -25,31 +159,33 @@ class RAGService:
         # Initialize ChromaDB with persistent storage
         self.db_path = settings.vector_db_path
         
-        # Temporarily suppress stderr to hide ChromaDB telemetry warnings
-        original_stderr = sys.stderr
-        sys.stderr = StringIO()
+        # Full trial specs and protocols live on disk, one file per document;
+        # Chroma metadata only holds the filterable summary fields
+        self._blob_dir = Path(self.db_path) / "blobs"
+        self._blob_dir.mkdir(parents=True, exist_ok=True)
         
-        try:
-            # Create client with telemetry disabled
-            chroma_settings = ChromaSettings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-            self.client = chromadb.PersistentClient(
-                path=self.db_path,
-                settings=chroma_settings
-            )
-            
-            # Get or create collection for protocol examples
-            self.collection = self.client.get_or_create_collection(
-                name="protocol_examples",
-                metadata={"description": "Clinical trial protocol examples for RAG"}
-            )
-        finally:
-            # Restore stderr
-            sys.stderr = original_stderr
+        # MiniLM embedder, held here so query embeddings can be cached
+        self.embedding_function = _create_embedding_function()
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        
+        # (count, time it was read); None until the first read
+        self._count_cache: Optional[Tuple[int, float]] = None
         
-        print(f"✓ RAG Service initialized with {self.collection.count()} protocol examples")
+        # Bumped whenever examples are added or removed, so callers caching
+        # retrieval results can tell when they are stale
+        self.generation = 0
+        
+        self.client = _make_client(self.db_path)
+        
+        # Get or create collection for protocol examples
+        self.collection = self.client.get_or_create_collection(
+            name="protocol_examples",
+            metadata=COLLECTION_METADATA,
+            embedding_function=self.embedding_function,
+        )
+        
+        logger.info("RAG Service initialized with %s protocol examples", self.collection.count())
     
     def add_protocol_example(
         self,
@@ -68,6 +204,147 @@ class RAGService:
         Returns:
             Document ID in the vector database
         """
+        doc_id, search_text, doc_metadata = self._build_document(trial_spec, protocol, metadata)
+        self._write_blob(doc_id, trial_spec, protocol)
+        
+        # Add to vector database
+        self.collection.add(
+            documents=[search_text],
+            metadatas=[doc_metadata],
+            ids=[doc_id]
+        )
+        self._examples_changed()
+        
+        logger.info("Added protocol example: %s (%s - %s)", doc_id, trial_spec.phase.value, trial_spec.indication)
+        
+        return doc_id
+    
+    def add_protocol_examples_bulk(
+        self,
+        examples: List[Tuple[TrialSpecInput, ProtocolStructured]],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """
+        Add several protocol examples to the vector database in one call.
+        
+        The embedding model encodes all search texts in batches instead of
+        running once per protocol, which makes seeding and imports much faster.
+        
+        Args:
+            examples: (trial specification, generated protocol) pairs
+            metadata: Optional additional metadata applied to every example
+            
+        Returns:
+            Document IDs in the vector database, in input order
+        """
+        if not examples:
+            return []
+        
+        documents = [
+            self._build_document(trial_spec, protocol, metadata)
+            for trial_spec, protocol in examples
+        ]
+        doc_ids = [doc_id for doc_id, _, _ in documents]
+        for doc_id, (trial_spec, protocol) in zip(doc_ids, examples):
+            self._write_blob(doc_id, trial_spec, protocol)
+        
+        self.collection.add(
+            documents=[search_text for _, search_text, _ in documents],
+            metadatas=[doc_metadata for _, _, doc_metadata in documents],
+            ids=doc_ids
+        )
+        self._examples_changed()
+        
+        logger.info("Added %s protocol examples", len(doc_ids))
+        
+        return doc_ids
+    
+    def seed_from_files(
+        self,
+        paths: List[Path],
+        workers: int = 4,
+        batch_size: int = SEED_BATCH_SIZE,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """
+        Add protocol examples stored as JSON files.
+        
+        Each file holds {"trial_spec": ..., "protocol": ...}, the layout of the
+        blob store, so another database's blobs directory can be imported.
+        Worker threads read and validate files while the calling thread adds
+        them in batches; the embedding model releases the GIL, so parsing and
+        embedding overlap. A bounded queue keeps workers from running ahead.
+        
+        Args:
+            paths: JSON files to import
+            workers: Threads reading and validating files
+            batch_size: Examples per collection.add call
+            metadata: Optional additional metadata applied to every example
+            
+        Returns:
+            Document IDs of the added examples; unreadable files are skipped
+        """
+        examples: "queue.Queue" = queue.Queue(maxsize=workers * 2)
+        finished = object()
+        
+        def load(path: Path):
+            data = _json_loads(Path(path).read_bytes())
+            examples.put((
+                TrialSpecInput.model_validate(data['trial_spec']),
+                ProtocolStructured.model_validate(data['protocol']),
+            ))
+        
+        def load_all():
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(load, path) for path in paths]
+                for path, future in zip(paths, futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.warning("Skipping protocol file %s: %s", path, e)
+            examples.put(finished)
+        
+        loader = threading.Thread(target=load_all, daemon=True)
+        loader.start()
+        
+        doc_ids = []
+        batch = []
+        item = None
+        try:
+            while True:
+                item = examples.get()
+                if item is finished:
+                    break
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    doc_ids.extend(self.add_protocol_examples_bulk(batch, metadata))
+                    batch = []
+            doc_ids.extend(self.add_protocol_examples_bulk(batch, metadata))
+        finally:
+            # Keep draining so loader threads never block on a full queue
+            while item is not finished:
+                item = examples.get()
+            loader.join()
+        
+        return doc_ids
+    
+    def _build_document(
+        self,
+        trial_spec: TrialSpecInput,
+        protocol: ProtocolStructured,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Build the vector database entry for a protocol example.
+        
+        Args:
+            trial_spec: Input trial specification
+            protocol: Generated protocol
+            metadata: Optional additional metadata
+            
+        Returns:
+            Tuple of (document ID, search text, metadata)
+        """
         # Create unique ID
         doc_id = f"protocol_{uuid.uuid4().hex[:12]}"
         
@@ -90,31 +367,50 @@ class RAGService:
         if metadata:
             doc_metadata.update(metadata)
         
-        # Store the complete protocol data as JSON in metadata
-        doc_metadata["trial_spec_json"] = trial_spec.model_dump_json()
-        
-        # Convert protocol to JSON (handle datetime serialization)
-        import json
-        from datetime import datetime as dt_class
-        
-        def json_serial(obj):
-            """JSON serializer for objects not serializable by default json code"""
-            if isinstance(obj, dt_class):
-                return obj.isoformat()
-            raise TypeError(f"Type {type(obj)} not serializable")
+        return doc_id, search_text, doc_metadata
+    
+    def _blob_path(self, doc_id: str) -> Path:
+        """Path of the file holding a document's trial spec and protocol."""
+        return self._blob_dir / f"{doc_id}.json"
+    
+    def _write_blob(self, doc_id: str, trial_spec: TrialSpecInput, protocol: ProtocolStructured):
+        """
+        Store the complete trial spec and protocol for a document.
         
-        doc_metadata["protocol_json"] = json.dumps(protocol.model_dump(), default=json_serial)
+        Args:
+            doc_id: Document ID in the vector database
+            trial_spec: Input trial specification
+            protocol: Generated protocol
+        """
+        blob = f'{{"trial_spec": {trial_spec.model_dump_json()}, "protocol": {protocol.model_dump_json()}}}'
+        self._blob_path(doc_id).write_text(blob, encoding="utf-8")
+    
+    def _load_blob(self, doc_id: str, metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Load the trial spec and protocol stored for a document.
         
-        # Add to vector database
-        self.collection.add(
-            documents=[search_text],
-            metadatas=[doc_metadata],
-            ids=[doc_id]
-        )
+        Documents added before the blob store keep them as JSON in metadata;
+        those fields are removed from the metadata dict.
         
-        print(f"✓ Added protocol example: {doc_id} ({trial_spec.phase.value} - {trial_spec.indication})")
+        Args:
+            doc_id: Document ID in the vector database
+            metadata: Document metadata from Chroma
+            
+        Returns:
+            Tuple of (trial spec data, protocol data)
+        """
+        if 'protocol_json' in metadata:
+            return (
+                _json_loads(metadata.pop('trial_spec_json', '{}')),
+                _json_loads(metadata.pop('protocol_json', '{}')),
+            )
         
-        return doc_id
+        try:
+            raw = self._blob_path(doc_id).read_bytes()
+        except FileNotFoundError:
+            return {}, {}
+        data = _json_loads(raw)
+        return data.get('trial_spec', {}), data.get('protocol', {})
     
     def retrieve_similar_protocols(
         self,
@@ -135,14 +431,15 @@ class RAGService:
         query_text = self._create_search_text(trial_spec)
         
         # Check if collection is empty
-        if self.collection.count() == 0:
-            print("⚠ No protocol examples in database")
+        count = self._cached_count()
+        if count == 0:
+            logger.warning("No protocol examples in database")
             return []
         
         # Query vector database
         results = self.collection.query(
-            query_texts=[query_text],
-            n_results=min(n_results, self.collection.count()),
+            query_embeddings=[self._embed_query(query_text)],
+            n_results=min(n_results, count),
         )
         
         # Format results
@@ -153,9 +450,8 @@ class RAGService:
                 metadata = results['metadatas'][0][i]
                 distance = results['distances'][0][i] if 'distances' in results else None
                 
-                # Parse stored JSON
-                trial_spec_data = json.loads(metadata.pop('trial_spec_json', '{}'))
-                protocol_data = json.loads(metadata.pop('protocol_json', '{}'))
+                # Load stored trial spec and protocol for this hit only
+                trial_spec_data, protocol_data = self._load_blob(doc_id, metadata)
                 
                 similar_protocols.append({
                     'id': doc_id,
@@ -166,9 +462,9 @@ class RAGService:
                     'protocol': protocol_data,
                 })
             
-            print(f"✓ Retrieved {len(similar_protocols)} similar protocol(s)")
+            logger.debug("Retrieved %s similar protocol(s)", len(similar_protocols))
         else:
-            print("⚠ No similar protocols found")
+            logger.warning("No similar protocols found")
         
         return similar_protocols
     
@@ -188,8 +484,7 @@ class RAGService:
             if result and result['ids']:
                 metadata = result['metadatas'][0]
                 
-                trial_spec_data = json.loads(metadata.pop('trial_spec_json', '{}'))
-                protocol_data = json.loads(metadata.pop('protocol_json', '{}'))
+                trial_spec_data, protocol_data = self._load_blob(doc_id, metadata)
                 
                 return {
                     'id': doc_id,
@@ -200,7 +495,7 @@ class RAGService:
             
             return None
         except Exception as e:
-            print(f"✗ Error retrieving protocol {doc_id}: {e}")
+            logger.error("Error retrieving protocol %s: %s", doc_id, e)
             return None
     
     def delete_protocol(self, doc_id: str) -> bool:
@@ -215,21 +510,36 @@ class RAGService:
         """
         try:
             self.collection.delete(ids=[doc_id])
-            print(f"✓ Deleted protocol: {doc_id}")
+            self._examples_changed()
+            self._blob_path(doc_id).unlink(missing_ok=True)
+            logger.info("Deleted protocol: %s", doc_id)
             return True
         except Exception as e:
-            print(f"✗ Error deleting protocol {doc_id}: {e}")
+            logger.error("Error deleting protocol %s: %s", doc_id, e)
             return False
     
-    def list_all_protocols(self) -> List[Dict[str, Any]]:
+    def list_all_protocols(
+        self,
+        offset: int = 0,
+        page_size: Optional[int] = LIST_PAGE_SIZE
+    ) -> List[Dict[str, Any]]:
         """
-        List all protocol examples in the database.
+        List protocol examples in the database, a page at a time.
         
+        Args:
+            offset: Number of examples to skip
+            page_size: Maximum number of examples to return; None returns every
+                example and ignores offset
+            
         Returns:
-            List of all protocol metadata
+            List of protocol metadata
         """
         try:
-            result = self.collection.get()
+            # Only metadata crosses the Chroma boundary, not documents or embeddings
+            if page_size is None:
+                result = self.collection.get(include=["metadatas"])
+            else:
+                result = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
             
             protocols = []
             if result and result['ids']:
@@ -246,9 +556,20 @@ class RAGService:
             
             return protocols
         except Exception as e:
-            print(f"✗ Error listing protocols: {e}")
+            logger.error("Error listing protocols: %s", e)
             return []
     
+    def warmup(self):
+        """
+        Load the embedding model and HNSW index before the first request.
+        
+        Chroma loads both lazily, which would otherwise slow the first
+        retrieval by a few seconds.
+        """
+        self.embedding_function(["warmup"])
+        if self._cached_count() > 0:
+            self.collection.query(query_texts=["warmup"], n_results=1)
+    
     def get_count(self) -> int:
         """Get the number of protocol examples in the database."""
         return self.collection.count()
@@ -262,18 +583,84 @@ class RAGService:
             True if cleared successfully
         """
         try:
-            # Delete the collection and recreate it
-            self.client.delete_collection("protocol_examples")
-            self.collection = self.client.get_or_create_collection(
-                name="protocol_examples",
-                metadata={"description": "Clinical trial protocol examples for RAG"}
+            collection_metadata = self.collection.metadata or {}
+            index_settings_current = all(
+                collection_metadata.get(key) == value
+                for key, value in COLLECTION_METADATA.items()
+                if key.startswith("hnsw:")
             )
-            print("✓ Cleared all protocol examples")
+            if index_settings_current:
+                # Delete the rows but keep the collection and its index files
+                all_ids = self.collection.get(include=[])['ids']
+                if all_ids:
+                    self.collection.delete(ids=all_ids)
+            else:
+                # Recreate collections created with older index settings
+                self.client.delete_collection("protocol_examples")
+                self.collection = self.client.get_or_create_collection(
+                    name="protocol_examples",
+                    metadata=COLLECTION_METADATA,
+                    embedding_function=self.embedding_function,
+                )
+            self._examples_changed()
+            for blob in self._blob_dir.glob("*.json"):
+                blob.unlink()
+            logger.info("Cleared all protocol examples")
             return True
         except Exception as e:
-            print(f"✗ Error clearing database: {e}")
+            logger.error("Error clearing database: %s", e)
             return False
     
+    def _examples_changed(self):
+        """Drop the cached count and advance the generation after a write."""
+        self._count_cache = None
+        self.generation += 1
+    
+    def _cached_count(self, ttl: float = COUNT_CACHE_TTL_SECONDS) -> int:
+        """
+        Get the number of protocol examples, reusing a recent count.
+        
+        Adding or deleting examples through this service resets the cache.
+        
+        Args:
+            ttl: Seconds a count stays valid
+            
+        Returns:
+            Number of protocol examples
+        """
+        cached = self._count_cache
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < ttl:
+            return cached[0]
+        
+        count = self.collection.count()
+        self._count_cache = (count, now)
+        return count
+    
+    def _embed_query(self, query_text: str) -> List[float]:
+        """
+        Embed query text, reusing the embedding for text seen recently.
+        
+        Args:
+            query_text: Search text from _create_search_text
+            
+        Returns:
+            Query embedding
+        """
+        with self._embedding_cache_lock:
+            embedding = self._embedding_cache.get(query_text)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(query_text)
+                return embedding
+        
+        embedding = self.embedding_function([query_text])[0]
+        
+        with self._embedding_cache_lock:
+            self._embedding_cache[query_text] = embedding
+            while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        return embedding
+    
     def _create_search_text(self, trial_spec) -> str:
         """
         Create searchable text representation of trial specification.
@@ -285,39 +672,43 @@ class RAGService:
         Returns:
             Searchable text string
         """
-        # Handle both dict and Pydantic model
+        # Read dicts directly instead of validating them into a TrialSpecInput
         if isinstance(trial_spec, dict):
-            # Convert dict to TrialSpecInput if needed
-            from app.models.schemas import TrialSpecInput
-            trial_spec = TrialSpecInput(**trial_spec)
+            get = trial_spec.get
+        else:
+            get = lambda key, default=None: getattr(trial_spec, key, default)
         
         # Combine key fields into searchable text
         parts = [
-            f"Phase: {trial_spec.phase.value if hasattr(trial_spec.phase, 'value') else trial_spec.phase}",
-            f"Indication: {trial_spec.indication}",
-            f"Design: {trial_spec.design}",
-            f"Sample Size: {trial_spec.sample_size}",
-            f"Duration: {trial_spec.duration_weeks} weeks",
-            f"Region: {trial_spec.region}",
+            f"Phase: {_enum_value(get('phase'))}",
+            f"Indication: {get('indication')}",
+            f"Design: {get('design')}",
+            f"Sample Size: {get('sample_size')}",
+            f"Duration: {get('duration_weeks')} weeks",
+            f"Region: {get('region')}",
         ]
         
         # Add endpoints
-        if trial_spec.key_endpoints:
+        key_endpoints = get('key_endpoints')
+        if key_endpoints:
             endpoints_text = "; ".join([
-                f"{ep.type.value if hasattr(ep.type, 'value') else ep.type}: {ep.name if hasattr(ep, 'name') else ep.get('name', '')}"
-                for ep in trial_spec.key_endpoints
+                f"{_enum_value(ep.get('type') if isinstance(ep, dict) else ep.type)}: "
+                f"{ep.get('name', '') if isinstance(ep, dict) else ep.name}"
+                for ep in key_endpoints
             ])
             parts.append(f"Endpoints: {endpoints_text}")
         
         # Add inclusion criteria
-        if trial_spec.inclusion_criteria:
-            inclusion_text = "; ".join(trial_spec.inclusion_criteria[:3])  # First 3
+        inclusion_criteria = get('inclusion_criteria')
+        if inclusion_criteria:
+            inclusion_text = "; ".join(inclusion_criteria[:3])  # First 3
             parts.append(f"Inclusion: {inclusion_text}")
         
         # Add background if available
-        if hasattr(trial_spec, 'background') and trial_spec.background:
+        background = get('background')
+        if background:
             # Truncate background to 200 chars
-            bg_text = trial_spec.background[:200]
+            bg_text = background[:200]
             parts.append(f"Background: {bg_text}")
         
         return " | ".join(parts)
@@ -27,10 +27,36 @@ class Settings(BaseSettings):
     use_local_models: bool = True
     openai_api_key: Optional[str] = None
     
+    # LLM HTTP client (shared connection pool for concurrent section requests)
+    llm_max_connections: int = 64
+    llm_max_keepalive_connections: int = 32
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 5.0
+    
+    # OpenAI rate limits; updated from x-ratelimit-* headers once responses arrive
+    llm_requests_per_minute: int = 500
+    llm_tokens_per_minute: int = 150000
+    llm_max_retries: int = 4
+    
+    # Smaller model for structured JSON sections (visit schedule, assessments)
+    llm_structured_model: str = "gpt-4o-mini"
+    
+    # Embedding model for the semantic CRF field cache
+    llm_embedding_model: str = "text-embedding-3-small"
+    
+    # LLM sections generated ahead of time (examples/build_static_sections.py)
+    llm_static_sections_path: str = "./artifacts/static_sections.json"
+    
     # Storage
     artifacts_path: str = "./artifacts"
     vector_db_path: str = "./vector_db"
     
+    # INT8-quantized ONNX embedding model for RAG, e.g. produced with
+    # `optimum-cli onnxruntime quantize --onnx_model <all-MiniLM-L6-v2 ONNX export> --avx512_vnni -o ./models/minilm_int8`.
+    # Unset uses Chroma's default FP32 MiniLM; switching models requires re-seeding the database.
+    rag_embedding_model_path: Optional[str] = None
+    rag_embedding_model_file: str = "model_quantized.onnx"
+    
     # Logging
     log_level: str = "INFO"
     
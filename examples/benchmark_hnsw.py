@@ -0,0 +1,84 @@
+"""Sweep Chroma's HNSW search_ef against exact search on the RAG corpus."""
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import chromadb
+import numpy as np
+from app.services.rag_service import COLLECTION_METADATA, get_rag_service
+
+# search_ef values to try, smallest first
+SEARCH_EF_VALUES = (10, 25, 50, 100)
+
+# Fraction of the corpus held out as queries
+HOLDOUT_FRACTION = 0.2
+
+# Neighbours compared per query, matching the generator's retrieval
+TOP_K = 3
+
+# Recall@k the chosen search_ef must reach
+TARGET_RECALL = 0.98
+
+
+def benchmark_hnsw():
+    """Report recall@k and query time for each search_ef and pick the smallest that is good enough."""
+    print("\n" + "="*60)
+    print("HNSW SEARCH_EF BENCHMARK")
+    print("="*60)
+    
+    rag_service = get_rag_service()
+    corpus = rag_service.collection.get(include=["embeddings"])
+    embeddings = np.asarray(corpus["embeddings"], dtype=np.float32)
+    if len(embeddings) < 10:
+        print("❌ Need at least 10 protocols in the RAG database. Seed it first.")
+        return None
+    
+    # Hold out a random slice of the corpus as queries
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(embeddings))
+    n_queries = max(1, int(len(embeddings) * HOLDOUT_FRACTION))
+    queries, indexed = embeddings[order[:n_queries]], embeddings[order[n_queries:]]
+    ids = [f"doc_{i}" for i in range(len(indexed))]
+    
+    # Exact cosine neighbours as ground truth
+    normalized = indexed / np.linalg.norm(indexed, axis=1, keepdims=True)
+    scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normalized.T
+    exact = [set(np.argsort(-row)[:TOP_K]) for row in scores]
+    
+    print(f"\n📊 {len(indexed)} indexed, {n_queries} queries, recall@{TOP_K} target {TARGET_RECALL}")
+    
+    client = chromadb.EphemeralClient()
+    chosen = None
+    for search_ef in SEARCH_EF_VALUES:
+        metadata = dict(COLLECTION_METADATA, **{"hnsw:search_ef": search_ef})
+        collection = client.create_collection(name=f"hnsw_ef_{search_ef}", metadata=metadata)
+        collection.add(ids=ids, embeddings=indexed.tolist())
+        
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=queries.tolist(), n_results=TOP_K)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / n_queries
+        
+        hits = sum(
+            len({int(doc_id.split("_")[1]) for doc_id in found} & truth)
+            for found, truth in zip(results["ids"], exact)
+        )
+        recall = hits / (n_queries * TOP_K)
+        print(f"   search_ef={search_ef:4d} | recall@{TOP_K}={recall:.3f} | {elapsed_ms:.2f} ms/query")
+        
+        if chosen is None and recall >= TARGET_RECALL:
+            chosen = search_ef
+        client.delete_collection(collection.name)
+    
+    if chosen is None:
+        print(f"\n⚠ No search_ef reached recall@{TOP_K} {TARGET_RECALL}")
+    else:
+        print(f"\n✅ Smallest search_ef reaching the target: {chosen} "
+              f"(configured: {COLLECTION_METADATA['hnsw:search_ef']})")
+    return chosen
+
+
+if __name__ == "__main__":
+    benchmark_hnsw()
@@ -0,0 +1,67 @@
+"""Build the prebuilt LLM section library used by the generator's fast path."""
+import sys
+import os
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import settings
+from app.services.sample_protocols import SAMPLE_PROTOCOLS
+from app.services.generator import ProtocolTemplateGenerator
+
+# Sections served from the library; they depend only on indication, phase and duration
+STATIC_SECTIONS = ("study_design", "visit_schedule", "assessments")
+
+
+def build_static_sections(output_path: str = settings.llm_static_sections_path):
+    """Generate the static sections for each sample protocol with the live LLM."""
+    print("\n" + "="*60)
+    print("BUILDING PREBUILT SECTION LIBRARY")
+    print("="*60)
+    
+    print("\n📦 Initializing services...")
+    generator = ProtocolTemplateGenerator(use_rag=True, use_llm=True, batch_llm=False)
+    if not (generator.use_llm and generator.llm_service):
+        print("❌ LLM is not available. Set OPENAI_API_KEY and try again.")
+        return 0
+    
+    # Always call the live LLM, never an existing library
+    generator._static_library = {}
+    
+    entries = {}
+    for i, trial_spec in enumerate(SAMPLE_PROTOCOLS, 1):
+        spec = trial_spec.model_copy(update={"additional_instructions": None})
+        key = (spec.indication.strip().lower(), spec.phase.value, spec.duration_weeks)
+        if key in entries:
+            continue
+        
+        print(f"   🔄 {i:2d}. {spec.phase.value:12s} | {spec.indication[:40]}")
+        protocol = generator.generate_structured_protocol(spec)
+        
+        llm_sections = set(protocol.llm_enhanced_sections or [])
+        sections = {
+            section: getattr(protocol, section)
+            for section in STATIC_SECTIONS
+            if section in llm_sections
+        }
+        if not sections:
+            print("      ⚠ No LLM sections generated, skipping")
+            continue
+        
+        entries[key] = {
+            "indication": spec.indication,
+            "phase": spec.phase.value,
+            "duration_weeks": spec.duration_weeks,
+            "sections": sections,
+        }
+    
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(list(entries.values()), f, indent=2, ensure_ascii=False)
+    
+    print(f"\n✅ Wrote {len(entries)} entries to {output_path}")
+    return len(entries)
+
+
+if __name__ == "__main__":
+    build_static_sections()
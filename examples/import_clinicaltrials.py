@@ -303,7 +303,8 @@ class ClinicalTrialsImporter:
             max_trials: Maximum number of trials to import
             phases: List of phases to filter
             conditions: List of conditions to filter
-            batch_size: Number of trials to process before reporting progress
+            batch_size: Number of trials added to the database together, and
+                between progress reports
             
         Returns:
             Dictionary with import statistics
@@ -334,36 +335,41 @@ class ClinicalTrialsImporter:
             'failed': 0
         }
         
+        # Protocols waiting to be embedded and added together
+        pending = []
+        
         # Process trials
         for i, trial_data in enumerate(trials, 1):
             try:
                 # Convert to TrialSpecInput
                 trial_spec = self.convert_to_trial_spec(trial_data)
                 
-                if not trial_spec:
+                if trial_spec:
+                    stats['converted'] += 1
+                    
+                    # Generate protocol structure
+                    pending.append((trial_spec, generator.generate_structured_protocol(trial_spec)))
+                else:
                     stats['failed'] += 1
-                    continue
-                
-                stats['converted'] += 1
-                
-                # Generate protocol structure
-                protocol = generator.generate_structured_protocol(trial_spec)
-                
-                # Add to RAG
-                doc_id = rag_service.add_protocol_example(trial_spec, protocol)
-                
-                stats['added'] += 1
-                
-                # Progress update
-                if i % batch_size == 0 or i == len(trials):
-                    print(f"   Progress: {i}/{len(trials)} | "
-                          f"✅ Added: {stats['added']} | "
-                          f"❌ Failed: {stats['failed']}")
                 
             except Exception as e:
                 stats['failed'] += 1
                 if stats['failed'] <= 5:  # Only show first few errors
                     print(f"   ⚠ Error processing trial {i}: {str(e)[:60]}")
+            
+            if i % batch_size == 0 or i == len(trials):
+                # Add to RAG
+                try:
+                    stats['added'] += len(rag_service.add_protocol_examples_bulk(pending))
+                except Exception as e:
+                    stats['failed'] += len(pending)
+                    print(f"   ⚠ Error adding trials to RAG database: {str(e)[:60]}")
+                pending = []
+                
+                # Progress update
+                print(f"   Progress: {i}/{len(trials)} | "
+                      f"✅ Added: {stats['added']} | "
+                      f"❌ Failed: {stats['failed']}")
         
         # Final report
         print("\n" + "="*70)
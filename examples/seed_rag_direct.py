@@ -1,6 +1,10 @@
-"""Direct RAG database seeding - bypasses API server."""
+"""Direct RAG database seeding - bypasses API server.
+
+Usage: python examples/seed_rag_direct.py [protocol_json_dir]
+"""
 import sys
 import os
+from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -26,20 +30,15 @@ def seed_database_directly():
     
     print(f"\n🌱 Seeding {len(SAMPLE_PROTOCOLS)} sample protocols...")
     
-    added = 0
     failed = 0
+    examples = []
     
     for i, trial_spec in enumerate(SAMPLE_PROTOCOLS, 1):
         try:
             # Generate a protocol using the trial spec
             print(f"   🔄 {i:2d}. Generating {trial_spec.phase.value} protocol for {trial_spec.indication[:30]}...")
             protocol = generator.generate_structured_protocol(trial_spec)
-            
-            # Add to RAG
-            doc_id = rag_service.add_protocol_example(trial_spec, protocol)
-            
-            print(f"      ✅ {trial_spec.phase.value:12s} | {trial_spec.indication[:40]:<40s} | {doc_id}")
-            added += 1
+            examples.append((trial_spec, protocol))
             
         except Exception as e:
             print(f"      ❌ {trial_spec.phase.value:12s} | {trial_spec.indication[:40]:<40s}")
@@ -48,6 +47,12 @@ def seed_database_directly():
             traceback.print_exc()
             failed += 1
     
+    # Add to RAG, embedding all protocols together
+    doc_ids = rag_service.add_protocol_examples_bulk(examples)
+    for doc_id, (trial_spec, _) in zip(doc_ids, examples):
+        print(f"      ✅ {trial_spec.phase.value:12s} | {trial_spec.indication[:40]:<40s} | {doc_id}")
+    added = len(doc_ids)
+    
     print(f"\n📊 Seeding complete:")
     print(f"   ✅ Added: {added}")
     print(f"   ❌ Failed: {failed}")
@@ -64,6 +69,27 @@ def seed_database_directly():
     return added, failed
 
 
+def import_protocol_files(directory: str):
+    """Import protocol examples stored as JSON files, e.g. another database's blobs directory."""
+    print("\n" + "="*60)
+    print("RAG DATABASE IMPORT FROM FILES")
+    print("="*60)
+    
+    rag_service = get_rag_service()
+    paths = sorted(Path(directory).glob("*.json"))
+    
+    print(f"\n📂 Importing {len(paths)} protocol files from {directory}...")
+    doc_ids = rag_service.seed_from_files(paths)
+    added = len(doc_ids)
+    
+    print(f"\n📊 Import complete:")
+    print(f"   ✅ Added: {added}")
+    print(f"   ❌ Skipped: {len(paths) - added}")
+    print(f"   Total examples: {rag_service.get_count()}")
+    
+    return added, len(paths) - added
+
+
 def test_search():
     """Test searching the newly seeded database."""
     print("\n" + "="*60)
@@ -114,8 +140,11 @@ def test_search():
 
 
 if __name__ == "__main__":
-    # Seed the database
-    added, failed = seed_database_directly()
+    # Seed the database, from a directory of protocol JSON files when one is given
+    if len(sys.argv) > 1:
+        added, failed = import_protocol_files(sys.argv[1])
+    else:
+        added, failed = seed_database_directly()
     
     if added > 0:
         # Test search functionality
@@ -1,14 +1,17 @@
 """Main FastAPI application."""
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from typing import Dict, Any
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
+import asyncio
 import uuid
 from datetime import datetime
 import os
 import json
 import logging
+import tempfile
 
 # Configure logging for debugging
 logging.basicConfig(
@@ -30,9 +33,23 @@ from app.services.validator import ClinicalRulesValidator
 from app.services.exporter import ProtocolExporter
 from app.services.rag_service import get_rag_service
 
+try:
+    import orjson  # noqa: F401 - required by ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from app.services.llm_service import close_llm_service
+    LLM_AVAILABLE = True
+except ImportError:
+    LLM_AVAILABLE = False
+
 
 # Initialize FastAPI app
 app = FastAPI(
+    # Render the serialized protocol and CRF payloads with orjson's C encoder
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
     title=settings.api_title,
     version=settings.api_version,
     description="AI-Generated Clinical Trial Protocol and EDC Configuration API",
@@ -58,9 +75,40 @@ validator = ClinicalRulesValidator()
 exporter = ProtocolExporter()
 rag_service = get_rag_service()
 
+
+@app.on_event("startup")
+def warmup_services():
+    """Load the RAG embedding model before the first request needs it."""
+    try:
+        rag_service.warmup()
+    except Exception as e:
+        logger.warning(f"RAG warmup failed: {e}")
+
+
+@app.on_event("shutdown")
+def shutdown_services():
+    """Release the shared LLM client's connections."""
+    if LLM_AVAILABLE:
+        close_llm_service()
+
+
 # In-memory storage for generated protocols (use database in production)
 generated_protocols: Dict[str, GenerationResult] = {}
 
+# Media type of each downloadable export format
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ODM_XML: "application/xml",
+    ExportFormat.FHIR_JSON: "application/fhir+json",
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.JSON: "application/json",
+}
+
+# Exports larger than this are spooled to disk rather than held in memory
+EXPORT_SPOOL_MAX_BYTES = 1024 * 1024
+
+# Size of the chunks an export download is sent in
+EXPORT_CHUNK_CHARS = 64 * 1024
+
 # Mount static files for web UI
 web_dir = os.path.join(os.path.dirname(__file__), "web")
 if os.path.exists(web_dir):
@@ -138,14 +186,17 @@ async def generate_protocol(trial_spec: TrialSpecInput):
                 }
             )
         
-        # Generate structured protocol
-        protocol_structured = protocol_generator.generate_structured_protocol(trial_spec)
-        
-        # Generate narrative protocol text
-        protocol_text = protocol_generator.generate_protocol_narrative(trial_spec)
+        # Generate structured protocol (off the event loop; sections run concurrently)
+        protocol_structured = await run_in_threadpool(
+            protocol_generator.generate_structured_protocol, trial_spec
+        )
         
-        # Generate CRF schema
-        crf_schema = crf_generator.generate_crf_schema(trial_spec, protocol_structured)
+        # Generate narrative protocol text and CRF schema concurrently; the
+        # narrative reuses the retrieval cached by the structured protocol
+        protocol_text, crf_schema = await asyncio.gather(
+            run_in_threadpool(protocol_generator.generate_protocol_narrative, trial_spec),
+            run_in_threadpool(crf_generator.generate_crf_schema, trial_spec, protocol_structured),
+        )
         
         # Validate generated protocol
         protocol_validation = validator.validate_protocol(protocol_structured)
@@ -490,6 +541,62 @@ async def export_csv(request_data: Dict[str, str]):
         )
 
 
+@app.post("/api/v1/export/download")
+async def download_export(export_request: ExportRequest):
+    """
+    Download a generated protocol export as a file.
+    
+    The exporter writes the document into a spooled temporary file, which
+    is streamed back in chunks instead of being embedded in a JSON body.
+    
+    Args:
+        export_request: Export request with format specification
+        
+    Returns:
+        Streaming file response with the exported document
+    """
+    if export_request.request_id not in generated_protocols:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Protocol with request_id {export_request.request_id} not found"
+        )
+    
+    result = generated_protocols[export_request.request_id]
+    spool = tempfile.SpooledTemporaryFile(
+        max_size=EXPORT_SPOOL_MAX_BYTES, mode="w+", encoding="utf-8", newline=""
+    )
+    
+    try:
+        export_data = exporter.export(
+            protocol=result.protocol_structured,
+            crf_schema=result.crf_schema,
+            format=export_request.format,
+            include_protocol=export_request.include_protocol,
+            include_crf=export_request.include_crf,
+            out=spool,
+        )
+    except Exception as e:
+        spool.close()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Export failed: {str(e)}"
+        )
+    
+    spool.seek(0)
+    
+    def chunks():
+        try:
+            yield from iter(lambda: spool.read(EXPORT_CHUNK_CHARS), "")
+        finally:
+            spool.close()
+    
+    return StreamingResponse(
+        chunks(),
+        media_type=EXPORT_MEDIA_TYPES[export_request.format],
+        headers={"Content-Disposition": f'attachment; filename="{export_data["filename"]}"'},
+    )
+
+
 @app.get("/api/v1/protocols/{request_id}")
 async def get_protocol(request_id: str) -> GenerationResult:
     """
@@ -510,6 +617,74 @@ async def get_protocol(request_id: str) -> GenerationResult:
     return generated_protocols[request_id]
 
 
+@app.get("/api/v1/protocols/{request_id}/sections/{section_id}/stream")
+async def stream_protocol_section(request_id: str, section_id: str):
+    """
+    Regenerate a protocol section with the LLM, streamed as server-sent events.
+    
+    Each event carries a JSON-encoded chunk of section text; a final
+    "done" event marks the end of the section, or an "error" event
+    reports that the LLM failed partway through it.
+    
+    Args:
+        request_id: Unique request identifier
+        section_id: Protocol section ID (e.g., "1.0")
+        
+    Returns:
+        Event stream of section text
+    """
+    if request_id not in generated_protocols:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Protocol with request_id {request_id} not found"
+        )
+    
+    result = generated_protocols[request_id]
+    section = next(
+        (s for s in result.protocol_structured.sections if s.section_id == section_id),
+        None
+    )
+    if section is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Section {section_id} not found in protocol {request_id}"
+        )
+    
+    if not (protocol_generator.use_llm and protocol_generator.llm_service):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="LLM is not available"
+        )
+    
+    spec = result.input_spec
+    chunks = protocol_generator.llm_service.enhance_protocol_section_stream(
+        section_type=section.title,
+        template_content=section.content,
+        trial_spec={
+            "title": spec.title,
+            "phase": spec.phase.value,
+            "indication": spec.indication,
+            "design": spec.design,
+            "sample_size": spec.sample_size,
+            "duration_weeks": spec.duration_weeks,
+        },
+    )
+    
+    def events():
+        try:
+            for chunk in chunks:
+                yield f"data: {json.dumps(chunk)}\n\n"
+        except Exception as e:
+            logger.error(f"Section stream failed for {request_id} section {section_id}: {e}")
+            error = {"detail": f"Section generation failed: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+    
+    # Starlette iterates the synchronous generator in its threadpool
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @app.get("/api/v1/protocols")
 async def list_protocols():
     """
@@ -666,18 +841,33 @@ async def search_similar_protocols(trial_spec: TrialSpecInput, n_results: int =
 
 
 @app.get("/api/v1/rag/examples")
-async def list_rag_examples():
+async def list_rag_examples(offset: int = 0, limit: Optional[int] = None):
     """
-    List all protocol examples in the RAG database.
+    List protocol examples in the RAG database, optionally a page at a time.
     
+    Args:
+        offset: Number of examples to skip (default: 0)
+        limit: Maximum number of examples to return (default: all)
+        
     Returns:
-        List of all protocol examples with metadata
+        Protocol examples with metadata, the total count, and the offset of
+        the next page when more examples remain
     """
     try:
-        protocols = rag_service.list_all_protocols()
+        total_count = rag_service.get_count()
+        if limit is None:
+            protocols = rag_service.list_all_protocols(page_size=None)[offset:]
+        else:
+            protocols = rag_service.list_all_protocols(offset=offset, page_size=limit)
         
+        next_offset = offset + len(protocols)
+        has_more = next_offset < total_count
         return {
-            "total_count": len(protocols),
+            "total_count": total_count,
+            "offset": offset,
+            "limit": limit,
+            "has_more": has_more,
+            "next_offset": next_offset if has_more else None,
             "examples": protocols,
         }
         
@@ -755,46 +945,51 @@ async def delete_rag_example(doc_id: str):
 
 
 @app.post("/api/v1/rag/seed")
-async def seed_rag_database():
+async def seed_rag_database(phase: Optional[str] = None, indication: Optional[str] = None):
     """
     Seed the RAG database with sample protocols.
     
     This endpoint populates the vector database with predefined sample protocols
     covering various therapeutic areas and phases. Useful for initial setup and testing.
     
+    Args:
+        phase: Only seed samples of this phase (e.g. phase_3)
+        indication: Only seed samples for this indication (case-insensitive)
+        
     Returns:
         Summary of seeded protocols
     """
     try:
-        from app.services.sample_protocols import SAMPLE_PROTOCOLS
+        from app.services.sample_protocols import filter_protocols
         
-        added_count = 0
         failed_count = 0
-        doc_ids = []
+        examples = []
         
-        for sample_spec in SAMPLE_PROTOCOLS:
+        for sample_spec in filter_protocols(phase=phase, indication=indication):
             try:
                 # Generate protocol for the sample
                 protocol = protocol_generator.generate_structured_protocol(sample_spec)
-                
-                # Add to RAG database
-                doc_id = rag_service.add_protocol_example(
-                    trial_spec=sample_spec,
-                    protocol=protocol,
-                    metadata={"source": "sample_seed"}
-                )
-                
-                doc_ids.append({
-                    "doc_id": doc_id,
-                    "phase": sample_spec.phase.value,
-                    "indication": sample_spec.indication,
-                })
-                added_count += 1
+                examples.append((sample_spec, protocol))
                 
             except Exception as e:
-                print(f"Failed to add sample protocol: {e}")
+                print(f"Failed to generate sample protocol: {e}")
                 failed_count += 1
         
+        # Add to RAG database, embedding all samples together
+        added_ids = rag_service.add_protocol_examples_bulk(
+            examples,
+            metadata={"source": "sample_seed"}
+        )
+        added_count = len(added_ids)
+        doc_ids = [
+            {
+                "doc_id": doc_id,
+                "phase": sample_spec.phase.value,
+                "indication": sample_spec.indication,
+            }
+            for doc_id, (sample_spec, _) in zip(added_ids, examples)
+        ]
+        
         return {
             "message": "RAG database seeded with sample protocols",
             "added": added_count,
@@ -819,7 +1014,7 @@ async def get_rag_stats():
         RAG database statistics
     """
     try:
-        protocols = rag_service.list_all_protocols()
+        protocols = rag_service.list_all_protocols(page_size=None)
         
         # Aggregate statistics
         phases = {}
@@ -213,6 +213,44 @@ class TestAPIEndpoints:
         assert "crf_schema" in protocol_data
         assert "request_id" in protocol_data
     
+    def test_export_download_streams_file(self):
+        """Test that an export can be downloaded as a streamed file."""
+        payload = {
+            "sponsor": "Test Pharma",
+            "title": "Download Test Study",
+            "indication": "Hypertension",
+            "phase": "Phase 2",
+            "design": "randomized",
+            "sample_size": 50,
+            "duration_weeks": 8,
+            "treatment_arms": ["Drug X", "Placebo"],
+            "key_endpoints": [
+                {"type": "primary", "name": "BP reduction"}
+            ],
+            "inclusion_criteria": ["Age 18-65"],
+            "exclusion_criteria": ["Pregnancy"],
+            "region": "US"
+        }
+        
+        response = client.post("/api/v1/generate", json=payload)
+        assert response.status_code == 201
+        request_id = response.json()["request_id"]
+        
+        response = client.post(
+            "/api/v1/export/download",
+            json={"request_id": request_id, "format": "csv"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "_DataDictionary.csv" in response.headers["content-disposition"]
+        assert response.text.startswith('"Form ID","Form Name"')
+        
+        response = client.post(
+            "/api/v1/export/download",
+            json={"request_id": "REQ-MISSING", "format": "csv"}
+        )
+        assert response.status_code == 404
+    
     def test_generate_protocol_with_all_optional_fields(self):
         """Test protocol generation with all optional fields populated."""
         payload = {
@@ -0,0 +1,223 @@
+"""Tests for LLM-assisted CRF form generation."""
+import json
+import threading
+import pytest
+from types import SimpleNamespace
+from app.models.schemas import TrialSpecInput, TrialPhase, TrialEndpoint, EndpointType
+from app.services import generator as generator_module
+from app.services.generator import CRFGenerator
+
+
+def _fields(assessment_id):
+    """Two CRF field dicts tagged with the assessment id."""
+    return [
+        {"field_id": f"{assessment_id}_A", "field_name": "a", "field_label": "A", "data_type": "text", "required": True},
+        {"field_id": f"{assessment_id}_B", "field_name": "b", "field_label": "B", "data_type": "number"},
+    ]
+
+
+class FakeCompletions:
+    """Chat completions client returning canned CRF field replies."""
+    
+    def __init__(self, batched_reply):
+        self.batched_reply = batched_reply
+        self.single_fields = _fields("SINGLE")
+        self.calls = []
+    
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        prompt = kwargs["messages"][-1]["content"]
+        if "keyed by assessment_id" in prompt:
+            content = json.dumps({"forms": self.batched_reply})
+        else:
+            content = json.dumps({"fields": self.single_fields})
+        # Stream the reply in small chunks
+        return (
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i:i + 16]))])
+            for i in range(0, len(content), 16)
+        )
+
+
+class FakeEmbeddings:
+    """Embeddings client that ignores the indication in assessment prompts."""
+    
+    def create(self, model, input):
+        vectors = []
+        for text in input:
+            name = text.split("|")[1]
+            vectors.append(SimpleNamespace(embedding=[float(ord(c)) for c in name.ljust(12)[:12]]))
+        return SimpleNamespace(data=vectors)
+
+
+class TestCRFGenerator:
+    """Test suite for CRF generation with an LLM."""
+    
+    def setup_method(self):
+        """Setup test fixtures."""
+        CRFGenerator._fields_cache.clear()
+        CRFGenerator._semantic_cache.clear()
+        CRFGenerator._schema_cache.clear()
+        self.generator = CRFGenerator()
+        
+        self.spec = TrialSpecInput(
+            sponsor="Test Pharma",
+            title="Psoriasis Study",
+            indication="Psoriasis",
+            phase=TrialPhase.PHASE_3,
+            design="randomized, double-blind",
+            sample_size=100,
+            duration_weeks=16,
+            key_endpoints=[
+                TrialEndpoint(type=EndpointType.PRIMARY, name="PASI 75")
+            ],
+            inclusion_criteria=["Plaque psoriasis"],
+            exclusion_criteria=["Pregnant"],
+            region="EU"
+        )
+        self.protocol = SimpleNamespace(protocol_id="PROT-1", visit_schedule=[
+            {"visit_id": "V0", "visit_name": "Screening", "week": -2, "window": "±3 days"},
+            {"visit_id": "V1", "visit_name": "Baseline", "week": 0},
+        ], assessments=[
+            {"assessment_id": "DEMO", "name": "Demographics", "description": "Baseline data"},
+            {"assessment_id": "PASI", "name": "PASI", "description": "Psoriasis Area and Severity Index"},
+            {"assessment_id": "IGA", "name": "IGA", "description": "Investigator Global Assessment"},
+            {"assessment_id": "PHOTO", "name": "Photography", "description": "Lesion photographs"},
+        ])
+    
+    def teardown_method(self):
+        """Leave no cached fields behind for other tests."""
+        CRFGenerator._fields_cache.clear()
+        CRFGenerator._semantic_cache.clear()
+        CRFGenerator._schema_cache.clear()
+    
+    def _use_fake_llm(self, batched_reply):
+        completions = FakeCompletions(batched_reply)
+        self.generator.llm_service = SimpleNamespace(
+            model="fake",
+            client=SimpleNamespace(chat=SimpleNamespace(completions=completions), embeddings=FakeEmbeddings()),
+        )
+        return completions
+    
+    def test_assessment_forms_batched_into_one_call(self):
+        """Test that several assessments share a single LLM call."""
+        completions = self._use_fake_llm({aid: _fields(aid) for aid in ("PASI", "IGA", "PHOTO")})
+        
+        forms = self.generator._generate_forms_from_assessments(self.spec, self.protocol)
+        
+        assert len(completions.calls) == 1
+        assert [form.form_id for form in forms][-3:] == ["PASI", "IGA", "PHOTO"]
+        assert forms[-1].fields[0].field_id == "PHOTO_A"
+    
+    def test_missing_batched_forms_fall_back_to_single_calls(self):
+        """Test that assessments absent or malformed in the batched reply are retried alone."""
+        completions = self._use_fake_llm({"PASI": _fields("PASI"), "PHOTO": "not a list"})
+        
+        forms = self.generator._generate_forms_from_assessments(self.spec, self.protocol)
+        
+        assert len(completions.calls) == 3
+        assert [form.form_id for form in forms][-3:] == ["PASI", "IGA", "PHOTO"]
+        assert forms[-2].fields[0].field_id == "SINGLE_A"
+    
+    def test_generated_fields_cached_per_assessment(self):
+        """Test that repeated CRF generation reuses cached assessment fields."""
+        completions = self._use_fake_llm({aid: _fields(aid) for aid in ("PASI", "IGA", "PHOTO")})
+        first = self.generator._generate_forms_from_assessments(self.spec, self.protocol)
+        
+        second = self.generator._generate_forms_from_assessments(self.spec, self.protocol)
+        instructed = self.spec.model_copy(update={"additional_instructions": "Capture body region"})
+        self.generator._generate_forms_from_assessments(instructed, self.protocol)
+        
+        assert len(completions.calls) == 2
+        assert [form.model_dump() for form in second] == [form.model_dump() for form in first]
+    
+    def test_paraphrased_indication_reuses_similar_fields(self):
+        """Test that semantically equivalent assessments hit the semantic cache."""
+        completions = self._use_fake_llm({aid: _fields(aid) for aid in ("PASI", "IGA", "PHOTO")})
+        self.generator._generate_forms_from_assessments(self.spec, self.protocol)
+        
+        paraphrased = self.spec.model_copy(update={"indication": "Plaque Psoriasis"})
+        forms = self.generator._generate_forms_from_assessments(paraphrased, self.protocol)
+        
+        assert len(completions.calls) == 1
+        assert forms[-1].fields[0].field_id == "PHOTO_A"
+
+    
+    def test_cold_cache_embeds_alongside_generation(self):
+        """Test that with nothing cached the embedding call does not hold up field generation."""
+        completions = self._use_fake_llm({aid: _fields(aid) for aid in ("PASI", "IGA", "PHOTO")})
+        generated = threading.Event()
+        create = completions.create
+        
+        def create_and_signal(**kwargs):
+            generated.set()
+            return create(**kwargs)
+        
+        embeddings = self.generator.llm_service.client.embeddings
+        embed = embeddings.create
+        waited = []
+        
+        def embed_after_generation(model, input):
+            waited.append(generated.wait(timeout=5))
+            return embed(model, input)
+        
+        completions.create = create_and_signal
+        embeddings.create = embed_after_generation
+        self.generator._generate_forms_from_assessments(self.spec, self.protocol)
+        
+        assert waited == [True]
+        assert len(CRFGenerator._semantic_cache) == 3
+    
+    def test_schema_reused_when_crf_inputs_unchanged(self):
+        """Test that regenerating after a CRF-irrelevant edit reuses the whole schema."""
+        completions = self._use_fake_llm({aid: _fields(aid) for aid in ("PASI", "IGA", "PHOTO")})
+        first = self.generator.generate_crf_schema(self.spec, self.protocol)
+        CRFGenerator._fields_cache.clear()
+        
+        resized = self.spec.model_copy(update={"sample_size": 250})
+        second = self.generator.generate_crf_schema(resized, self.protocol)
+        
+        assert len(completions.calls) == 1
+        assert second.model_dump(exclude={"generated_at"}) == first.model_dump(exclude={"generated_at"})
+        assert second.forms[0] is not first.forms[0]
+    
+    def test_standard_forms_not_shared(self):
+        """Test that editing a generated standard form leaves later schemas untouched."""
+        first = self.generator._generate_standard_forms(has_score_endpoint=True)
+        age = next(field for field in first[0].fields if field.field_id == "AGE")
+        age.validation_rules["max"] = 90
+        first[1].fields.clear()
+        
+        second = self.generator._generate_standard_forms(has_score_endpoint=True)
+        
+        assert next(field for field in second[0].fields if field.field_id == "AGE").validation_rules["max"] == 120
+        assert len(second[1].fields) > 0
+    
+    def test_failed_assessment_gets_fallback_form(self):
+        """Test that an assessment is not dropped when the LLM returns no fields."""
+        completions = self._use_fake_llm({"PASI": _fields("PASI"), "IGA": _fields("IGA")})
+        completions.single_fields = []
+        
+        forms = self.generator._generate_forms_from_assessments(self.spec, self.protocol)
+        
+        assert forms[-1].form_id == "PHOTO"
+        assert [field.field_id for field in forms[-1].fields] == ["PHOTO_DATE", "PHOTO_RESULT"]
+    
+    def test_llm_fields_normalized_before_construction(self):
+        """Test that loosely typed LLM fields are coerced for model_construct."""
+        fields = generator_module._normalize_crf_fields([
+            {"field_id": 7, "field_name": "score", "field_label": None, "required": "false"},
+            "not a field",
+            {"field_name": "site", "required": "Yes"},
+        ])
+        
+        assert fields == [
+            {"field_id": "7", "field_name": "score", "field_label": "Field", "data_type": "text", "required": False},
+            {"field_id": "FIELD_1", "field_name": "site", "field_label": "Field", "data_type": "text", "required": True},
+        ]
+        form = self.generator._build_assessment_form(self.protocol.assessments[1], fields)
+        assert form.form_id == "PASI"
+        assert form.fields[1].required is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
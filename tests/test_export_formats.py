@@ -192,6 +192,20 @@ class TestExportFormats:
         assert headers is not None
         assert len(headers) > 0
     
+    def test_csv_export_escapes_validation_rules(self):
+        """Test that quoted JSON in validation rules survives CSV parsing."""
+        result = self.exporter.export(
+            self.protocol,
+            self.crf,
+            ExportFormat.CSV
+        )
+        
+        reader = csv.DictReader(io.StringIO(result['content']))
+        rows = {row['Field ID']: row for row in reader}
+        
+        assert json.loads(rows['AGE']['Validation Rules']) == {"min": 0, "max": 120}
+        assert rows['SUBJID']['Validation Rules'] == ""
+    
     def test_export_with_protocol_only(self):
         """Test exporting protocol without CRF."""
         result = self.exporter.export(
@@ -247,6 +261,23 @@ class TestExportFormats:
         assert odm_result is not None
         assert fhir_result is not None
         assert csv_result is not None
+    
+    def test_export_to_stream(self):
+        """Test that exports can be written to a caller-supplied stream."""
+        expected = self.exporter.export(self.protocol, self.crf, ExportFormat.CSV)
+        
+        out = io.StringIO()
+        result = self.exporter.export(self.protocol, self.crf, ExportFormat.CSV, out=out)
+        
+        assert result['content'] is None
+        assert out.getvalue() == expected['content']
+        
+        for export_format in (ExportFormat.ODM_XML, ExportFormat.FHIR_JSON, ExportFormat.JSON):
+            out = io.StringIO()
+            result = self.exporter.export(self.protocol, self.crf, export_format, out=out)
+            
+            assert result['content'] is None
+            assert len(out.getvalue()) > 0
 
 
 if __name__ == "__main__":
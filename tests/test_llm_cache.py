@@ -0,0 +1,125 @@
+"""Tests for the generator's in-process LLM response cache."""
+import json
+import pytest
+from types import SimpleNamespace
+from app.models.schemas import TrialSpecInput, TrialPhase, TrialEndpoint, EndpointType
+from app.services import generator as generator_module
+from app.services.generator import ProtocolTemplateGenerator
+
+
+class TestLLMCache:
+    """Test suite for LLM response caching."""
+    
+    def setup_method(self):
+        """Setup test fixtures."""
+        ProtocolTemplateGenerator._llm_cache.clear()
+        self.generator = ProtocolTemplateGenerator(use_llm=False, use_rag=False)
+        
+        self.spec = TrialSpecInput(
+            sponsor="Test Pharma",
+            title="Psoriasis Study",
+            indication="Psoriasis",
+            phase=TrialPhase.PHASE_2,
+            design="randomized, double-blind",
+            sample_size=100,
+            duration_weeks=16,
+            key_endpoints=[
+                TrialEndpoint(type=EndpointType.PRIMARY, name="PASI 75")
+            ],
+            inclusion_criteria=["Plaque psoriasis"],
+            exclusion_criteria=["Pregnant"],
+            region="EU"
+        )
+    
+    def teardown_method(self):
+        """Leave no cached responses behind for other tests."""
+        ProtocolTemplateGenerator._llm_cache.clear()
+    
+    def test_cache_key_tracks_prompt_inputs(self):
+        """Test that specs producing different prompts get different keys."""
+        key = self.generator._llm_cache_key("study_design", self.spec, [])
+        same = self.generator._llm_cache_key("study_design", self.spec.model_copy(), [])
+        other_spec = self.spec.model_copy(update={"additional_instructions": "Add telemedicine visits"})
+        
+        assert key == same
+        assert key != self.generator._llm_cache_key("visit_schedule", self.spec, [])
+        assert key != self.generator._llm_cache_key("study_design", other_spec, [])
+        assert key != self.generator._llm_cache_key("study_design", self.spec, [{"id": "protocol_1"}])
+    
+    def test_cached_response_is_a_copy(self):
+        """Test that callers cannot mutate the cached value."""
+        key = self.generator._llm_cache_key("visit_schedule", self.spec, [])
+        self.generator._cache_response(key, [{"visit_id": "V0"}])
+        
+        visits = self.generator._get_cached_response(key)
+        visits[0]["visit_id"] = "CHANGED"
+        
+        assert self.generator._get_cached_response(key) == [{"visit_id": "V0"}]
+    
+    def test_cache_evicts_least_recently_used(self, monkeypatch):
+        """Test that the cache is bounded."""
+        monkeypatch.setattr(generator_module, "LLM_CACHE_SIZE", 2)
+        
+        for section in ("a", "b", "c"):
+            self.generator._cache_response((section,), section)
+        
+        assert self.generator._get_cached_response(("a",)) is None
+        assert self.generator._get_cached_response(("c",)) == "c"
+    
+    
+    def test_parse_json_list_accepts_json_mode_and_plain_replies(self):
+        """Test that list sections parse from JSON objects and bare arrays."""
+        parse = generator_module._parse_json_list
+        
+        assert parse('{"visits": [{"visit_id": "V0"}]}', "visits") == [{"visit_id": "V0"}]
+        assert parse('{"schedule": [{"visit_id": "V0"}]}', "visits") == [{"visit_id": "V0"}]
+        assert parse('Here you go:\n[{"visit_id": "V0"}]', "visits") == [{"visit_id": "V0"}]
+        assert parse("No schedule available", "visits") is None
+    
+    def test_json_stream_stops_at_closing_bracket(self):
+        """Test that streamed replies are cut off once the JSON value closes."""
+        reply = '{"visits": [{"visit_name": "Week 4 ]"}]}\n\nTrailing commentary'
+        chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=reply[i:i + 5]))])
+            for i in range(0, len(reply), 5)
+        ]
+        
+        def stream():
+            yield from chunks
+            raise AssertionError("stream read past the end of the JSON value")
+        
+        assert generator_module._read_json_stream(stream()) == '{"visits": [{"visit_name": "Week 4 ]"}]}'
+    
+    
+    def test_prompt_guidance_specialized_by_indication(self):
+        """Test that known indications only carry their own prompt guidance."""
+        dermatology = self.generator._indication_guidance("Plaque Psoriasis")
+        unknown = self.generator._indication_guidance("Rare Disease X")
+        
+        assert "Dermatology" in dermatology["visit_timing"]
+        assert "Cancer" not in dermatology["visit_timing"]
+        assert all(area in unknown["visit_timing"] for area in ("Cancer", "Dermatology", "Metabolic"))
+        assert self.generator._indication_guidance(" plaque psoriasis ") is dermatology
+    
+    
+    def test_prebuilt_sections_skip_llm_without_instructions(self, tmp_path):
+        """Test that prebuilt sections are served only for plain specs."""
+        library = tmp_path / "static_sections.json"
+        library.write_text(json.dumps([{
+            "indication": "Psoriasis",
+            "phase": self.spec.phase.value,
+            "duration_weeks": self.spec.duration_weeks,
+            "sections": {"study_design": "Prebuilt psoriasis design."},
+        }]))
+        self.generator._static_library = generator_module.load_prebuilt_sections(str(library))
+        
+        assert self.generator._get_prebuilt_section("study_design", self.spec) == "Prebuilt psoriasis design."
+        assert self.generator._get_prebuilt_section("visit_schedule", self.spec) is None
+        
+        instructed = self.spec.model_copy(update={"additional_instructions": "Add telemedicine visits"})
+        assert self.generator._get_prebuilt_section("study_design", instructed) is None
+        assert generator_module.load_prebuilt_sections(str(tmp_path / "missing.json")) == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
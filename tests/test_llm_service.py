@@ -0,0 +1,171 @@
+"""Tests for the LLM service's rate limiting, caching and streaming."""
+import httpx
+import pytest
+from types import SimpleNamespace
+from app.models.schemas import TrialSpecInput, TrialPhase, TrialEndpoint, EndpointType
+from app.services.generator import ProtocolTemplateGenerator
+from app.services.llm_service import LLMService, RateLimiter
+
+
+class TestRateLimiter:
+    """Test suite for the OpenAI rate limiter."""
+    
+    def test_acquire_spends_request_and_token_budget(self):
+        """Test that each request is charged against both buckets."""
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+        
+        limiter.acquire(400)
+        
+        assert limiter.available_requests == pytest.approx(59, abs=0.01)
+        assert limiter.available_tokens == pytest.approx(600, abs=1)
+    
+    def test_headers_replace_configured_limits(self):
+        """Test that limits reported by the API are adopted by the hooks."""
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+        headers = {
+            "x-ratelimit-limit-requests": "120",
+            "x-ratelimit-limit-tokens": "2000",
+            "x-ratelimit-remaining-requests": "3",
+            "x-ratelimit-remaining-tokens": "500",
+        }
+        client = httpx.Client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, headers=headers, json={})),
+            event_hooks={"request": [limiter.throttle_request], "response": [limiter.record_response]},
+        )
+        
+        client.post("https://api.openai.com/v1/chat/completions", json={"max_tokens": 100, "messages": []})
+        
+        assert limiter.request_capacity == 120
+        assert limiter.token_capacity == 2000
+        assert limiter.available_requests == pytest.approx(3, abs=0.01)
+        assert limiter.available_tokens == pytest.approx(500, abs=1)
+
+
+class TestResponseCache:
+    """Test suite for caching objective and criteria responses."""
+    
+    def setup_method(self):
+        """Setup test fixtures."""
+        LLMService._response_cache.clear()
+        self.calls = []
+        self.service = LLMService.__new__(LLMService)
+        self.service.model = "gpt-test"
+        self.service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self._create)))
+        self.replies = [ValueError("timeout"), '{"criteria": ["Age 18+"]}']
+    
+    def teardown_method(self):
+        """Leave no cached responses behind for other tests."""
+        LLMService._response_cache.clear()
+    
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+    
+    def test_identical_inputs_reuse_response(self):
+        """Test that only successful replies are cached, keyed by the prompt inputs."""
+        spec = {"phase": "phase_2", "indication": "Psoriasis", "design": "randomized"}
+        
+        fallback = self.service.generate_inclusion_criteria(spec)
+        first = self.service.generate_inclusion_criteria(spec)
+        first.append("mutated")
+        second = self.service.generate_inclusion_criteria(dict(reversed(list(spec.items()))))
+        
+        assert len(self.calls) == 2
+        assert "Able to provide informed consent" in fallback
+        assert second == ["Age 18+"]
+        instructed = self.service._response_cache_key("inclusion_criteria", spec, None, "Adults only")
+        assert instructed != self.service._response_cache_key("inclusion_criteria", spec, None, None)
+
+
+class TestGeneratorFallback:
+    """Test suite for reporting LLM failures to the protocol generator."""
+    
+    def setup_method(self):
+        """Setup test fixtures."""
+        LLMService._response_cache.clear()
+        
+        def create(**kwargs):
+            raise ValueError("timeout")
+        
+        service = LLMService.__new__(LLMService)
+        service.model = "gpt-test"
+        service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        self.generator = ProtocolTemplateGenerator(use_llm=True, use_rag=False)
+        self.generator.llm_service = service
+        self.spec = TrialSpecInput(
+            sponsor="Test Pharma",
+            title="Psoriasis Study",
+            indication="Psoriasis",
+            phase=TrialPhase.PHASE_2,
+            design="randomized, double-blind",
+            sample_size=100,
+            duration_weeks=16,
+            key_endpoints=[
+                TrialEndpoint(type=EndpointType.PRIMARY, name="PASI 75")
+            ],
+            inclusion_criteria=["Plaque psoriasis"],
+            exclusion_criteria=["Pregnant"],
+            region="EU"
+        )
+    
+    def teardown_method(self):
+        """Leave no cached responses behind for other tests."""
+        LLMService._response_cache.clear()
+    
+    def test_failed_calls_not_reported_as_llm_output(self):
+        """Test that sections falling back after a client error are not flagged as LLM-made."""
+        objectives, objectives_from_llm = self.generator._generate_objectives(self.spec, [])
+        inclusion, inclusion_from_llm = self.generator._generate_inclusion_criteria(self.spec, [])
+        exclusion, exclusion_from_llm = self.generator._generate_exclusion_criteria(self.spec, [])
+        
+        assert not (objectives_from_llm or inclusion_from_llm or exclusion_from_llm)
+        assert "Psoriasis" in objectives["primary"]
+        assert inclusion == ["Plaque psoriasis"]
+        assert exclusion == ["Pregnant"]
+
+
+class TestSectionStream:
+    """Test suite for streaming section enhancement."""
+    
+    def _service(self, create):
+        service = LLMService.__new__(LLMService)
+        service.model = "gpt-test"
+        service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        return service
+    
+    def test_chunks_yielded_as_they_arrive(self):
+        """Test that streamed deltas are passed through and failures yield the template."""
+        def create(**kwargs):
+            assert kwargs["stream"] is True
+            return (
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+                for text in ("Study ", None, "design")
+            )
+        
+        def fail(**kwargs):
+            raise ValueError("timeout")
+        
+        spec = {"indication": "Psoriasis"}
+        
+        assert list(self._service(create).enhance_protocol_section_stream("design", "T", spec)) == ["Study ", "design"]
+        assert list(self._service(fail).enhance_protocol_section_stream("design", "T", spec)) == ["T"]
+    
+    def test_failure_after_partial_output_is_raised(self):
+        """Test that a stream failing midway raises instead of ending quietly."""
+        def create(**kwargs):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Study "))])
+            raise httpx.ReadTimeout("timeout")
+        
+        stream = self._service(create).enhance_protocol_section_stream("design", "T", {"indication": "Psoriasis"})
+        
+        assert next(stream) == "Study "
+        with pytest.raises(httpx.ReadTimeout):
+            next(stream)
+
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -171,6 +171,7 @@ class TestRAGService:
         
         generator = ProtocolTemplateGenerator(use_llm=False, use_rag=False)
         protocol = generator.generate_structured_protocol(spec)
+        generation = rag_service.generation
         doc_id = rag_service.add_protocol_example(spec, protocol)
         
         # Delete it
@@ -178,6 +179,8 @@ class TestRAGService:
         
         assert success == True
         assert rag_service.get_count() == initial_count
+        # Both writes invalidate retrievals cached against the old contents
+        assert rag_service.generation == generation + 2
         
         # Try to retrieve deleted protocol
         retrieved = rag_service.get_protocol_by_id(doc_id)
@@ -216,6 +219,99 @@ class TestRAGService:
         assert "200" in search_text
         assert "24 weeks" in search_text
         assert "FEV1" in search_text or "primary" in search_text.lower()
+    
+    def test_query_embedding_cached(self):
+        """Test that repeated search text is embedded only once."""
+        from app.services.rag_service import get_rag_service
+        
+        rag_service = get_rag_service()
+        query_text = "Phase: phase_2 | Indication: Embedding cache test"
+        
+        first = rag_service._embed_query(query_text)
+        second = rag_service._embed_query(query_text)
+        
+        assert second is first
+        assert len(first) > 0
+    
+    def test_add_protocol_examples_bulk(self):
+        """Test adding several protocols in one call."""
+        from app.services.rag_service import get_rag_service
+        
+        rag_service = get_rag_service()
+        initial_count = rag_service.get_count()
+        generator = ProtocolTemplateGenerator(use_llm=False, use_rag=False)
+        
+        examples = []
+        for indication in ("Asthma", "Migraine"):
+            spec = TrialSpecInput(
+                sponsor="Test Pharma",
+                title=f"{indication} Study",
+                indication=indication,
+                phase=TrialPhase.PHASE_2,
+                design="randomized",
+                sample_size=100,
+                duration_weeks=12,
+                key_endpoints=[
+                    TrialEndpoint(type=EndpointType.PRIMARY, name="Symptom score")
+                ],
+                inclusion_criteria=[indication],
+                exclusion_criteria=["Pregnant"],
+                region="US"
+            )
+            examples.append((spec, generator.generate_structured_protocol(spec)))
+        
+        doc_ids = rag_service.add_protocol_examples_bulk(examples, metadata={"source": "bulk_test"})
+        
+        assert len(doc_ids) == 2
+        assert rag_service.get_count() == initial_count + 2
+        assert rag_service.get_protocol_by_id(doc_ids[1])['metadata']['indication'] == "Migraine"
+        assert rag_service.add_protocol_examples_bulk([]) == []
+        
+        # Clean up
+        for doc_id in doc_ids:
+            rag_service.delete_protocol(doc_id)
+    
+    def test_seed_from_files(self):
+        """Test importing protocol files, skipping unreadable ones."""
+        from app.services.rag_service import get_rag_service
+        
+        rag_service = get_rag_service()
+        initial_count = rag_service.get_count()
+        
+        spec = TrialSpecInput(
+            sponsor="Test Pharma",
+            title="Eczema Study",
+            indication="Atopic Dermatitis",
+            phase=TrialPhase.PHASE_2,
+            design="randomized",
+            sample_size=120,
+            duration_weeks=16,
+            key_endpoints=[
+                TrialEndpoint(type=EndpointType.PRIMARY, name="EASI 75")
+            ],
+            inclusion_criteria=["Atopic dermatitis"],
+            exclusion_criteria=["Pregnant"],
+            region="EU"
+        )
+        protocol = ProtocolTemplateGenerator(use_llm=False, use_rag=False).generate_structured_protocol(spec)
+        
+        paths = []
+        for i in range(3):
+            path = Path(self.temp_dir) / f"example_{i}.json"
+            path.write_text(f'{{"trial_spec": {spec.model_dump_json()}, "protocol": {protocol.model_dump_json()}}}')
+            paths.append(path)
+        broken = Path(self.temp_dir) / "broken.json"
+        broken.write_text("{")
+        paths.append(broken)
+        
+        doc_ids = rag_service.seed_from_files(paths, workers=2, batch_size=2)
+        
+        assert len(doc_ids) == 3
+        assert rag_service.get_count() == initial_count + 3
+        
+        # Clean up
+        for doc_id in doc_ids:
+            rag_service.delete_protocol(doc_id)
 
 
 if __name__ == "__main__":
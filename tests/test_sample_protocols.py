@@ -0,0 +1,47 @@
+"""Tests for the sample protocol seed data."""
+from typing import List
+import pytest
+from pydantic import TypeAdapter
+from app.models.schemas import TrialSpecInput
+from app.services import sample_protocols
+
+
+class TestSampleProtocols:
+    """Test suite for the sample protocols module."""
+    
+    def test_protocols_built_once_on_access(self):
+        """Test that named protocols are validated lazily and shared with SAMPLE_PROTOCOLS."""
+        from app.services.sample_protocols import ONCOLOGY_PHASE3, SAMPLE_PROTOCOLS
+        
+        assert isinstance(ONCOLOGY_PHASE3, TrialSpecInput)
+        assert len(SAMPLE_PROTOCOLS) == len(sample_protocols.PROTOCOL_NAMES)
+        assert SAMPLE_PROTOCOLS[0] is ONCOLOGY_PHASE3
+        assert sample_protocols.ONCOLOGY_PHASE3 is ONCOLOGY_PHASE3
+        with pytest.raises(AttributeError):
+            sample_protocols.UNKNOWN_PHASE3
+    
+    def test_raw_data_passes_validation(self):
+        """Test that the unvalidated seed data matches what the schema would build."""
+        validated = TypeAdapter(List[TrialSpecInput]).validate_python(sample_protocols._RAW_PROTOCOLS)
+        
+        assert [p.model_dump() for p in sample_protocols.SAMPLE_PROTOCOLS] == [p.model_dump() for p in validated]
+        assert all(
+            protocol.inclusion_criteria is not raw["inclusion_criteria"]
+            and protocol.treatment_arms is not raw["treatment_arms"]
+            for protocol, raw in zip(sample_protocols.SAMPLE_PROTOCOLS, sample_protocols._RAW_PROTOCOLS)
+        )
+    
+    def test_filter_protocols_combines_criteria(self):
+        """Test that filters match the equivalent per-protocol checks."""
+        protocols = sample_protocols.SAMPLE_PROTOCOLS
+        
+        matches = sample_protocols.filter_protocols(phase="phase_3")
+        
+        assert matches == [p for p in protocols if p.phase.value == "phase_3"]
+        assert sample_protocols.filter_protocols(indication="hypercholesterolemia") == [protocols[1]]
+        assert sample_protocols.filter_protocols(phase="phase_3", indication="hypercholesterolemia") == []
+        assert sample_protocols.filter_protocols() == protocols
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])